@@ -8,10 +8,42 @@ DEBUG = True
 ALLOWED_HOSTS = ["*"]
 
 
-AUTHENTICATION_BACKENDS = [                        # <— add this first
-    "django.contrib.auth.backends.ModelBackend",
+AUTHENTICATION_BACKENDS = [
+    # Single backend: resolves HRMS ID or username in one query and hashes the
+    # password once per attempt. Do not add ModelBackend back — it would hash again.
+    "hr.backends.HRMSIDBackend",
 ]
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "civil-hrms",
+    },
+    # Shared by all worker processes on this host (sessions, auth snapshots), so a
+    # logout or permission change in one worker is seen by the others.
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "var" / "cache",
+        "TIMEOUT": 3600,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
+# Sessions: cache first, DB write-through (survives cache loss / restarts)
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "shared"
+
+# Cached request.user + employee_profile snapshot (hr/authcache.py)
+HR_AUTH_CACHE = "shared"
+HR_AUTH_CACHE_TIMEOUT = 900
+
+# Failed-login throttling (see hr/throttle.py for defaults)
+HR_LOGIN_THROTTLE = {
+    "per_identifier": 5,
+    "per_ip": 30,
+    "window": 300,
+}
+
 INSTALLED_APPS = [
     "jazzmin",                    # <-- add this FIRST (before 'django.contrib.admin')
     "django.contrib.admin",
@@ -74,16 +106,51 @@ LOCALE_PATHS = [
 
 
 MIDDLEWARE = [
+    "hr.profiling.SampledProfilerMiddleware",  # no-op unless HR_PROFILER["sample_rate"] > 0
+    "hr.metrics.MetricsMiddleware",            # per-view counters/histograms, exposed at /hr/metrics/
+    "hr.nplusone.NPlusOneMiddleware",          # logs repeated queries; only when HR_NPLUSONE["enabled"]
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "hr.middleware.AdminSuperuserOnlyMiddleware",
+    "hr.middleware.CachedAuthenticationMiddleware",   # replaces django.contrib.auth's AuthenticationMiddleware
+    "hr.middleware.PathPolicyMiddleware",   # superuser-only /admin/ + forced password change
     "django.contrib.messages.middleware.MessageMiddleware",
-    "hr.middleware.ForcePasswordChangeMiddleware",  # <== add here
 ]
+# Sampled request profiling (hr/profiling.py); summarize with `manage.py profile_report`
+HR_PROFILER = {
+    "sample_rate": float(os.getenv("HR_PROFILE_SAMPLE_RATE", "0")),
+    "slow_ms": int(os.getenv("HR_PROFILE_SLOW_MS", "1000")),
+    "dir": BASE_DIR / "var" / "profiles",
+    "keep": 200,
+}
+
+# In-process metrics shared across workers via per-pid files (hr/metrics.py)
+HR_METRICS = {
+    "enabled": True,
+    "dir": BASE_DIR / "var" / "metrics",
+    "flush_interval": 5,
+}
+
+# Duplicate-query (N+1) detector (hr/nplusone.py); CI budgets: `manage.py check_query_budgets`
+HR_NPLUSONE = {
+    "enabled": DEBUG,
+    "threshold": 5,
+    "raise": False,
+}
+
+# Cross-process concurrency limits for expensive staff endpoints (hr/admission.py);
+# beyond `concurrency` running + `queue` waiting, requests get 429 + Retry-After
+HR_ADMISSION = {
+    "dir": BASE_DIR / "var" / "admission",
+    "limits": {
+        "export_pdf": {"concurrency": 2, "queue": 4, "timeout": 15, "retry_after": 30},
+        "export_excel": {"concurrency": 3, "queue": 6, "timeout": 10, "retry_after": 15},
+        "search_unfiltered": {"concurrency": 3, "queue": 6, "timeout": 5, "retry_after": 10},
+    },
+}
+
 LANGUAGE_COOKIE_NAME = "django_language"
 LANGUAGE_COOKIE_SAMESITE = "Lax"
 LANGUAGE_COOKIE_SECURE = False      # set True only if your site is HTTPS-only
@@ -103,19 +170,53 @@ TEMPLATES = [{
     ]},
 }]
 WSGI_APPLICATION = "civil_list.wsgi.application"
-DATABASES = {
-  "default": {
-    "ENGINE": "django.db.backends.mysql",
-    "NAME": "civil_hrms6",
-    "USER": "root",
-    "PASSWORD": "umarf123@",
-    "HOST": "127.0.0.1",
-    "PORT": "3306",
-    "OPTIONS": {"charset":"utf8mb4","init_command":"SET sql_mode='STRICT_TRANS_TABLES'"},
-  }
+# Connections are kept open for CONN_MAX_AGE seconds and pinged before reuse, so a
+# connection dropped by the server is reopened instead of failing the request.
+_CONN = {
+    "CONN_MAX_AGE": int(os.getenv("HR_DB_CONN_MAX_AGE", "60")),
+    "CONN_HEALTH_CHECKS": True,
 }
+
+if os.getenv("HR_DB_SQLITE_DIR"):
+    # Local primary + reporting pair; `manage.py sync_reporting_db` copies primary -> reporting
+    _SQLITE_DIR = Path(os.getenv("HR_DB_SQLITE_DIR"))
+    DATABASES = {
+        "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": _SQLITE_DIR / "primary.sqlite3", **_CONN},
+        "reporting": {"ENGINE": "django.db.backends.sqlite3", "NAME": _SQLITE_DIR / "reporting.sqlite3", **_CONN,
+                      "TEST": {"MIRROR": "default"}},
+    }
+else:
+    DATABASES = {
+      "default": {
+        "ENGINE": "django.db.backends.mysql",
+        "NAME": "civil_hrms6",
+        "USER": "root",
+        "PASSWORD": "umarf123@",
+        "HOST": "127.0.0.1",
+        "PORT": "3306",
+        "OPTIONS": {"charset":"utf8mb4","init_command":"SET sql_mode='STRICT_TRANS_TABLES'"},
+        **_CONN,
+      }
+    }
+    if os.getenv("HR_DB_REPLICA_HOST"):
+        DATABASES["reporting"] = {
+            **DATABASES["default"],
+            "HOST": os.getenv("HR_DB_REPLICA_HOST"),
+            "PORT": os.getenv("HR_DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+            "TEST": {"MIRROR": "default"},
+        }
+
+# Search/exports/reports read from this alias when it exists (hr/routers.py)
+HR_REPORTING_DB = "reporting"
+DATABASE_ROUTERS = ["hr.routers.ReportingRouter"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Media served by hr/media.py; "x-accel-redirect" needs an nginx `internal` location
+# at accel_prefix aliased to MEDIA_ROOT
+HR_MEDIA = {
+    "sendfile": os.getenv("HR_MEDIA_SENDFILE") or None,
+    "accel_prefix": "/protected-media/",
+}
 LANGUAGE_CODE="en-us"; TIME_ZONE="Asia/Kolkata"; USE_I18N=True; USE_TZ=True
 STATIC_URL="static/"; STATIC_ROOT=BASE_DIR/"staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
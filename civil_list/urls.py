@@ -1,8 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import RedirectView
 from django.conf import settings
-from django.conf.urls.static import static
+from django.contrib.auth import views as auth_views
+from hr.auth_forms import HRMSAuthenticationForm
+from hr.media import serve_media
+from hr.views import PasswordChangeView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -16,8 +19,15 @@ urlpatterns = [
     # optional: send / to /hr/portal/
     path('', RedirectView.as_view(url='/hr/portal/', permanent=False)),
 
+    # HRMS ID / username login (single-pass, throttled); must precede the auth.urls include
+    path('accounts/login/', auth_views.LoginView.as_view(authentication_form=HRMSAuthenticationForm), name='login'),
+    path('accounts/password_change/', PasswordChangeView.as_view(), name='password_change'),
     path('accounts/', include('django.contrib.auth.urls')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Uploaded files, for staff and the owning employee only (hr/media.py), with ETag/304 and
+# long-lived private caching for content-addressed names; set HR_MEDIA["sendfile"] to let
+# the front-end server send the bytes from an internal location
+urlpatterns += [
+    re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), serve_media, name="media"),
+]
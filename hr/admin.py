@@ -1,8 +1,12 @@
+import zipfile
+
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
 from django import forms
-from django.utils.html import format_html
-from . import models
+from django.contrib import messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+from . import models, pagecache, photo_ingest, photos, snapshot
 from .resources import EmployeeResource
 
 # Try to use shared max size if present in models; fallback to 30 KB
@@ -22,11 +26,57 @@ class CollegeAdmin(admin.ModelAdmin):
     search_fields = ("name", "code")
 
 
+@admin.register(models.SanctionedPost)
+class SanctionedPostAdmin(admin.ModelAdmin):
+    list_display = ("college", "designation", "sanctioned")
+    list_editable = ("sanctioned",)
+    list_filter = ("college",)
+    list_select_related = ("college",)
+    search_fields = ("college__name", "designation")
+    autocomplete_fields = ("college",)
+
+
+# Rows stand for distinct values of the text columns (hr/normalize.py): a name is fixed
+# once created, since renaming it would leave the text it was matched from behind
+class MasterAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+    def get_readonly_fields(self, request, obj=None):
+        return ("name",) if obj else ()
+
+
+@admin.register(models.District)
+class DistrictAdmin(MasterAdmin):
+    list_display = ("name", "state")
+    list_filter = ("state",)
+
+
+@admin.register(models.DesignationMaster)
+class DesignationMasterAdmin(MasterAdmin):
+    list_display = ("name", "level")
+
+
+@admin.register(models.ServiceMaster)
+class ServiceMasterAdmin(MasterAdmin):
+    list_display = ("name",)
+
+
+@admin.register(models.PayLevelMaster)
+class PayLevelMasterAdmin(MasterAdmin):
+    list_display = ("name",)
+
+
 # -----------------------------
 # Inlines
 # -----------------------------
 class InlineBase(admin.TabularInline):
     extra = 0
+    # A <select> of every User per inline row was one query per row; raw id avoids it
+    raw_id_fields = ("approved_by",)
+
+    def get_queryset(self, request):
+        # row __str__ (shown above each inline row) reads employee.hrms_id
+        return super().get_queryset(request).select_related("employee")
 
 class EducationInline(InlineBase):        model = models.Education
 class PostingInline(InlineBase):          model = models.Posting
@@ -75,6 +125,10 @@ class EmployeeAdminForm(forms.ModelForm):
         return f
 
 
+class PhotoZipForm(forms.Form):
+    zip_file = forms.FileField(label="ZIP file", widget=forms.ClearableFileInput(attrs={"accept": ".zip"}))
+
+
 @admin.register(models.Employee)
 class EmployeeAdmin(ImportExportModelAdmin):
     resource_class = EmployeeResource
@@ -91,12 +145,13 @@ class EmployeeAdmin(ImportExportModelAdmin):
     present_posting_display.short_description = "Present Posting"
 
     # Photo thumbnail column
+    # Derived 96px/320px copies (hr/photos.py), not the original upload
     def photo_thumb(self, obj):
         if getattr(obj, "photo", None):
             try:
-                return format_html(
-                    '<img src="{}" style="height:40px;width:40px;object-fit:cover;'
-                    'border-radius:50%;border:1px solid #ddd;" />', obj.photo.url
+                return photos.picture_html(
+                    obj, "thumb", style="height:40px;width:40px;object-fit:cover;"
+                    "border-radius:50%;border:1px solid #ddd;"
                 )
             except Exception:
                 return "—"
@@ -107,15 +162,15 @@ class EmployeeAdmin(ImportExportModelAdmin):
     def photo_preview(self, obj):
         if getattr(obj, "photo", None):
             try:
-                return format_html(
-                    '<img src="{}" style="height:160px;border-radius:12px;'
-                    'border:1px solid #eee;object-fit:cover;" />', obj.photo.url
+                return photos.picture_html(
+                    obj, "preview", style="height:160px;border-radius:12px;border:1px solid #eee;object-fit:cover;"
                 )
             except Exception:
                 return "—"
         return "—"
     photo_preview.short_description = "Preview"
 
+    list_select_related = ("college", "present_posting_college")
     list_display = (
         "civil_list_no",
         "hrms_id",
@@ -140,8 +195,8 @@ class EmployeeAdmin(ImportExportModelAdmin):
     list_filter = (
         "college",
         "present_posting_college",
-        "current_designation",
-        "branch",
+        "designation_master",
+        "branch_master",
     )
     autocomplete_fields = (
         "college",
@@ -154,6 +209,32 @@ class EmployeeAdmin(ImportExportModelAdmin):
         AwardInline, PayScaleInline, AdvanceIncrementInline,
         LeaveInline, AllegationInline
     ]
+    actions = ["ingest_photos_zip"]
+
+    # Bulk photo upload (hr/photo_ingest.py); the intermediate page posts back to this action
+    @admin.action(description="Ingest photos from ZIP for selected employees", permissions=["change"])
+    def ingest_photos_zip(self, request, queryset):
+        form = PhotoZipForm(request.POST, request.FILES) if "apply" in request.POST else PhotoZipForm()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "form": form,
+            "count": queryset.count(),
+            "max_kb": MAX_PHOTO_BYTES // 1024,
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+        }
+        if form.is_bound and form.is_valid():
+            try:
+                # In-process: no process pool inside a web worker (the command uses one)
+                context["report"] = photo_ingest.ingest_zip(
+                    form.cleaned_data["zip_file"], employees=queryset, workers=0,
+                )
+            except zipfile.BadZipFile:
+                form.add_error("zip_file", "Not a valid ZIP file.")
+            else:
+                self.message_user(request, f"Photo ingest: {context['report'].summary()}.", messages.SUCCESS)
+        return TemplateResponse(request, "admin/hr/employee/ingest_photos.html", context)
 
 
 # -----------------------------
@@ -183,6 +264,51 @@ class SelfEditPermissionAdmin(admin.ModelAdmin):
     search_fields = ("employee__hrms_id", "employee__name")
 
 
+# -----------------------------
+# Service snapshots (derived; see hr/snapshot.py)
+# -----------------------------
+@admin.register(models.ServiceSnapshot)
+class ServiceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("employee", "posting_college", "posting_since", "on_deputation", "pay_level", "valid_until")
+    list_filter = ("on_deputation", "pay_level")
+    list_select_related = ("employee",)
+    search_fields = ("employee__hrms_id", "employee__name", "posting_college")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# -----------------------------
+# Service-timeline issues (derived; see hr/timeline.py)
+# -----------------------------
+@admin.register(models.TimelineIssue)
+class TimelineIssueAdmin(admin.ModelAdmin):
+    list_display = ("employee", "section", "kind", "start", "end", "detail", "run")
+    list_filter = ("section", "kind")
+    list_select_related = ("employee", "run")
+    search_fields = ("employee__hrms_id", "employee__name")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(models.TimelineRun)
+class TimelineRunAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "mode", "finished_at", "employees_checked", "issues_found")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # -----------------------------
 # Admin Site Branding
 # -----------------------------
@@ -193,18 +319,30 @@ admin.site.index_title = "DSTTE SEVA ITIHAS PORTAL"
 
 from django.utils import timezone
 
+def _after_status_update(queryset, employee_ids):
+    # queryset.update() sends no signals: do what the section receivers would have done
+    pagecache.invalidate(employee_ids, [pagecache.SECTIONS[queryset.model]])
+    if queryset.model in snapshot.SOURCES:
+        snapshot.refresh(employee_ids)
+
 def mark_approved(modeladmin, request, queryset):
+    employee_ids = set(queryset.values_list('employee_id', flat=True))
     queryset.update(status='APPROVED', approved_by=request.user, approved_at=timezone.now())
+    _after_status_update(queryset, employee_ids)
 mark_approved.short_description = "Mark selected as APPROVED"
 
 def mark_pending(modeladmin, request, queryset):
+    employee_ids = set(queryset.values_list('employee_id', flat=True))
     queryset.update(status='PENDING', approved_by=None, approved_at=None)
+    _after_status_update(queryset, employee_ids)
 mark_pending.short_description = "Mark selected as PENDING"
 
 def _register_with_approval(Model, base_admin=None, list_fields=None, search=None):
     from django.contrib import admin
     class _A((base_admin or admin.ModelAdmin)):
         list_display = tuple((list_fields or ())) + ('status',)
+        list_select_related = ('employee',)
+        raw_id_fields = ('employee', 'approved_by')
         actions = [mark_approved, mark_pending]
         search_fields = search or ()
     try:
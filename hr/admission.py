@@ -0,0 +1,236 @@
+# hr/admission.py
+"""
+Admission control for expensive staff endpoints (PDF/Excel exports, unfiltered search).
+
+Each limited endpoint has `concurrency` slot files and `queue` waiting-room files under
+<dir>/. A request takes a waiting-room file, then polls for a slot until `timeout`
+seconds pass. Both are exclusive, non-blocking flock()s, so the limits hold across all
+worker processes on the host. The kernel releases them when the file is closed or the
+process dies, so a crashed worker cannot leak a slot. When the waiting room is full or
+the wait times out, the request gets 429 with Retry-After; the portal keeps its share of
+DB and CPU during reporting spikes.
+
+On platforms without fcntl (Windows development) the decorator lets everything through.
+"""
+import asyncio
+import functools
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+logger = logging.getLogger("hr.admission")
+
+# Defaults; override any key via settings.HR_ADMISSION
+DEFAULTS = {
+    "enabled": True,
+    "dir": None,            # defaults to <BASE_DIR>/var/admission
+    "poll_interval": 0.05,  # seconds between slot attempts while queued
+    "limits": {},           # name -> {"concurrency", "queue", "timeout", "retry_after"}
+}
+LIMIT_DEFAULTS = {"concurrency": 2, "queue": 4, "timeout": 10, "retry_after": 10}
+
+
+def admission_conf():
+    conf = {**DEFAULTS, **getattr(settings, "HR_ADMISSION", {})}
+    conf["dir"] = Path(conf["dir"] or Path(settings.BASE_DIR) / "var" / "admission")
+    return conf
+
+
+def _try_lock(paths):
+    """fd holding an exclusive lock on one of `paths`, or None if all are taken."""
+    for path in random.sample(paths, len(paths)):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except OSError:
+            os.close(fd)
+    return None
+
+
+class Slot:
+    __slots__ = ("fd",)
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def release(self):
+        if self.fd is not None:
+            os.close(self.fd)   # closing drops the flock
+            self.fd = None
+
+
+class Gate:
+    def __init__(self, name, directory, poll_interval, concurrency, queue, timeout, retry_after):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.retry_after = retry_after
+        directory.mkdir(parents=True, exist_ok=True)
+        self.slots = [str(directory / f"{name}.slot{i}") for i in range(concurrency)]
+        self.waiting = [str(directory / f"{name}.queue{i}") for i in range(queue)]
+
+    def _enter_queue(self):
+        fd = _try_lock(self.slots)
+        if fd is not None:
+            return Slot(fd), None
+        return None, _try_lock(self.waiting) if self.waiting else None
+
+    def acquire(self):
+        slot, ticket = self._enter_queue()
+        if slot or ticket is None:
+            return slot
+        try:
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                fd = _try_lock(self.slots)
+                if fd is not None:
+                    return Slot(fd)
+            return None
+        finally:
+            os.close(ticket)
+
+    async def aacquire(self):
+        slot, ticket = self._enter_queue()
+        if slot or ticket is None:
+            return slot
+        try:
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                fd = _try_lock(self.slots)
+                if fd is not None:
+                    return Slot(fd)
+            return None
+        finally:
+            os.close(ticket)
+
+
+_gates = {}
+
+
+def get_gate(name):
+    """The Gate for `name`, or None when admission control is off or `name` is unlimited."""
+    if name in _gates:
+        return _gates[name]
+    conf = admission_conf()
+    gate = None
+    if fcntl is None:
+        logger.warning("fcntl not available: admission control disabled for %s", name)
+    elif conf["enabled"] and name in conf["limits"]:
+        limit = {**LIMIT_DEFAULTS, **conf["limits"][name]}
+        gate = Gate(name, conf["dir"], conf["poll_interval"], **limit)
+    _gates[name] = gate
+    return gate
+
+
+def _rejected(gate):
+    metrics.REGISTRY.inc("hr_admission_rejected_total", metrics._labels(endpoint=gate.name))
+    resp = HttpResponse(
+        f"Too many {gate.name.replace('_', ' ')} requests are running. Please retry in {gate.retry_after} seconds.",
+        status=429, content_type="text/plain; charset=utf-8",
+    )
+    resp["Retry-After"] = str(gate.retry_after)
+    return resp
+
+
+class _HeldStream:
+    """Streaming body that releases the slot once exhausted or closed (the response closes it)."""
+
+    def __init__(self, content, slot):
+        self.content = content
+        self.slot = slot
+
+    def close(self):
+        self.slot.release()
+
+
+class _SyncHeldStream(_HeldStream):
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except BaseException:
+            self.slot.release()
+            raise
+
+
+class _AsyncHeldStream(_HeldStream):
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await anext(self.content)
+        except BaseException:
+            self.slot.release()
+            raise
+
+
+def _release_after(response, slot):
+    if not response.streaming:
+        slot.release()
+        return response
+    # Streaming bodies are produced after the view returns: hold the slot until then
+    content = response.streaming_content
+    if response.is_async:
+        response.streaming_content = _AsyncHeldStream(content, slot)
+    else:
+        response.streaming_content = _SyncHeldStream(iter(content), slot)
+    return response
+
+
+def admission(name, when=None):
+    """
+    Limit concurrent executions of the decorated view to settings.HR_ADMISSION["limits"][name].
+    `when(request)` can restrict the limit to some requests (e.g. unfiltered searches only).
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def _async_view(request, *args, **kwargs):
+                gate = get_gate(name) if when is None or when(request) else None
+                if gate is None:
+                    return await view(request, *args, **kwargs)
+                slot = await gate.aacquire()
+                if slot is None:
+                    return _rejected(gate)
+                try:
+                    response = await view(request, *args, **kwargs)
+                except BaseException:
+                    slot.release()
+                    raise
+                return _release_after(response, slot)
+            return _async_view
+
+        @functools.wraps(view)
+        def _view(request, *args, **kwargs):
+            gate = get_gate(name) if when is None or when(request) else None
+            if gate is None:
+                return view(request, *args, **kwargs)
+            slot = gate.acquire()
+            if slot is None:
+                return _rejected(gate)
+            try:
+                response = view(request, *args, **kwargs)
+            except BaseException:
+                slot.release()
+                raise
+            return _release_after(response, slot)
+        return _view
+    return decorator
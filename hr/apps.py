@@ -2,3 +2,7 @@ from django.apps import AppConfig
 class HrConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "hr"
+
+    def ready(self):
+        # signal receivers that keep caches in sync with the models
+        from . import authcache, intervals, normalize, pagecache, photos, retirement, seniority, snapshot, strength, timeline  # noqa: F401
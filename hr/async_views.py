@@ -0,0 +1,172 @@
+# hr/async_views.py
+"""
+Streaming variants of search and the staff exports, for ASGI deployments (civil_list/asgi.py).
+
+Rows are fetched in keyset-paginated chunks (hrms_id is unique) through
+sync_to_async(thread_sensitive=True) and written to the client from async generators,
+so a slow download holds a coroutine instead of a worker thread. Excel and PDF cannot
+be produced incrementally: their rows are streamed out of the DB the same way, the file
+is built in a worker thread, and the bytes are then streamed in blocks.
+"""
+import csv
+import io
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import user_passes_test
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+
+from . import metrics
+from .admission import admission
+from .routers import reporting_reads, use_reporting_db
+from .views import _filtered_qs, _is_staff, _is_unfiltered
+
+CHUNK_SIZE = 500
+BLOCK_SIZE = 64 * 1024
+COLUMNS = ("hrms_id", "name", "current_designation", "branch", "college_name", "present_posting")
+HEADERS = ["HRMS", "Name", "Designation", "Branch", "College", "Posting"]
+
+
+def _fetch_chunk(qs, after):
+    if after is not None:
+        qs = qs.filter(hrms_id__gt=after)
+    return list(qs.values(*COLUMNS)[:CHUNK_SIZE])
+
+
+async def aiter_rows(qs):
+    """Yield lists of row dicts, CHUNK_SIZE at a time, reading from the reporting alias."""
+    fetch = sync_to_async(_fetch_chunk, thread_sensitive=True)
+    after = None
+    while True:
+        # The generator runs after the view has returned, outside @use_reporting_db
+        with reporting_reads():
+            rows = await fetch(qs, after)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < CHUNK_SIZE:
+            return
+        after = rows[-1]["hrms_id"]
+
+
+async def _ablocks(data):
+    for start in range(0, len(data), BLOCK_SIZE):
+        yield data[start:start + BLOCK_SIZE]
+
+
+# === Search ======================================================
+@user_passes_test(_is_staff)
+@use_reporting_db
+@admission("search_unfiltered", when=_is_unfiltered)
+async def search_stream(request):
+    qs = _filtered_qs(request)
+    count = await qs.acount()
+    page = await sync_to_async(render_to_string)(
+        "search.html", {"qs": qs, "count": count, "streaming": True}, request
+    )
+    head, tail = page.split("<!--rows-->", 1)
+    rows_template = get_template("search_rows.html")
+
+    async def body():
+        yield head
+        async for rows in aiter_rows(qs):
+            yield rows_template.render({"rows": rows})
+        if not count:
+            yield '<tr><td colspan="6" class="px-4 py-6 text-center text-slate-500">No records</td></tr>'
+        yield tail
+
+    return StreamingHttpResponse(body(), content_type="text/html; charset=utf-8")
+
+
+# === Exports =====================================================
+@user_passes_test(_is_staff)
+@use_reporting_db
+async def export_csv_stream(request):
+    qs = _filtered_qs(request)
+
+    async def body():
+        started, total = time.perf_counter(), 0
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(HEADERS)
+        async for rows in aiter_rows(qs):
+            writer.writerows([r[c] for c in COLUMNS] for r in rows)
+            total += len(rows)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+        metrics.observe_export("csv", total, time.perf_counter() - started)
+
+    resp = StreamingHttpResponse(body(), content_type="text/csv")
+    resp["Content-Disposition"] = "attachment; filename=employees.csv"
+    return resp
+
+
+def _build_xlsx(chunks):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Employees")
+    ws.append(HEADERS)
+    for rows in chunks:
+        for r in rows:
+            ws.append([r[c] for c in COLUMNS])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _build_pdf(rows):
+    from xhtml2pdf import pisa
+
+    buf = io.BytesIO()
+    pisa.CreatePDF(src=render_to_string("report.html", {"qs": rows}), dest=buf)
+    return buf.getvalue()
+
+
+async def _collect(qs):
+    return [rows async for rows in aiter_rows(qs)]
+
+
+@user_passes_test(_is_staff)
+@use_reporting_db
+@admission("export_excel")
+async def export_excel_stream(request):
+    qs = _filtered_qs(request)
+
+    async def body():
+        started = time.perf_counter()
+        chunks = await _collect(qs)
+        # CPU-bound and DB-free: any pool thread will do
+        data = await sync_to_async(_build_xlsx, thread_sensitive=False)(chunks)
+        async for block in _ablocks(data):
+            yield block
+        metrics.observe_export("excel", sum(map(len, chunks)), time.perf_counter() - started)
+
+    resp = StreamingHttpResponse(
+        body(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    resp["Content-Disposition"] = "attachment; filename=employees.xlsx"
+    return resp
+
+
+@user_passes_test(_is_staff)
+@use_reporting_db
+@admission("export_pdf")
+async def export_pdf_stream(request):
+    qs = _filtered_qs(request)
+
+    async def body():
+        started = time.perf_counter()
+        rows = [r for chunk in await _collect(qs) for r in chunk]
+        data = await sync_to_async(_build_pdf, thread_sensitive=False)(rows)
+        async for block in _ablocks(data):
+            yield block
+        metrics.observe_export("pdf", len(rows), time.perf_counter() - started)
+
+    resp = StreamingHttpResponse(body(), content_type="application/pdf")
+    resp["Content-Disposition"] = "attachment; filename=employees.pdf"
+    return resp
@@ -4,11 +4,14 @@ from django.contrib.auth.forms import AuthenticationForm, UsernameField
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 
+from .throttle import LoginThrottle
+
 
 class HRMSAuthenticationForm(AuthenticationForm):
     """
     Login with a single field named 'username' (labelled 'HRMS ID / Username').
-    Tries authenticate(hrms_id=..., password=...) first, then authenticate(username=..., ...).
+    Calls authenticate(identifier=..., password=...) once; HRMSIDBackend resolves
+    HRMS ID or username in one query and verifies the password exactly once.
     """
     username = UsernameField(
         label=_("HRMS ID / Username"),
@@ -32,8 +35,11 @@ class HRMSAuthenticationForm(AuthenticationForm):
     error_messages = {
         "invalid_login": _("Invalid HRMS ID/Username or password."),
         "inactive": _("This account is inactive."),
+        "throttled": _("Too many failed login attempts. Please wait a few minutes and try again."),
     }
 
+    throttled = False
+
     def clean(self):
         # by this point field-level cleaning has run; use cleaned_data
         ident = (self.cleaned_data.get("username") or "").strip()
@@ -42,18 +48,12 @@ class HRMSAuthenticationForm(AuthenticationForm):
         if not ident or not pwd:
             raise forms.ValidationError(self.error_messages["invalid_login"], code="invalid_login")
 
-        user = None
+        # Cheap cache check first so a throttled attempt never reaches the password hasher
+        if LoginThrottle(self.request, ident).blocked():
+            self.throttled = True
+            raise forms.ValidationError(self.error_messages["throttled"], code="throttled")
 
-        # 1) Try custom backend that accepts hrms_id=...
-        try:
-            user = authenticate(self.request, hrms_id=ident, password=pwd)
-        except TypeError:
-            # backend may not accept hrms_id kwarg — ignore
-            user = None
-
-        # 2) Fallback: normal username
-        if user is None:
-            user = authenticate(self.request, username=ident, password=pwd)
+        user = authenticate(self.request, identifier=ident, password=pwd)
 
         if user is None:
             raise forms.ValidationError(self.error_messages["invalid_login"], code="invalid_login")
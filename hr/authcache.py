@@ -0,0 +1,156 @@
+# hr/authcache.py
+"""
+Cached request.user for the portal.
+
+The user is stored together with its employee_profile and employee_profile.self_edit_perm
+(select_related), so request.user, request.user.employee_profile and emp.self_edit_perm
+cost no queries on a warm cache. Snapshots are keyed by the session's user id and dropped
+by the signal receivers below whenever User, Employee or SelfEditPermission change; code
+that writes Employee rows without signals (queryset.update, bulk_update) calls
+invalidate_employees() itself. Drops happen once the transaction commits, so a request
+racing the write cannot re-cache the state from before it.
+
+The password hash is not cached: the snapshot carries the session auth hashes computed
+from it (current SECRET_KEY, then SECRET_KEY_FALLBACKS) and `password` is left deferred,
+so check_password() loads it on demand and save() never writes a blank one back.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+
+from .models import Employee, SelfEditPermission
+
+User = get_user_model()
+
+KEY = "hr:authsnap:%s"
+BATCH_SIZE = 500
+
+
+def _cache():
+    return caches[getattr(settings, "HR_AUTH_CACHE", "default")]
+
+
+def _timeout():
+    return getattr(settings, "HR_AUTH_CACHE_TIMEOUT", 900)
+
+
+def _load(user_id):
+    user = (
+        User._default_manager
+        .select_related("employee_profile__self_edit_perm")
+        .filter(pk=user_id)
+        .first()
+    )
+    if user is not None and hasattr(user, "get_session_auth_hash"):
+        user._session_auth_hashes = [user.get_session_auth_hash()] + [
+            user._get_session_auth_hash(secret=secret) for secret in settings.SECRET_KEY_FALLBACKS
+        ]
+        # Drop the hash from the instance: the field becomes deferred (loaded again on access)
+        del user.__dict__["password"]
+    return user
+
+
+def get_snapshot(user_id):
+    cache = _cache()
+    user = cache.get(KEY % user_id)
+    if user is None:
+        user = _load(user_id)
+        if user is not None:
+            cache.set(KEY % user_id, user, _timeout())
+    return user
+
+
+def invalidate(*user_ids):
+    """Drop these users' snapshots once the current transaction commits (at once outside one)."""
+    keys = [KEY % uid for uid in user_ids if uid]
+    if keys:
+        transaction.on_commit(functools.partial(_delete, keys))
+
+
+def _delete(keys):
+    _cache().delete_many(keys)
+
+
+def invalidate_employees(employee_ids):
+    """Drop the snapshots of the users linked to these employees (writes that send no signals)."""
+    employee_ids = list(employee_ids)
+    for start in range(0, len(employee_ids), BATCH_SIZE):
+        invalidate(*Employee.objects.filter(
+            pk__in=employee_ids[start:start + BATCH_SIZE], user__isnull=False,
+        ).values_list("user_id", flat=True))
+
+
+def _session_hash_ok(request, user):
+    """Same check as django.contrib.auth.get_user(), including SECRET_KEY_FALLBACKS."""
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not session_hash:
+        return False
+    current, *fallbacks = getattr(user, "_session_auth_hashes", None) or [user.get_session_auth_hash()]
+    if constant_time_compare(session_hash, current):
+        return True
+    for fallback_hash in fallbacks:
+        if constant_time_compare(session_hash, fallback_hash):
+            request.session.cycle_key()
+            request.session[auth.HASH_SESSION_KEY] = current
+            return True
+    return False
+
+
+def get_user(request):
+    """Drop-in for django.contrib.auth.get_user() that reads the user snapshot from the cache."""
+    try:
+        user_id = User._meta.pk.to_python(request.session[auth.SESSION_KEY])
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    user = get_snapshot(user_id)
+    backend = auth.load_backend(backend_path)
+    if user is None or not getattr(backend, "user_can_authenticate", lambda u: True)(user):
+        return AnonymousUser()
+    if hasattr(user, "get_session_auth_hash") and not _session_hash_ok(request, user):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+async def aget_user(request):
+    return await sync_to_async(get_user)(request)
+
+
+# --- Invalidation -----------------------------------------------------------
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, **kwargs):
+    invalidate(instance.pk)
+
+
+@receiver(post_init, sender=Employee)
+def _employee_loaded(sender, instance, **kwargs):
+    # The user link as loaded (never a query for a deferred one), so the previously linked
+    # user's snapshot is dropped too when the link moves
+    instance._authcache_user_id = instance.__dict__.get("user_id")
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def _employee_changed(sender, instance, **kwargs):
+    invalidate(instance.user_id, getattr(instance, "_authcache_user_id", None))
+    instance._authcache_user_id = instance.user_id
+
+
+@receiver(post_save, sender=SelfEditPermission)
+@receiver(post_delete, sender=SelfEditPermission)
+def _permission_changed(sender, instance, **kwargs):
+    invalidate(Employee.objects.filter(pk=instance.employee_id).values_list("user_id", flat=True).first())
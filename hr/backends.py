@@ -1,25 +1,49 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from hr.models import Employee
+from django.db.models import IntegerField, Value
+
+from .throttle import LoginThrottle
+
 User = get_user_model()
 
+
+def resolve_login_user(identifier):
+    """
+    Map an HRMS ID or a username to at most one user with a single query.
+    Both branches of the UNION hit a unique index (employee.hrms_id, auth_user.username);
+    an HRMS ID match wins over a username match, as the login form always did.
+    """
+    by_hrms = User._default_manager.filter(employee_profile__hrms_id=identifier).annotate(
+        via_hrms=Value(1, output_field=IntegerField())
+    )
+    by_username = User._default_manager.filter(**{User.USERNAME_FIELD: identifier}).annotate(
+        via_hrms=Value(0, output_field=IntegerField())
+    )
+    return by_hrms.union(by_username).order_by("-via_hrms").first()
+
+
 class HRMSIDBackend(ModelBackend):
-    def authenticate(self, request, hrms_id=None, username=None, password=None, **kwargs):
-        if hrms_id:
-            try:
-                emp = Employee.objects.select_related("user").get(hrms_id=hrms_id, user__isnull=False)
-            except Employee.DoesNotExist:
-                return None
-            user = emp.user
-            if user and user.check_password(password) and self.user_can_authenticate(user):
-                return user
+    """
+    The only authentication backend: accepts identifier=, hrms_id= or username= (admin login).
+    - one query resolves the identifier, the password is hashed exactly once per attempt
+      (a dummy hash runs for unknown identifiers so timing does not leak which exist)
+    - throttled identifiers/IPs are rejected before any hashing
+    """
+
+    def authenticate(self, request, username=None, password=None, hrms_id=None, identifier=None, **kwargs):
+        ident = (identifier or hrms_id or username or kwargs.get(User.USERNAME_FIELD) or "").strip()
+        if not ident or password is None:
             return None
-        if username:
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
-        return None
 
+        throttle = LoginThrottle(request, ident)
+        if throttle.blocked():
+            return None
+
+        user = resolve_login_user(ident)
+        if user is None:
+            User().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            throttle.succeeded()
+            return user
+        throttle.failed()
+        return None
@@ -0,0 +1,101 @@
+# hr/compliance.py
+"""
+APAR and property-return compliance: employees x years, per return type.
+
+One grouped query per model (employee, year -> submitted?, approved?) fills a sparse
+dict {employee_id: {year: state}} holding only the cells that have a row; every other
+cell is MISSING. A cadre of thousands over ten years is a few tens of thousands of
+small ints, built in one pass.
+
+States: APPROVED (submitted and approved), SUBMITTED (submitted, awaiting approval),
+MISSING (no row, or a row not marked submitted). The view pages over employees; the
+XLSX export writes the whole filtered matrix with openpyxl in write-only mode
+(imported on first use).
+"""
+import tempfile
+
+from django.db.models import Case, IntegerField, Max, Value, When
+from django.utils import timezone
+
+from .models import Apar, Employee, PropertyReturn
+from .normalize import branch_filter, college_filter
+
+MISSING, SUBMITTED, APPROVED = 0, 1, 2
+STATE_LABELS = {MISSING: "Missing", SUBMITTED: "Submitted", APPROVED: "Approved"}
+RETURNS = {"apar": Apar, "property": PropertyReturn}
+RETURN_LABELS = {"apar": "APAR", "property": "PR"}
+DEFAULT_YEARS = 10
+
+
+def default_years():
+    """The last DEFAULT_YEARS completed calendar years."""
+    this_year = timezone.localdate().year
+    return list(range(this_year - DEFAULT_YEARS, this_year))
+
+
+def employees(college=None, branch=None):
+    """Employees filtered by college and branch: a master id, or text matched against the master names."""
+    qs = Employee.objects.all()
+    if college:
+        qs = qs.filter(college_filter(college))
+    if branch:
+        qs = qs.filter(branch_filter(branch))
+    return qs.order_by("hrms_id")
+
+
+def cells(Model, employee_filter, years):
+    """{employee_id: {year: SUBMITTED|APPROVED}} from one grouped query (MISSING cells are absent)."""
+    submitted = Max(Case(When(submitted=True, then=Value(1)), default=Value(0), output_field=IntegerField()))
+    approved = Max(Case(
+        When(submitted=True, status="APPROVED", then=Value(1)), default=Value(0), output_field=IntegerField(),
+    ))
+    rows = (
+        Model.objects.filter(employee_id__in=employee_filter, year__in=years)
+        .values("employee_id", "year")
+        .annotate(any_submitted=submitted, any_approved=approved)
+        .order_by()
+    )
+    sparse = {}
+    for row in rows:
+        if row["any_submitted"]:
+            sparse.setdefault(row["employee_id"], {})[row["year"]] = APPROVED if row["any_approved"] else SUBMITTED
+    return sparse
+
+
+def matrix(employee_filter, years):
+    """{return code: sparse cells} for every return type."""
+    return {code: cells(Model, employee_filter, years) for code, Model in RETURNS.items()}
+
+
+def rows(employee_values, sparse, years):
+    """(employee dict, [(return code, [state per year])]) for templates and exports."""
+    for emp in employee_values:
+        yield emp, [
+            (code, [sparse[code].get(emp["pk"], {}).get(year, MISSING) for year in years])
+            for code in RETURNS
+        ]
+
+
+EMPLOYEE_COLUMNS = ("pk", "hrms_id", "name", "college__name", "college_name", "branch")
+
+
+def write_xlsx(employee_qs, years):
+    """Spooled temporary file with the whole matrix as XLSX (caller closes it)."""
+    from openpyxl import Workbook
+
+    sparse = matrix(employee_qs.values("pk"), years)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Compliance")
+    ws.append(["HRMS", "Name", "College", "Branch"] + [
+        f"{RETURN_LABELS[code]} {year}" for code in RETURNS for year in years
+    ])
+    values = employee_qs.values(*EMPLOYEE_COLUMNS).iterator(chunk_size=2000)
+    for emp, states in rows(values, sparse, years):
+        ws.append(
+            [emp["hrms_id"], emp["name"], emp["college__name"] or emp["college_name"], emp["branch"]]
+            + [STATE_LABELS[state] for _, per_year in states for state in per_year]
+        )
+    out = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    wb.save(out)
+    out.seek(0)
+    return out
@@ -0,0 +1,160 @@
+# hr/intervals.py
+"""
+Interval queries over LeaveRecord (period_from..period_to, both days inclusive).
+
+"Which leaves cover day X / overlap [a, b]?" is start <= b AND end >= a, and an index
+can only range-scan one side of that. The other side is bounded with the longest leave
+on record (max_span()): a matching leave must start in [a - max_span, b], so both the
+DB queries below and IntervalIndex scan a narrow slice of the (period_from, period_to)
+index however many rows exist. max_span is cached and only ever raised by the receiver
+below, so it stays a safe upper bound; code that bulk-creates leaves calls
+reset_max_span().
+
+IntervalIndex is the in-memory counterpart (sorted starts + bisect), used for the
+overlap check at submit time (views._portal_formset) and by callers that query the same
+set of leaves repeatedly.
+"""
+import datetime
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import DurationField, ExpressionWrapper, F, Max
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import LeaveRecord
+from .normalize import college_filter
+
+MAX_SPAN_KEY = "hr:leave-max-span-days"
+
+# Defaults; override any key via settings.HR_LEAVE_INTERVALS
+DEFAULTS = {
+    "cache": "shared",
+    "max_span_timeout": 24 * 3600,  # seconds; recomputed after this even without a reset
+    "statuses": ("APPROVED",),  # what on_leave() counts by default
+}
+
+
+def intervals_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_LEAVE_INTERVALS", {})}
+
+
+class IntervalIndex:
+    """Closed date intervals (start, end, item), sorted by start, with overlap queries."""
+
+    def __init__(self, intervals):
+        self._items = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self._starts = [i[0] for i in self._items]
+        self._max_span = max((end - start for start, end, _ in self._items), default=datetime.timedelta(0))
+
+    def __len__(self):
+        return len(self._items)
+
+    def overlapping(self, start, end):
+        """Intervals sharing at least one day with [start, end]."""
+        lo = bisect_left(self._starts, start - self._max_span)
+        hi = bisect_right(self._starts, end)
+        return [i for i in self._items[lo:hi] if i[1] >= start]
+
+    def at(self, day):
+        return self.overlapping(day, day)
+
+    def overlaps(self):
+        """Every pair of intervals that overlap each other (one sweep over the sorted starts)."""
+        pairs, active = [], []
+        for current in self._items:
+            active = [i for i in active if i[1] >= current[0]]
+            pairs.extend((i, current) for i in active)
+            active.append(current)
+        return pairs
+
+
+# --- DB queries ----------------------------------------------------------------
+def max_span():
+    """Upper bound on (period_to - period_from) over all leaves, in days."""
+    conf = intervals_conf()
+    cache = caches[conf["cache"]]
+    days = cache.get(MAX_SPAN_KEY)
+    if days is None:
+        span = LeaveRecord.objects.aggregate(
+            span=Max(ExpressionWrapper(F("period_to") - F("period_from"), output_field=DurationField()))
+        )["span"]
+        days = max(span.days, 0) if span else 0
+        cache.set(MAX_SPAN_KEY, days, conf["max_span_timeout"])
+    return days
+
+
+def reset_max_span():
+    caches[intervals_conf()["cache"]].delete(MAX_SPAN_KEY)
+
+
+def overlapping(start, end, queryset=None):
+    """LeaveRecords sharing at least one day with [start, end]."""
+    queryset = LeaveRecord.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        period_from__gte=start - datetime.timedelta(days=max_span()),
+        period_from__lte=end,
+        period_to__gte=start,
+    )
+
+
+def on_leave(start, end=None, college=None, statuses=None):
+    """Leaves (with employee and college) covering `start`, or overlapping [start, end]."""
+    statuses = statuses or intervals_conf()["statuses"]
+    qs = overlapping(start, end or start, LeaveRecord.objects.filter(status__in=statuses))
+    if college:
+        qs = qs.filter(college_filter(college, "employee__"))
+    return qs.select_related("employee", "employee__college").order_by("period_from", "employee__hrms_id")
+
+
+# --- Submit-time validation ----------------------------------------------------------------
+def check_formset(employee, formset):
+    """
+    Add an error to each leave form whose period is reversed or overlaps another of the
+    employee's leaves (submitted in this formset or already stored); True if any.
+    """
+    submitted, editing = [], set()
+    for form in formset.forms:
+        if form.instance.pk:
+            editing.add(form.instance.pk)
+        data = getattr(form, "cleaned_data", None) or {}
+        if not data or data.get("DELETE"):
+            continue
+        start, end = data.get("period_from"), data.get("period_to")
+        if not (start and end):
+            continue
+        if end < start:
+            form.add_error("period_to", "Leave cannot end before it starts.")
+            continue
+        submitted.append((start, end, form))
+    if not submitted:
+        return any(form.errors for form in formset.forms)
+
+    # Stored leaves outside this formset (e.g. approved ones), bounded to the submitted range
+    stored = overlapping(
+        min(s for s, _, _ in submitted), max(e for _, e, _ in submitted),
+        LeaveRecord.objects.filter(employee=employee).exclude(pk__in=editing),
+    ).only("pk", "leave_type", "period_from", "period_to")
+    index = IntervalIndex(submitted + [(r.period_from, r.period_to, r) for r in stored])
+    for a, b in index.overlaps():
+        for mine, other in ((a, b), (b, a)):
+            if isinstance(mine[2], LeaveRecord):
+                continue
+            label = other[2].leave_type if isinstance(other[2], LeaveRecord) else other[2].cleaned_data.get("leave_type")
+            mine[2].add_error(
+                None, f"Overlaps {label or 'another leave'} from {other[0]:%d-%m-%Y} to {other[1]:%d-%m-%Y}."
+            )
+    return any(form.errors for form in formset.forms)
+
+
+@receiver(post_save, sender=LeaveRecord)
+def _leave_saved(sender, instance, **kwargs):
+    if not (instance.period_from and instance.period_to):
+        return
+    span = (instance.period_to - instance.period_from).days
+    conf = intervals_conf()
+    cache = caches[conf["cache"]]
+    current = cache.get(MAX_SPAN_KEY)
+    if current is not None and span > current:
+        cache.set(MAX_SPAN_KEY, span, conf["max_span_timeout"])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hr import normalize
+
+
+class Command(BaseCommand):
+    help = "Link free-text designation/branch/district/pay level/college columns to their master rows (hr/normalize.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would change.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        with transaction.atomic():
+            changed, created, unmatched = normalize.backfill(dry_run=dry_run)
+        verb = "Would create" if dry_run else "Created"
+        for label, count in created.items():
+            self.stdout.write(f"{verb} {count} {label}.")
+        verb = "Would link" if dry_run else "Linked"
+        for field, count in changed.items():
+            self.stdout.write(f"{verb} {count} row(s): {field}")
+        if unmatched:
+            self.stdout.write(self.style.WARNING(
+                f"{len(unmatched)} college name(s) match no College (add them, or fix the text):"
+            ))
+            for text, count in sorted(unmatched.items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  {count:5d}  {text}")
+        self.stdout.write(self.style.SUCCESS(f"{sum(changed.values())} row(s) {'to link' if dry_run else 'linked'}."))
@@ -0,0 +1,68 @@
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from hr.middleware import PathPolicyMiddleware
+
+
+class _Emp:
+    must_change_password = False
+
+
+class _User:
+    """Stand-in for a cached snapshot user: attribute reads only, like on a warm cache."""
+    is_authenticated = True
+    is_superuser = False
+
+    def __init__(self, must_change=False):
+        self.employee_profile = _Emp()
+        self.employee_profile.must_change_password = must_change
+
+
+class Command(BaseCommand):
+    help = "Measure PathPolicyMiddleware overhead per request (ns/request, excluding the view)."
+
+    PATHS = [
+        "/static/css/portal.css",
+        "/hr/portal/",
+        "/hr/portal/education/",
+        "/hr/search/",
+        "/admin/hr/employee/",
+        "/accounts/login/",
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=100000, help="Calls per measurement (default 100000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Measurements per case; the best is reported.")
+
+    def handle(self, *args, **options):
+        number, repeat = options["number"], options["repeat"]
+        response = HttpResponse()
+
+        def get_response(request):
+            return response
+
+        mw = PathPolicyMiddleware(get_response)
+        factory = RequestFactory()
+        users = {
+            "anonymous": AnonymousUser(),
+            "employee": _User(),
+            "must-change": _User(must_change=True),
+        }
+
+        def best_ns(fn):
+            return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9
+
+        for path in self.PATHS:
+            request = factory.get(path)
+            baseline = best_ns(lambda: get_response(request))
+            cells = []
+            for label, user in users.items():
+                request.user = user
+                cost = best_ns(lambda: mw(request)) - baseline
+                cells.append(f"{label}={cost:7.0f}")
+            self.stdout.write(f"{path:28s} " + "  ".join(cells))
+        self.stdout.write(self.style.SUCCESS(f"ns/request over best of {repeat} x {number} calls (view cost subtracted)."))
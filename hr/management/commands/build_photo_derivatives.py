@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from hr import photos
+from hr.models import Employee
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail/preview (JPEG + WebP) derivatives for employee photos that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild derivatives that already exist.")
+
+    def handle(self, *args, **options):
+        built = skipped = failed = 0
+        for emp in Employee.objects.exclude(photo="").exclude(photo__isnull=True).only("pk", "photo").iterator():
+            if photos.has_derivatives(emp.photo) and not options["force"]:
+                skipped += 1
+                continue
+            try:
+                photos.generate(emp.photo)
+                built += 1
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"{emp.photo.name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Built {built}, already present {skipped}, failed {failed}."))
@@ -0,0 +1,115 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a fresh worker must stay within after django.setup() plus loading the URLconf
+# (which every worker does on its first request). Override any key via settings.HR_IMPORT_BUDGET.
+DEFAULTS = {
+    "import_ms": 1000,      # sum of top-level import times reported by -X importtime
+    "rss_mb": 100,          # peak resident set size of the booted interpreter
+    # Export/report engines: imported on first use inside the views only
+    "forbidden": ["pandas", "xhtml2pdf", "reportlab", "pyhanko"],
+}
+
+# Runs in a clean interpreter so nothing this process already imported skews the numbers
+BOOT_SCRIPT = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+wall = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(json.dumps({"wall_ms": wall * 1000, "rss_kb": rss, "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a fresh interpreter (django.setup() + URLconf) under `python -X importtime` and fail "
+        "(exit 1) if import time, peak RSS or the set of loaded heavy modules exceeds the budget. For CI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Show the N most expensive top-level imports.")
+        parser.add_argument("--repeat", type=int, default=3, help="Boots to run; the fastest counts (default 3).")
+
+    def handle(self, *args, **options):
+        budget = {**DEFAULTS, **getattr(settings, "HR_IMPORT_BUDGET", {})}
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "civil_list.settings")}
+
+        runs = []
+        for _ in range(max(1, options["repeat"])):
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode:
+                raise CommandError(f"Boot failed:\n{proc.stderr[-3000:]}")
+            rows = parse_importtime(proc.stderr)
+            runs.append((sum(c for _, _, c, depth in rows if depth == 0), rows, json.loads(proc.stdout.splitlines()[-1])))
+        total_us, rows, boot = min(runs, key=lambda r: r[0])
+
+        import_ms = total_us / 1000
+        rss_mb = boot["rss_kb"] / 1024
+        loaded = set(boot["modules"])
+        forbidden = [m for m in budget["forbidden"] if m in loaded]
+
+        self.stdout.write(f"Most expensive top-level imports ({len(rows)} modules total):")
+        for name, _, cumulative, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:options["top"]]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
+        self.stdout.write(
+            f"Import time {import_ms:.0f} ms (budget {budget['import_ms']}), boot wall {boot['wall_ms']:.0f} ms, "
+            f"peak RSS {rss_mb:.1f} MB (budget {budget['rss_mb']})"
+        )
+
+        failures = []
+        if import_ms > budget["import_ms"]:
+            failures.append(f"import time {import_ms:.0f} ms > budget {budget['import_ms']} ms")
+        if rss_mb > budget["rss_mb"]:
+            failures.append(f"peak RSS {rss_mb:.1f} MB > budget {budget['rss_mb']} MB")
+        for module in forbidden:
+            chain = self._import_chain(rows, module)
+            failures.append(f"{module} is imported at boot" + (f" (via {chain})" if chain else ""))
+        if failures:
+            for line in failures:
+                self.stderr.write(line)
+            raise CommandError(f"{len(failures)} import budget violation(s).")
+        self.stdout.write(self.style.SUCCESS("Worker boot within import budget."))
+
+    @staticmethod
+    def _import_chain(rows, module):
+        """Top-level import that (transitively) pulled in `module`, e.g. 'hr.views -> pandas'."""
+        # -X importtime lists children before their parent, so the parent is the next shallower row
+        for i, (name, _, _, depth) in enumerate(rows):
+            if name != module:
+                continue
+            chain = [name]
+            for parent, _, _, parent_depth in rows[i + 1:]:
+                if parent_depth < depth:
+                    if parent != chain[-1]:
+                        chain.append(parent)
+                    depth = parent_depth
+                    if depth == 0:
+                        break
+            return " -> ".join(reversed(chain))
+        return ""
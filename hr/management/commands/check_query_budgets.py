@@ -0,0 +1,105 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+
+from hr import models
+from hr.nplusone import QueryInspector
+from hr.synthetic import SECTION_ROWS, isolated_environment, section_row
+
+# Max queries per page on a warm auth cache; override/extend with settings.HR_QUERY_BUDGETS.
+# Budgets must not depend on the number of rows: the fixture is built twice with different
+# sizes and both runs must stay within budget.
+QUERY_BUDGETS = {
+    "employee": {
+        "/hr/portal/": 0,
+        "/hr/portal/profile/": 0,
+        "/hr/portal/education/": 2,     # editable section: editable + approved rows
+    },
+    "staff": {
+        "/hr/search/": 2,
+        "/hr/export/csv/": 1,
+        "/admin/hr/employee/": 10,
+        "/admin/hr/employee/{pk}/change/": 20,
+        "/admin/hr/education/": 6,
+        "/admin/hr/posting/": 6,
+        "/admin/hr/leaverecord/": 6,
+    },
+}
+
+
+def build_fixture(employees, rows_per_section):
+    colleges = [models.College.objects.create(name=f"College {i}", code=f"C{i}") for i in range(3)]
+    emps = []
+    for i in range(employees):
+        emp = models.Employee.objects.create(
+            hrms_id=f"9{i:07d}", name=f"Employee {i}", college=colleges[i % 3],
+            present_posting_college=colleges[(i + 1) % 3], dob=datetime.date(1980, 1, 1 + i % 28),
+        )
+        emps.append(emp)
+        for Model in SECTION_ROWS:
+            Model.objects.bulk_create([
+                section_row(Model, emp, r, status="APPROVED" if r % 2 else "PENDING")
+                for r in range(rows_per_section)
+            ])
+    models.SelfEditPermission.objects.create(employee=emps[0], education=True, leaves=False)
+    models.Employee.objects.filter(pk__in=[e.pk for e in emps]).update(must_change_password=False)
+    employee_user = emps[0].user
+    employee_user.set_password("budget-pass")
+    employee_user.save()
+    staff = User.objects.create_superuser("budget-admin", "", "budget-pass")
+    return employee_user, staff, emps[0]
+
+
+class Command(BaseCommand):
+    help = "Fail (exit 1) if portal/search/admin pages exceed their query budgets or repeat a query (N+1). For CI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=int, default=3, help="Repeats of one query that count as N+1 (default 3).")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs.")
+
+    def handle(self, *args, **options):
+        budgets = {k: dict(v) for k, v in QUERY_BUDGETS.items()}
+        for who, pages in getattr(settings, "HR_QUERY_BUDGETS", {}).items():
+            budgets.setdefault(who, {}).update(pages)
+
+        failures = []
+        # Test database + private caches: test-DB user snapshots must never reach the shared cache
+        with isolated_environment(keepdb=options["keepdb"]):
+            for size in (2, 6):
+                failures += self._run(size, budgets, options["threshold"])
+
+        if failures:
+            for line in failures:
+                self.stderr.write(line)
+            raise CommandError(f"{len(failures)} query budget violation(s).")
+        self.stdout.write(self.style.SUCCESS("All pages within query budgets."))
+
+    def _run(self, size, budgets, threshold):
+        failures = []
+        with transaction.atomic():
+            employee_user, staff, emp = build_fixture(employees=size, rows_per_section=size)
+            clients = {"employee": Client(), "staff": Client()}
+            clients["employee"].force_login(employee_user)
+            clients["staff"].force_login(staff)
+            for who, pages in budgets.items():
+                for url, budget in pages.items():
+                    url = url.format(pk=emp.pk)
+                    clients[who].get(url)   # warm the auth snapshot and any page caches
+                    inspector = QueryInspector()
+                    with inspector.capture():
+                        response = clients[who].get(url)
+                    status = f"{response.status_code}"
+                    self.stdout.write(f"[{size:>2} rows] {who:8s} {url:40s} {inspector.total:3d} / {budget:3d}  HTTP {status}")
+                    if response.status_code >= 400:
+                        failures.append(f"{url}: HTTP {status}")
+                    if inspector.total > budget:
+                        failures.append(f"{url}: {inspector.total} queries > budget {budget}")
+                    report = inspector.report(threshold, url)
+                    if report:
+                        failures.append(report)
+            transaction.set_rollback(True)
+        return failures
@@ -0,0 +1,167 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, RequestFactory
+
+from hr import models
+from hr.nplusone import QueryInspector
+from hr.synthetic import isolated_environment, seed_cadre
+
+BENCH_PASSWORD = "Bench#2024pass"
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _formset_post_data(formset, touch_field=None, touch_value=None):
+    """Re-post a rendered formset as-is (optionally changing one field of the first form)."""
+    data = {}
+    for name, field in formset.management_form.fields.items():
+        data[formset.management_form.add_prefix(name)] = formset.management_form[name].value()
+    for i, form in enumerate(formset.forms):
+        for name in form.fields:
+            value = form[name].value()
+            if i == 0 and name == touch_field:
+                value = touch_value
+            if value is None or value is False:
+                continue
+            data[form.add_prefix(name)] = "on" if value is True else value
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic cadre in a throw-away test database and time the key paths "
+        "(search, exports, portal formsets, import, login, admin changelists). Emits JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=500, help="Synthetic employees to seed (default 500).")
+        parser.add_argument("--photos", action="store_true", help="Also generate a photo per employee.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for the generator (default 1).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default 5).")
+        parser.add_argument("--skip", nargs="*", default=[], help="Benchmark names to skip, e.g. export_pdf.")
+        parser.add_argument("--only", nargs="*", default=[], help="Run only these benchmark names.")
+        parser.add_argument("--output", help="Write the JSON result here instead of stdout.")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs.")
+
+    def handle(self, *args, **options):
+        with isolated_environment(keepdb=options["keepdb"]):
+            started = time.perf_counter()
+            seed_cadre(employees=options["employees"], photos=options["photos"], seed=options["seed"])
+            seed_secs = time.perf_counter() - started
+            self.stderr.write(f"Seeded {options['employees']} employees in {seed_secs:.1f}s")
+            results = self._run_all(options)
+
+        report = {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "db_vendor": connection.vendor,
+            "params": {k: options[k] for k in ("employees", "photos", "seed", "repeat")},
+            "seed_seconds": round(seed_secs, 3),
+            "results": results,
+        }
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(text)
+
+    # --- Benchmarks ------------------------------------------------------------
+    def _run_all(self, options):
+        from hr.views import _filtered_qs
+
+        emp = models.Employee.objects.order_by("pk").first()
+        emp.save()   # fires ensure_user_for_employee for this one employee
+        emp.refresh_from_db()
+        emp.user.set_password(BENCH_PASSWORD)
+        emp.user.save()
+        models.Employee.objects.filter(pk=emp.pk).update(must_change_password=False)
+        models.SelfEditPermission.objects.update_or_create(employee=emp, defaults={"education": True})
+        staff = User.objects.create_superuser("hrbench-admin", "", BENCH_PASSWORD)
+
+        employee_client, staff_client = Client(), Client()
+        employee_client.force_login(emp.user)
+        staff_client.force_login(staff)
+        rf = RequestFactory()
+        college = models.College.objects.order_by("pk").first()
+
+        def formset_post():
+            response = employee_client.get("/hr/portal/education/")
+            data = _formset_post_data(response.context["formset"], "subject", f"Bench {time.perf_counter()}")
+            return employee_client.post("/hr/portal/education/", data)
+
+        def import_employees():
+            from hr.resources import EmployeeResource
+            dataset = EmployeeResource().export(queryset=models.Employee.objects.order_by("pk")[:200])
+            result = EmployeeResource().import_data(dataset, dry_run=True)
+            assert not result.has_errors()
+            return len(dataset)
+
+        def login():
+            c = Client()
+            ok = c.login(username=emp.hrms_id, password=BENCH_PASSWORD)
+            assert ok
+            return ok
+
+        benches = {
+            "search_filtered_qs": lambda: len(list(_filtered_qs(rf.get("/hr/search/", {"college": college.name[:12]})))),
+            "search_view": lambda: staff_client.get("/hr/search/", {"branch": "Civil"}),
+            "export_csv": lambda: staff_client.get("/hr/export/csv/"),
+            "export_excel": lambda: staff_client.get("/hr/export/excel/"),
+            "export_pdf": lambda: staff_client.get("/hr/export/pdf/"),
+            "portal_formset_get": lambda: employee_client.get("/hr/portal/education/"),
+            "portal_formset_post": formset_post,
+            "employee_import_200_dry_run": import_employees,
+            "login": login,
+            "admin_employee_changelist": lambda: staff_client.get("/admin/hr/employee/"),
+            "admin_education_changelist": lambda: staff_client.get("/admin/hr/education/"),
+            "admin_posting_changelist": lambda: staff_client.get("/admin/hr/posting/"),
+            "admin_leaverecord_changelist": lambda: staff_client.get("/admin/hr/leaverecord/"),
+        }
+
+        results = {}
+        for name, fn in benches.items():
+            if name in options["skip"] or (options["only"] and name not in options["only"]):
+                continue
+            fn()   # warm-up (auth snapshot, templates, first-connection costs)
+            timings, queries = [], []
+            for _ in range(options["repeat"]):
+                inspector = QueryInspector()
+                with inspector.capture():
+                    t0 = time.perf_counter()
+                    out = fn()
+                    timings.append((time.perf_counter() - t0) * 1000)
+                queries.append(inspector.total)
+                status = getattr(out, "status_code", None)
+                if status is not None and status >= 400:
+                    raise RuntimeError(f"{name}: HTTP {status}")
+            timings.sort()
+            results[name] = {
+                "min_ms": round(timings[0], 2),
+                "median_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                "mean_ms": round(statistics.mean(timings), 2),
+                "queries": max(queries),
+            }
+            self.stderr.write(f"{name:32s} median {results[name]['median_ms']:9.2f} ms  queries {results[name]['queries']}")
+        return results
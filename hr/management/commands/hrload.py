@@ -0,0 +1,380 @@
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Defaults for every key of the load profile (see loadprofile.sample.json)
+DEFAULTS = {
+    "base_url": "http://127.0.0.1:8000",
+    "duration": 60,             # seconds of steady load after ramp-up starts
+    "sessions": 20,             # concurrent simulated users
+    "ramp_up": 5,               # seconds over which sessions are started
+    "think_time": [0.5, 2.0],   # random pause between steps, seconds
+    "timeout": 60,
+    "flows": {},
+}
+
+SECTION_URLS = {
+    "education": "/hr/portal/education/", "postings": "/hr/portal/postings/",
+    "deputations": "/hr/portal/deputations/", "apar": "/hr/portal/apar/",
+    "property": "/hr/portal/property/", "trainings": "/hr/portal/trainings/",
+    "awards": "/hr/portal/awards/", "pay": "/hr/portal/pay/",
+    "increments": "/hr/portal/increments/", "leaves": "/hr/portal/leaves/",
+    "allegations": "/hr/portal/allegations/",
+}
+_TEXT_TYPES = {"text", "email", "tel", "url", "search", ""}
+_FORM_ROW = re.compile(r"^form-0-")
+
+
+# --- HTTP session ---------------------------------------------------------------
+class FlowError(Exception):
+    pass
+
+
+class _FormParser(HTMLParser):
+    """Collects the fields of the first POST form on a page, as a browser would submit them."""
+
+    def __init__(self, form_id=None):
+        super().__init__(convert_charrefs=True)
+        self.form_id = form_id
+        self.found = self.done = False
+        self.fields = []        # (name, value) pairs that would be submitted
+        self.text_inputs = []   # names of visible text inputs, in document order
+        self.checkboxes = []    # (name, value, checked)
+        self._select = self._textarea = None
+        self._options = []
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if self.done:
+            return
+        if tag == "form" and not self.found:
+            if (a.get("method") or "").lower() == "post" and (self.form_id is None or a.get("id") == self.form_id):
+                self.found = True
+            return
+        if not self.found or not a.get("name"):
+            if tag == "option" and self._select is not None:
+                self._options.append((a.get("value", ""), "selected" in a))
+            return
+        name, kind = a["name"], (a.get("type") or "").lower()
+        if tag == "input":
+            if kind == "checkbox":
+                self.checkboxes.append((name, a.get("value", "on"), "checked" in a))
+                if "checked" in a:
+                    self.fields.append((name, a.get("value", "on")))
+            elif kind == "radio":
+                if "checked" in a:
+                    self.fields.append((name, a.get("value", "on")))
+            elif kind not in ("file", "submit", "button", "image", "reset"):
+                self.fields.append((name, a.get("value", "")))
+                if kind in _TEXT_TYPES:
+                    self.text_inputs.append(name)
+        elif tag == "select":
+            self._select, self._options = name, []
+        elif tag == "textarea":
+            self._textarea, self._text = name, ""
+
+    def handle_data(self, data):
+        if self._textarea is not None:
+            self._text += data
+
+    def handle_endtag(self, tag):
+        if tag == "select" and self._select is not None:
+            chosen = [v for v, sel in self._options if sel] or [v for v, _ in self._options[:1]]
+            self.fields.extend((self._select, v) for v in chosen)
+            self._select = None
+        elif tag == "textarea" and self._textarea is not None:
+            self.fields.append((self._textarea, self._text.lstrip("\n")))
+            self._textarea = None
+        elif tag == "form" and self.found:
+            self.done = True
+
+
+def parse_form(html, form_id=None):
+    parser = _FormParser(form_id)
+    parser.feed(html)
+    if not parser.found:
+        raise FlowError("no POST form on page")
+    return parser
+
+
+class Session:
+    """One simulated browser: a keep-alive connection, a cookie jar and redirects."""
+
+    def __init__(self, base_url, timeout, record):
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.cookies = {}
+        self.record = record
+        self.conn = None
+
+    def _send(self, method, url, body, headers):
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = self.conn_class(self.netloc, timeout=self.timeout)
+            try:
+                self.conn.request(method, url, body=body, headers=headers)
+                response = self.conn.getresponse()
+                return response, response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Server closed the kept-alive connection: reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+
+    def request(self, step, method, path, data=None):
+        url = urljoin(self.base_url, path)
+        started = time.perf_counter()
+        status = 0
+        try:
+            for _ in range(5):
+                headers = {"Referer": url}
+                if self.cookies:
+                    headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+                body = None
+                if data is not None:
+                    body = urlencode(data, doseq=True)
+                    headers["Content-Type"] = "application/x-www-form-urlencoded"
+                response, content = self._send(method, urlsplit(url)._replace(scheme="", netloc="").geturl(), body, headers)
+                for header in response.msg.get_all("Set-Cookie") or []:
+                    for morsel in SimpleCookie(header).values():
+                        self.cookies[morsel.key] = morsel.value
+                status = response.status
+                if status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                    url = urljoin(url, response.getheader("Location"))
+                    if status in (301, 302, 303):
+                        method, data = "GET", None
+                    continue
+                break
+        except (OSError, http.client.HTTPException) as exc:
+            self.record(step, time.perf_counter() - started, 0)
+            raise FlowError(f"{step}: {exc}") from exc
+        self.record(step, time.perf_counter() - started, status)
+        if status >= 400:
+            raise FlowError(f"{step}: HTTP {status}")
+        return url, content.decode("utf-8", "replace")
+
+    def get(self, step, path, params=None):
+        return self.request(step, "GET", path + ("?" + urlencode(params) if params else ""))
+
+    def post(self, step, path, data):
+        return self.request(step, "POST", path, data)
+
+    def login(self, username, password):
+        _, html = self.get("login_form", "/accounts/login/")
+        form = parse_form(html)
+        data = dict(form.fields)
+        data.update(username=username, password=password)
+        final_url, _ = self.post("login", "/accounts/login/", data)
+        if urlsplit(final_url).path.startswith("/accounts/login/"):
+            raise FlowError(f"login failed for {username}")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+# --- Flows ----------------------------------------------------------------------
+def _touch(value):
+    """A different but stable-length value, so repeated edits neither no-op nor grow."""
+    return value[:-1] if value.endswith(".") else value + "."
+
+
+def flow_portal_edit(session, conf, rng):
+    """Employee opens the portal and re-saves one self-service section with a small edit."""
+    session.get("portal", "/hr/portal/")
+    url = SECTION_URLS[rng.choice(conf.get("sections") or ["education"])]
+    _, html = session.get("section_get", url)
+    form = parse_form(html, "formset-form")
+    data = defaultdict(list)
+    for name, value in form.fields:
+        data[name].append(value)
+    editable = [n for n in form.text_inputs if _FORM_ROW.match(n) and data[n] and data[n][0]]
+    if editable:
+        data[editable[0]] = [_touch(data[editable[0]][0])]
+    session.post("section_post", url, data)
+
+
+def flow_review_approve(session, conf, rng):
+    """Reviewer opens a section changelist filtered to PENDING rows and approves a batch."""
+    model = rng.choice(conf.get("models") or ["education"])
+    changelist = f"/admin/hr/{model}/"
+    _, html = session.get("changelist", changelist, {"status__exact": "PENDING"})
+    form = parse_form(html, "changelist-form")
+    ids = [v for n, v, _ in form.checkboxes if n == "_selected_action"][:conf.get("batch", 10)]
+    if not ids:
+        return
+    data = [(n, v) for n, v in form.fields if n == "csrfmiddlewaretoken"]
+    data += [("action", "mark_approved"), ("index", "0"), ("select_across", "0")]
+    data += [("_selected_action", pk) for pk in ids]
+    session.post("approve", changelist + "?status__exact=PENDING", data)
+
+
+def flow_staff_export(session, conf, rng):
+    """Staff user searches the cadre, then downloads an export of the result."""
+    params = dict(rng.choice(conf.get("filters") or [{}]))
+    session.get("search", "/hr/search/", params)
+    fmt = rng.choice(conf.get("formats") or ["csv"])
+    session.get(f"export_{fmt}", f"/hr/export/{fmt}/", params)
+
+
+FLOWS = {
+    "portal_edit": flow_portal_edit,
+    "review_approve": flow_review_approve,
+    "staff_export": flow_staff_export,
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent simulated sessions (employee portal edits, reviewer approvals, staff "
+        "exports) against a running server and report throughput and p50/p95/p99 latency per flow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("profile", help="Load profile JSON (see loadprofile.sample.json).")
+        parser.add_argument("--base-url", help="Override the profile's base_url.")
+        parser.add_argument("--duration", type=float, help="Override the profile's duration (seconds).")
+        parser.add_argument("--sessions", type=int, help="Override the profile's number of sessions.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for flow/section choices (default 1).")
+        parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["profile"]) as fh:
+                conf = {**DEFAULTS, **json.load(fh)}
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read load profile: {exc}")
+        for key in ("base_url", "duration", "sessions"):
+            if options[key] is not None:
+                conf[key] = options[key]
+        flows = {name: f for name, f in conf["flows"].items() if f.get("weight", 0) > 0}
+        for name, flow in flows.items():
+            if name not in FLOWS:
+                raise CommandError(f"Unknown flow {name!r}; choose from {', '.join(FLOWS)}.")
+            if not flow.get("accounts"):
+                raise CommandError(f"Flow {name!r} needs at least one [username, password] in 'accounts'.")
+        if not flows:
+            raise CommandError("The load profile defines no flows with a positive weight.")
+
+        # Each session is one persona for the whole run; flows get sessions in proportion to weight
+        rng = random.Random(options["seed"])
+        names = list(flows)
+        personas = rng.choices(names, weights=[flows[n]["weight"] for n in names], k=conf["sessions"])
+
+        lock = threading.Lock()
+        samples = defaultdict(list)     # (flow, step) -> [(seconds, status)]
+        iterations = defaultdict(list)  # flow -> [seconds per completed iteration]
+        errors = defaultdict(list)      # flow -> [message]
+        deadline = time.monotonic() + conf["ramp_up"] + conf["duration"]
+
+        def run(index, flow_name):
+            flow = flows[flow_name]
+            local_rng = random.Random(options["seed"] * 1000 + index)
+            username, password = flow["accounts"][index % len(flow["accounts"])]
+
+            def record(step, seconds, status):
+                with lock:
+                    samples[(flow_name, step)].append((seconds, status))
+
+            session = Session(conf["base_url"], conf["timeout"], record)
+            try:
+                session.login(username, password)
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        FLOWS[flow_name](session, flow, local_rng)
+                    except FlowError as exc:
+                        with lock:
+                            errors[flow_name].append(str(exc))
+                    else:
+                        with lock:
+                            iterations[flow_name].append(time.perf_counter() - started)
+                    time.sleep(local_rng.uniform(*conf["think_time"]))
+            except FlowError as exc:
+                with lock:
+                    errors[flow_name].append(str(exc))
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=run, args=(i, p), daemon=True) for i, p in enumerate(personas)]
+        self.stdout.write(
+            f"{len(threads)} sessions against {conf['base_url']} for {conf['duration']}s "
+            f"(+{conf['ramp_up']}s ramp-up): " + ", ".join(f"{n}={personas.count(n)}" for n in names)
+        )
+        started = time.monotonic()
+        for i, thread in enumerate(threads):
+            thread.start()
+            time.sleep(conf["ramp_up"] / max(1, len(threads)))
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        results = self._summarise(names, samples, iterations, errors, elapsed)
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump({"profile": conf, "elapsed": round(elapsed, 2), "results": results}, fh, indent=2, default=str)
+            self.stdout.write(f"Wrote {options['json_path']}")
+
+    def _summarise(self, names, samples, iterations, errors, elapsed):
+        results = {}
+        header = f"{'flow / step':32s} {'count':>7s} {'err':>5s} {'rps':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for flow in names:
+            done = sorted(iterations[flow])
+            results[flow] = {
+                "iterations": len(done),
+                "throughput_per_s": round(len(done) / elapsed, 3) if elapsed else 0,
+                "errors": len(errors[flow]),
+                "sample_errors": sorted(set(errors[flow]))[:5],
+                "p50_ms": round(percentile(done, 50) * 1000, 1),
+                "p95_ms": round(percentile(done, 95) * 1000, 1),
+                "p99_ms": round(percentile(done, 99) * 1000, 1),
+                "steps": {},
+            }
+            r = results[flow]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{flow:32s} {r['iterations']:7d} {r['errors']:5d} {r['throughput_per_s']:7.2f} "
+                f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f}"
+            ))
+            for (f, step), values in sorted(samples.items()):
+                if f != flow:
+                    continue
+                latencies = sorted(s for s, _ in values)
+                failed = sum(1 for _, status in values if not status or status >= 400)
+                step_result = r["steps"][step] = {
+                    "requests": len(values),
+                    "errors": failed,
+                    "rps": round(len(values) / elapsed, 3) if elapsed else 0,
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                }
+                self.stdout.write(
+                    f"  {step:30s} {step_result['requests']:7d} {failed:5d} {step_result['rps']:7.2f} "
+                    f"{step_result['p50_ms']:8.1f} {step_result['p95_ms']:8.1f} {step_result['p99_ms']:8.1f}"
+                )
+            for message in r["sample_errors"]:
+                self.stderr.write(f"  ! {message}")
+        return results
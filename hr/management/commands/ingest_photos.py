@@ -0,0 +1,34 @@
+import zipfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr import photo_ingest
+
+
+class Command(BaseCommand):
+    help = "Set employee photos from a ZIP of <HRMS ID>.jpg/.png files, recompressing each to fit 30 KB."
+
+    def add_arguments(self, parser):
+        parser.add_argument("zip_path")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Compression processes (default: HR_PHOTO_INGEST['workers'], else CPU count; 1 = in-process).")
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per bulk_update.")
+        parser.add_argument("--dry-run", action="store_true", help="Match and compress, but store nothing.")
+
+    def handle(self, *args, **options):
+        try:
+            report = photo_ingest.ingest_zip(
+                options["zip_path"], workers=options["workers"],
+                batch_size=options["batch_size"], dry_run=options["dry_run"],
+            )
+        except (OSError, zipfile.BadZipFile) as exc:
+            raise CommandError(f"{options['zip_path']}: {exc}")
+
+        for hrms_id in report.unmatched:
+            self.stdout.write(f"unmatched: {hrms_id}")
+        for name, reason in report.failed:
+            self.stderr.write(f"failed: {name}: {reason}")
+        for name, reason in report.skipped:
+            self.stdout.write(f"skipped: {name}: {reason}")
+        prefix = "Dry run: " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(prefix + report.summary() + "."))
@@ -1,25 +1,156 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connections, transaction
+from hr import authcache
 from hr.models import Employee
 
 DEFAULT_PASSWORD = "umars123@"
 
+
+def _init_hash_worker():
+    """Worker processes only hash; make sure Django settings are loaded (spawn start method)."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
 class Command(BaseCommand):
     help = "Create/link Django users for Employees (username = hrms_id). Default password = umars123@, must be changed on first login."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bulk", action="store_true",
+            help="Set-based mode: hash passwords in worker processes, bulk_create users, bulk_update employees.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Employees per batch in --bulk mode (default 500).")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Password hashing processes in --bulk mode (default: CPU count).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be linked without writing anything.")
+
     def handle(self, *args, **options):
+        if options["bulk"]:
+            return self.handle_bulk(**options)
+
         created = 0
-        for emp in Employee.objects.filter(user__isnull=True).exclude(hrms_id__isnull=True).exclude(hrms_id=""):
+        dry_run = options["dry_run"]
+        for emp in self._unlinked():
             hrms = emp.hrms_id.strip()
             if not hrms:
                 continue
+            if dry_run:
+                created += 1
+                self.stdout.write(f"Would create user for {emp.name} ({hrms})")
+                continue
             user, _ = User.objects.get_or_create(username=hrms, defaults={"email": emp.email or ""})
             # Set default password always if new user
             user.set_password(DEFAULT_PASSWORD)
             user.save()
             emp.user = user
+            emp.must_change_password = True
             emp.save()
             created += 1
             self.stdout.write(f"Created user for {emp.name} ({hrms}) password={DEFAULT_PASSWORD}")
-        self.stdout.write(self.style.SUCCESS(f"Linked {created} employee(s)."))
+        verb = "Would link" if dry_run else "Linked"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {created} employee(s)."))
+
+    def _unlinked(self):
+        return Employee.objects.filter(user__isnull=True).exclude(hrms_id__isnull=True).exclude(hrms_id="")
+
+    # --- Bulk mode -----------------------------------------------------------
+    def handle_bulk(self, batch_size, workers, dry_run, **options):
+        """
+        Same result as the per-row loop, but per batch:
+        - one query to find users that already exist for the batch's HRMS IDs
+        - passwords hashed in parallel worker processes (PBKDF2 is the bottleneck)
+        - one bulk_create for new users, one bulk_update for re-used users' passwords
+        - one bulk_update to link employees (no post_save, so ensure_user_for_employee is not re-fired)
+        """
+        batch_size = max(1, batch_size)
+        workers = max(1, workers)
+        linked = skipped = 0
+        hash_secs = db_secs = 0.0
+        started = time.perf_counter()
+
+        # Forked workers must not inherit open DB sockets; Django reconnects lazily.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+            last_pk = 0
+            while True:
+                rows = list(
+                    self._unlinked().filter(pk__gt=last_pk).order_by("pk")
+                    .values_list("pk", "hrms_id", "email")[:batch_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+
+                # Deduplicate HRMS IDs that collapse to the same username after strip()
+                batch = {}
+                for pk, hrms, email in rows:
+                    hrms = hrms.strip()
+                    if not hrms or hrms in batch:
+                        skipped += 1
+                        continue
+                    batch[hrms] = (pk, email or "")
+
+                if dry_run:
+                    linked += len(batch)
+                    continue
+
+                t0 = time.perf_counter()
+                chunksize = max(1, len(batch) // (workers * 4))
+                hashes = dict(zip(batch, pool.map(make_password, [DEFAULT_PASSWORD] * len(batch), chunksize=chunksize)))
+                t1 = time.perf_counter()
+                hash_secs += t1 - t0
+
+                with transaction.atomic():
+                    existing = {u.username: u for u in User.objects.filter(username__in=list(batch))}
+                    # A user that is already linked to another employee cannot be linked again (OneToOne)
+                    taken = set(
+                        Employee.objects.filter(user__in=list(existing.values())).values_list("user__username", flat=True)
+                    )
+                    for hrms in taken:
+                        batch.pop(hrms, None)
+                        existing.pop(hrms, None)
+                        skipped += 1
+                        self.stderr.write(f"Skipped {hrms}: user already linked to another employee.")
+
+                    for hrms, user in existing.items():
+                        user.password = hashes[hrms]
+                    User.objects.bulk_update(list(existing.values()), ["password"], batch_size=batch_size)
+                    User.objects.bulk_create(
+                        [
+                            User(username=hrms, email=email, password=hashes[hrms], is_active=True, is_staff=False)
+                            for hrms, (_, email) in batch.items() if hrms not in existing
+                        ],
+                        batch_size=batch_size,
+                    )
+                    # bulk_create does not return PKs on MySQL, so re-read them in one query
+                    user_ids = dict(User.objects.filter(username__in=list(batch)).values_list("username", "pk"))
+                    Employee.objects.bulk_update(
+                        [Employee(pk=pk, user_id=user_ids[hrms], must_change_password=True) for hrms, (pk, _) in batch.items()],
+                        ["user", "must_change_password"], batch_size=batch_size,
+                    )
+                    # bulk_update skips signals; drop cached snapshots of re-used users by hand
+                    authcache.invalidate(*[u.pk for u in existing.values()])
+                db_secs += time.perf_counter() - t1
+                linked += len(batch)
+                self.stdout.write(f"Batch up to pk={last_pk}: linked {len(batch)} employee(s).")
 
+        elapsed = time.perf_counter() - started
+        rate = linked / elapsed if elapsed else 0.0
+        verb = "Would link" if dry_run else "Linked"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {linked} employee(s), skipped {skipped} in {elapsed:.2f}s "
+            f"({rate:.1f} employees/s; hashing {hash_secs:.2f}s on {workers} worker(s), DB {db_secs:.2f}s)."
+        ))
+        if not dry_run and linked:
+            self.stdout.write(f"Default password for new/relinked users: {DEFAULT_PASSWORD}")
@@ -0,0 +1,64 @@
+import io
+import json
+import pstats
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr.profiling import profiler_conf
+
+
+class Command(BaseCommand):
+    help = "Summarize slow-request profile dumps written by SampledProfilerMiddleware, slowest endpoints first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Dump directory (default: HR_PROFILER['dir']).")
+        parser.add_argument("--limit", type=int, default=15, help="Endpoints to show (default 15).")
+        parser.add_argument(
+            "--functions", type=int, default=0,
+            help="Also print the top N functions by cumulative time per endpoint (all its dumps merged).",
+        )
+
+    def handle(self, *args, **options):
+        base = Path(options["dir"]) if options["dir"] else profiler_conf()["dir"]
+        if not base.is_dir():
+            raise CommandError(f"No profile directory at {base}")
+
+        by_endpoint = defaultdict(list)
+        for path in base.glob("*.json"):
+            try:
+                record = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            by_endpoint[record.get("endpoint") or record.get("path", "?")].append(record)
+        if not by_endpoint:
+            self.stdout.write("No dumps found.")
+            return
+
+        rows = []
+        for endpoint, records in by_endpoint.items():
+            walls = [r["wall_ms"] for r in records]
+            rows.append((
+                endpoint, len(records), statistics.median(walls), max(walls),
+                statistics.mean(r["queries"] for r in records),
+                statistics.mean(r["db_ms"] for r in records),
+                records,
+            ))
+        rows.sort(key=lambda r: r[2], reverse=True)
+
+        self.stdout.write(f"{'endpoint':40s} {'dumps':>5s} {'p50 ms':>9s} {'max ms':>9s} {'queries':>8s} {'db ms':>8s}")
+        for endpoint, n, p50, worst, queries, db_ms, records in rows[:options["limit"]]:
+            self.stdout.write(f"{endpoint[:40]:40s} {n:5d} {p50:9.1f} {worst:9.1f} {queries:8.1f} {db_ms:8.1f}")
+
+            slowest = max(records, key=lambda r: r["wall_ms"])
+            for q in slowest.get("top_queries", [])[:3]:
+                self.stdout.write(f"    {q['ms']:8.1f}ms x{q['count']:<4d} {q['sql'][:100]}")
+
+            if options["functions"]:
+                profiles = [str(base / r["profile"]) for r in records if r.get("profile") and (base / r["profile"]).exists()]
+                if profiles:
+                    out = io.StringIO()
+                    pstats.Stats(*profiles, stream=out).sort_stats("cumulative").print_stats(options["functions"])
+                    self.stdout.write(out.getvalue())
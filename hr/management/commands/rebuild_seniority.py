@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hr import seniority
+
+
+class Command(BaseCommand):
+    help = "Recompute the gradation list (SeniorityRank) for the whole cadre from HR_SENIORITY keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="Only verify the stored ranks; exit non-zero if they need a rebuild.")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            problems = seniority.check()
+            for problem in problems[:50]:
+                self.stderr.write(problem)
+            if problems:
+                raise CommandError(f"{len(problems)} problem(s); run rebuild_seniority.")
+            self.stdout.write(self.style.SUCCESS("Gradation list is consistent."))
+            return
+        count = seniority.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Ranked {count} employee(s)."))
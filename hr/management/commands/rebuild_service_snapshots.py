@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hr import snapshot
+
+
+class Command(BaseCommand):
+    help = "Recompute current posting/deputation/pay snapshots from approved service history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--expired", action="store_true",
+                            help="Only snapshots whose valid_until has passed (run nightly).")
+
+    def handle(self, *args, **options):
+        count = snapshot.rebuild(expired_only=options["expired"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {count} snapshot(s)."))
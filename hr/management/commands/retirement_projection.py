@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from hr import retirement
+
+
+class Command(BaseCommand):
+    help = "Print retirements per year (FR 56, HR_RETIREMENT age); --fill-blank stores derived dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=None, help="Years ahead (default HR_RETIREMENT['horizon_years']).")
+        parser.add_argument("--fill-blank", action="store_true",
+                            help="Write the derived date into employees whose date_retirement is blank.")
+        parser.add_argument("--dry-run", action="store_true", help="With --fill-blank: only count.")
+
+    def handle(self, *args, **options):
+        if options["fill_blank"]:
+            count = retirement.fill_blank_dates(dry_run=options["dry_run"])
+            verb = "Would fill" if options["dry_run"] else "Filled"
+            self.stdout.write(self.style.SUCCESS(f"{verb} {count} blank retirement date(s)."))
+            return
+        result = retirement.projection(options["years"])
+        for year, count in result["by_year"].items():
+            self.stdout.write(f"{year}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['total']} retirement(s) over {result['horizon_years']} year(s); {result['derived']} derived from DOB."
+        ))
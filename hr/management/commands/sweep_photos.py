@@ -0,0 +1,99 @@
+import os
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from hr import authcache, pagecache, photos
+from hr.models import Employee
+from hr.storage import is_content_addressed
+
+PHOTO_DIR = "employee_photos"
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete employee photo files (and derivatives) no Employee refers to. "
+        "--rehash first moves legacy, non-hashed photos to content-addressed names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-age", type=int, default=3600,
+                            help="Keep unreferenced files younger than this many seconds (default 3600): "
+                                 "an upload may be stored before its row is committed.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+        parser.add_argument("--rehash", action="store_true",
+                            help="Re-store photos saved under their upload names with content-addressed names.")
+
+    def handle(self, *args, **options):
+        storage = Employee._meta.get_field("photo").storage
+        if options["rehash"]:
+            self._rehash(storage, options["dry_run"])
+
+        referenced = set(
+            Employee.objects.exclude(photo="").exclude(photo__isnull=True).values_list("photo", flat=True)
+        )
+        keep = set(referenced)
+        for name in referenced:
+            keep.update(
+                photos.derivative_name(name, size, fmt)
+                for size in photos.derivatives_conf()["sizes"] for fmt in photos.FORMATS
+            )
+
+        cutoff = time.time() - options["min_age"]
+        deleted = kept_young = 0
+        for name in self._walk(storage, PHOTO_DIR) + self._walk(storage, photos.DERIVED_DIR):
+            if name in keep:
+                continue
+            if os.path.getmtime(storage.path(name)) > cutoff:
+                kept_young += 1
+                continue
+            deleted += 1
+            if options["dry_run"]:
+                self.stdout.write(f"would delete {name}")
+            else:
+                storage.delete(name)
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} file(s); {len(referenced)} photo(s) referenced; "
+            f"{kept_young} unreferenced file(s) newer than --min-age kept."
+        ))
+
+    def _walk(self, storage, directory):
+        if not storage.exists(directory):
+            return []
+        dirs, files = storage.listdir(directory)
+        names = [f"{directory}/{f}" for f in files]
+        for sub in dirs:
+            names += self._walk(storage, f"{directory}/{sub}")
+        return names
+
+    def _rehash(self, storage, dry_run):
+        legacy = [
+            (pk, name) for pk, name in
+            Employee.objects.exclude(photo="").exclude(photo__isnull=True).values_list("pk", "photo")
+            if not is_content_addressed(name)
+        ]
+        moved = missing = 0
+        for pk, name in legacy:
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f"Employee {pk}: {name} is missing")
+                continue
+            if dry_run:
+                self.stdout.write(f"would rehash {name}")
+                continue
+            with storage.open(name, "rb") as fh:
+                new_name = storage.save(name, ContentFile(fh.read()))
+            # update() keeps Employee.save()/signals (and their side effects) out of a file move
+            Employee.objects.filter(pk=pk, photo=name).update(photo=new_name)
+            pagecache.invalidate([pk], pagecache.EMPLOYEE_FRAGMENTS)
+            authcache.invalidate_employees([pk])
+            photo = Employee(pk=pk, photo=new_name).photo
+            if not photos.has_derivatives(photo):
+                try:
+                    photos.generate(photo)
+                except (OSError, ValueError) as exc:
+                    self.stderr.write(f"{new_name}: {exc}")
+            moved += 1
+        self.stdout.write(f"Rehashed {moved} legacy photo(s); {missing} missing.")
@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from hr.routers import reporting_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto the reporting alias (local two-file setup, "
+        "HR_DB_SQLITE_DIR). MySQL replicas are kept in sync by MySQL replication instead."
+    )
+
+    def handle(self, *args, **options):
+        alias = reporting_alias()
+        if alias is None:
+            raise CommandError("No reporting database configured (settings.HR_REPORTING_DB).")
+        primary, reporting = settings.DATABASES["default"], settings.DATABASES[alias]
+        if not all(db["ENGINE"] == "django.db.backends.sqlite3" for db in (primary, reporting)):
+            raise CommandError("sync_reporting_db only handles SQLite; MySQL replicas use replication.")
+
+        connections[alias].close()
+        src = sqlite3.connect(str(primary["NAME"]))
+        dst = sqlite3.connect(str(reporting["NAME"]))
+        try:
+            # Online backup: consistent snapshot even while the primary is being written
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} -> {reporting['NAME']}"))
@@ -0,0 +1,29 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from hr import timeline
+from hr.models import TimelineIssue
+
+
+class Command(BaseCommand):
+    help = "Find gaps, overlaps and multiple 'till date' rows in postings, deputations and pay scale changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--incremental", action="store_true",
+                            help="Only recheck employees whose service rows changed since the last run.")
+        parser.add_argument("--list", action="store_true", help="Print every issue found by this run.")
+
+    def handle(self, *args, **options):
+        record = timeline.run(incremental=options["incremental"])
+        issues = TimelineIssue.objects.filter(run=record).select_related("employee").order_by("employee__hrms_id", "section")
+        if options["list"]:
+            for issue in issues:
+                self.stdout.write(f"{issue.employee.hrms_id}\t{issue.section}\t{issue.kind}\t{issue.detail}")
+        counts = Counter(issues.values_list("section", "kind"))
+        for (section, kind), count in sorted(counts.items()):
+            self.stdout.write(f"{section:12} {kind:14} {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{record.get_mode_display()} run: {record.employees_checked} employee(s) checked, "
+            f"{record.issues_found} issue(s); {TimelineIssue.objects.count()} open in total."
+        ))
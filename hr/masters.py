@@ -1,46 +1,63 @@
+# hr/masters.py
+"""
+Master tables behind the free-text columns of Employee and the service sections.
+
+The text columns stay what forms, imports and exports read and write; each master row
+stands for one distinct value, matched on `key` (the name upper-cased, runs of
+whitespace collapsed), so "Lecturer", "lecturer " and "LECTURER" share a row. The FK
+kept next to each text column is derived by hr/normalize.py, and filters and reports
+group and filter on those integer ids instead of matching text.
+
+College predates these masters and lives in hr/models.py.
+"""
 from django.db import models
 
 
-class District(models.Model):
-"""Employee home district master (NOT for colleges)."""
-name = models.CharField(max_length=120, unique=True)
-state = models.CharField(max_length=120, blank=True)
+def normalize_key(text):
+    return " ".join((text or "").split()).upper()
 
 
-class Meta:
-ordering = ["name"]
+class Master(models.Model):
+    name = models.CharField(max_length=120, unique=True)
+    key = models.CharField(max_length=120, unique=True, editable=False)
 
+    class Meta:
+        abstract = True
+        ordering = ["name"]
 
-def __str__(self):
-return self.name
+    def save(self, *args, **kwargs):
+        self.name = " ".join(self.name.split())
+        self.key = normalize_key(self.name)
+        super().save(*args, **kwargs)
 
+    def __str__(self):
+        return self.name
 
-class College(models.Model):
-code = models.CharField(max_length=20, unique=True, blank=True, help_text="Short code e.g., NGP13")
-name = models.CharField(max_length=200, unique=True)
-address = models.CharField(max_length=255, blank=True)
 
+class District(Master):
+    """Employee home district master (NOT for colleges)."""
+    state = models.CharField(max_length=120, blank=True)
 
-class Meta:
-ordering = ["name"]
+    class Meta(Master.Meta):
+        pass
 
 
-def __str__(self):
-return f"{self.name} ({self.code})" if self.code else self.name
+class DesignationMaster(Master):
+    level = models.CharField(max_length=20, blank=True)
 
+    class Meta(Master.Meta):
+        verbose_name = "designation"
 
-class DesignationMaster(models.Model):
-name = models.CharField(max_length=120, unique=True)
-level = models.CharField(max_length=20, blank=True)
 
+class ServiceMaster(Master):
+    """Service / branch (Employee.branch)."""
 
-def __str__(self):
-return self.name
+    class Meta(Master.Meta):
+        verbose_name = "service / branch"
+        verbose_name_plural = "services / branches"
 
 
-class ServiceMaster(models.Model):
-name = models.CharField(max_length=120, unique=True)
+class PayLevelMaster(Master):
 
-
-def __str__(self):
-return self.name
\ No newline at end of file
+    class Meta(Master.Meta):
+        verbose_name = "pay level"
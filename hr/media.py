@@ -0,0 +1,97 @@
+# hr/media.py
+"""
+Media (uploaded files) serving with HTTP caching.
+
+Uploaded files are employee photos (personal data), so nothing is served anonymously:
+staff may read every file, an employee only their own photo and its derivatives, and
+anyone else gets 404. The front-end server must not expose MEDIA_ROOT itself; with
+sendfile it serves files only from an internal location, after this view has checked.
+
+Content-addressed names (hr/storage.py: photos and their derivatives) never change
+content, so they are sent with a one-year `immutable` private Cache-Control; anything
+else gets a short max-age. Every response carries an ETag and Last-Modified, and conditional
+requests get 304. With settings.HR_MEDIA["sendfile"] set, the file body is handed to
+the front-end server (nginx X-Accel-Redirect or Apache/lighttpd X-Sendfile) instead of
+being streamed by a Python worker.
+"""
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .photos import DERIVED_DIR
+from .storage import is_content_addressed
+
+# Defaults; override any key via settings.HR_MEDIA
+DEFAULTS = {
+    "sendfile": None,                       # None | "x-accel-redirect" | "x-sendfile"
+    "accel_prefix": "/protected-media/",    # nginx `internal` location aliased to MEDIA_ROOT
+    "max_age": 300,                         # seconds, for names that are not content-addressed
+    "immutable_max_age": 31536000,
+}
+
+
+def media_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_MEDIA", {})}
+
+
+def _may_read(user, path):
+    if user.is_staff or user.is_superuser:
+        return True
+    # The cached employee snapshot (hr/authcache.py): no query
+    emp = getattr(user, "employee_profile", None)
+    photo = emp.photo.name if emp is not None and emp.photo else ""
+    if not photo:
+        return False
+    stem = os.path.splitext(os.path.basename(photo))[0]
+    return path == photo or (
+        path.startswith(f"{DERIVED_DIR}/") and os.path.splitext(os.path.basename(path))[0] == stem
+    )
+
+
+@login_required
+def serve_media(request, path):
+    conf = media_conf()
+    path = posixpath.normpath(path).lstrip("/")
+    if not _may_read(request.user, path):
+        raise Http404("Not found")
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:     # path escapes MEDIA_ROOT
+        raise Http404("Not found")
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404("Not found")
+    if not os.path.isfile(fullpath):
+        raise Http404("Not found")
+
+    etag = quote_etag(f"{int(stat.st_mtime):x}-{stat.st_size:x}")
+    if is_content_addressed(path):
+        cache_control = f"private, max-age={conf['immutable_max_age']}, immutable"
+    else:
+        cache_control = f"private, max-age={conf['max_age']}"
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = mimetypes.guess_type(fullpath)[0] or "application/octet-stream"
+        if conf["sendfile"] == "x-accel-redirect":
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = conf["accel_prefix"].rstrip("/") + "/" + path
+        elif conf["sendfile"] == "x-sendfile":
+            response = HttpResponse(content_type=content_type)
+            response["X-Sendfile"] = fullpath
+        else:
+            response = FileResponse(open(fullpath, "rb"), content_type=content_type)
+            response["Content-Length"] = stat.st_size
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
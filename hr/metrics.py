@@ -0,0 +1,310 @@
+# hr/metrics.py
+"""
+In-process metrics with a Prometheus text endpoint (hr:metrics, staff only).
+
+Each worker process keeps its own counters/histograms in memory (one short lock per
+update) and every `flush_interval` seconds writes them to
+<dir>/metrics-<pid>-<start ms>.json with an atomic rename. The endpoint merges the files
+of all workers on this host with the live state of the serving process, so no
+cross-process locking is needed.
+
+The start time in the name keeps a recycled pid from overwriting a dead worker's file.
+Files of dead workers (older files with a worker's own pid at its first flush; files
+whose pid no longer exists, at the endpoint) are folded into retired.json and then
+deleted, under an flock on .lock, so the merged counters never go backwards (which
+Prometheus would read as a counter reset). Without fcntl (Windows development) dead
+workers' files are kept and merged as they are.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+# Defaults; override any key via settings.HR_METRICS
+DEFAULTS = {
+    "enabled": True,
+    "dir": None,            # defaults to <BASE_DIR>/var/metrics
+    "flush_interval": 5,    # seconds
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+RETIRED = "retired.json"    # totals of dead workers
+
+# name -> (type, help, buckets)
+METRICS = {
+    "hr_http_requests_total": ("counter", "HTTP requests by view, method and status.", None),
+    "hr_http_request_duration_seconds": ("histogram", "Request latency by view.", LATENCY_BUCKETS),
+    "hr_db_queries_per_request": ("histogram", "DB queries issued per request by view.", QUERY_BUCKETS),
+    "hr_export_rows_total": ("counter", "Rows written by staff exports.", None),
+    "hr_export_seconds_total": ("counter", "Time spent producing staff exports.", None),
+    "hr_import_rows_total": ("counter", "Rows processed by import-export imports.", None),
+    "hr_import_seconds_total": ("counter", "Time spent in import-export imports.", None),
+    "hr_admission_rejected_total": ("counter", "Requests rejected with 429 by admission control.", None),
+}
+
+
+def metrics_conf():
+    conf = {**DEFAULTS, **getattr(settings, "HR_METRICS", {})}
+    conf["dir"] = Path(conf["dir"] or Path(settings.BASE_DIR) / "var" / "metrics")
+    return conf
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}      # (name, labels) -> float
+        self.histograms = {}    # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._last_flush = time.monotonic()
+        self._conf = None
+        self._pid = None        # process the file name below belongs to (reset after fork)
+        self._name = None
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [0] * (len(buckets) + 2)
+            h[bisect.bisect_left(buckets, value)] += 1
+            h[-1] += value
+        self._maybe_flush()
+
+    # --- Cross-process -------------------------------------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[n, list(map(list, l)), v] for (n, l), v in self.counters.items()],
+                "histograms": [[n, list(map(list, l)), list(h)] for (n, l), h in self.histograms.items()],
+            }
+
+    def _maybe_flush(self):
+        if self._conf is None:
+            self._conf = metrics_conf()
+        if time.monotonic() - self._last_flush >= self._conf["flush_interval"]:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self.counters and not self.histograms:
+            return
+        directory = (self._conf or metrics_conf())["dir"]
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            _write(directory / self.file_name(), self.snapshot())
+        except OSError:
+            pass
+
+    def file_name(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid, self._name = pid, f"metrics-{pid}-{int(time.time() * 1000)}.json"
+            # Files left by an earlier process that had this pid
+            directory = (self._conf or metrics_conf())["dir"]
+            stale = [path for path in directory.glob(f"metrics-{pid}-*.json") if path.name != self._name]
+            if stale and fcntl is not None:
+                with _directory_lock(directory):
+                    _retire(directory, stale)
+        return self._name
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+
+def _labels(**kw):
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+
+def observe_export(fmt, rows, seconds):
+    REGISTRY.inc("hr_export_rows_total", _labels(format=fmt), rows)
+    REGISTRY.inc("hr_export_seconds_total", _labels(format=fmt), seconds)
+
+
+def observe_import(resource, rows, seconds):
+    REGISTRY.inc("hr_import_rows_total", _labels(resource=resource), rows)
+    REGISTRY.inc("hr_import_seconds_total", _labels(resource=resource), seconds)
+
+
+# --- Exposition ---------------------------------------------------------------
+def _merge(states):
+    counters, histograms = {}, {}
+    for state in states:
+        for name, labels, value in state.get("counters", []):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, h in state.get("histograms", []):
+            key = (name, tuple(map(tuple, labels)))
+            acc = histograms.setdefault(key, [0] * len(h))
+            for i, v in enumerate(h):
+                acc[i] += v
+    return counters, histograms
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:     # exists, owned by another user
+        pass
+    return True
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, state):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _directory_lock(directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    fd = os.open(directory / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)    # closing drops the flock
+
+
+def _retire(directory, paths):
+    """Fold these dead workers' files into RETIRED, then delete them (hold _directory_lock)."""
+    states = [state for state in map(_read, [directory / RETIRED, *paths]) if state is not None]
+    counters, histograms = _merge(states)
+    # Written before the unlink: a crash in between double-counts, never loses counts
+    _write(directory / RETIRED, {
+        "counters": [[n, list(map(list, l)), v] for (n, l), v in counters.items()],
+        "histograms": [[n, list(map(list, l)), h] for (n, l), h in histograms.items()],
+    })
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _collect(directory, own):
+    """States of the other workers' files (not `own`) plus RETIRED, retiring the files of dead workers."""
+    states, dead = [], []
+    for path in directory.glob("metrics-*.json"):
+        if path.name == own:
+            continue
+        try:
+            pid = int(path.name.split("-")[1].split(".")[0])
+        except (IndexError, ValueError):
+            continue
+        if fcntl is not None and not _pid_alive(pid):
+            dead.append(path)
+            continue
+        state = _read(path)
+        if state is not None:
+            states.append(state)
+    if dead:
+        _retire(directory, dead)
+    retired = _read(directory / RETIRED)
+    return states + ([retired] if retired is not None else [])
+
+
+def render_prometheus():
+    """Merge every worker's last flush, dead workers' totals and this process live into Prometheus text format."""
+    directory = metrics_conf()["dir"]
+    states = [REGISTRY.snapshot()]
+    if directory.is_dir():
+        own = REGISTRY.file_name()     # before the lock: it may retire files itself
+        if fcntl is None:
+            states += _collect(directory, own)
+        else:
+            # Serialised with other retirements, so no dead worker is counted twice or not at all
+            with _directory_lock(directory):
+                states += _collect(directory, own)
+    counters, histograms = _merge(states)
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind == "counter":
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+            continue
+        for (n, labels), h in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], h[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {h[-1]:g}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Middleware ---------------------------------------------------------------
+class _QueryCounter:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Per-view request count, latency histogram and DB-queries-per-request histogram."""
+
+    def __init__(self, get_response):
+        if not metrics_conf()["enabled"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            start = time.perf_counter()
+            response = self.get_response(request)
+            elapsed = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        # Unresolved paths share one label to keep cardinality bounded
+        view = (match.view_name if match else "") or "unmatched"
+        REGISTRY.inc("hr_http_requests_total", _labels(view=view, method=request.method, status=response.status_code))
+        REGISTRY.observe("hr_http_request_duration_seconds", _labels(view=view), elapsed)
+        REGISTRY.observe("hr_db_queries_per_request", _labels(view=view), counter.count)
+        return response
@@ -1,62 +1,119 @@
 
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
 from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
 
-class ForcePasswordChangeMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+from . import authcache
 
-    def __call__(self, request):
-        return self.get_response(request)
 
-    def process_view(self, request, view_func, view_args, view_kwargs):
-        # Only act for authenticated users
-        user = getattr(request, "user", None)
-        if not user or not user.is_authenticated:
-            return None
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Replaces django.contrib.auth's AuthenticationMiddleware: request.user comes from the
+    cached user + employee profile snapshot (hr/authcache.py) instead of two DB queries.
+    """
+    def process_request(self, request):
+        if not hasattr(request, "session"):
+            raise ImproperlyConfigured(
+                "CachedAuthenticationMiddleware requires SessionMiddleware to be installed before it."
+            )
+        request.user = SimpleLazyObject(lambda: authcache.get_user(request))
+        request.auser = partial(authcache.aget_user, request)
+
+
+# --- Path policy ---------------------------------------------------------------
+# Rule flags (bit mask)
+PUBLIC = 1              # no user lookup at all (static)
+SUPERUSER_ONLY = 2      # authenticated non-superusers are sent back to the portal
+PASSWORD_EXEMPT = 4     # reachable while a password change is pending
+
 
-  # hr/middleware.py
+class PathPolicy:
+    """
+    Frozen character trie of URL rules, built once at startup.
+    Each node is (children, prefix_flags, exact_flags); lookup() walks the path once and
+    returns the flags of the longest matching rule (an exact rule beats a prefix rule).
+    Iterating a str yields cached one-character strings, so a lookup allocates nothing.
+    """
+    def __init__(self, prefix_rules, exact_rules):
+        root = ({}, 0, None)
+        for path, flags in prefix_rules:
+            root = self._insert(root, path, flags, exact=False)
+        for path, flags in exact_rules:
+            root = self._insert(root, path, flags, exact=True)
+        self._root = root
 
+    @classmethod
+    def _insert(cls, node, path, flags, exact):
+        children, prefix_flags, exact_flags = node
+        if not path:
+            return (children, prefix_flags, flags) if exact else (children, flags, exact_flags)
+        child = children.get(path[0], ({}, None, None))
+        children[path[0]] = cls._insert(child, path[1:], flags, exact)
+        return node
+
+    def lookup(self, path):
+        node = self._root
+        flags = node[1]
+        for ch in path:
+            node = node[0].get(ch)
+            if node is None:
+                return flags
+            if node[1] is not None:
+                flags = node[1]
+        return flags if node[2] is None else node[2]
+
+
+def must_change_password(user):
+    # Read from the cached employee snapshot (hr/authcache.py) — no query
+    emp = getattr(user, "employee_profile", None)
+    return bool(emp is not None and emp.must_change_password)
+
+
+class PathPolicyMiddleware:
+    """
+    Replaces AdminSuperuserOnlyMiddleware + ForcePasswordChangeMiddleware.
+    - /admin/ is superuser-only (others are redirected to the portal)
+    - employees with Employee.must_change_password are redirected to the password change page
+      except on login/logout/password-change/portal/i18n URLs
+    - static files never touch request.user; media (hr/media.py) checks it itself
+    All URLs are resolved once here; each request costs one trie lookup.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.portal_url = reverse("hr:portal")
+        self.password_change_url = reverse("password_change")
+        admin_url = reverse("admin:index")
+        self.policy = PathPolicy(
+            prefix_rules=[
+                (settings.STATIC_URL, PUBLIC),
+                (settings.MEDIA_URL, PASSWORD_EXEMPT),   # photos on the pages a pending change allows
+                (admin_url, SUPERUSER_ONLY),
+                ("/i18n/", PASSWORD_EXEMPT),
+            ],
+            exact_rules=[
+                (reverse("admin:login"), SUPERUSER_ONLY | PASSWORD_EXEMPT),
+                (reverse("admin:logout"), SUPERUSER_ONLY | PASSWORD_EXEMPT),
+                (reverse("login"), PASSWORD_EXEMPT),
+                (reverse("logout"), PASSWORD_EXEMPT),
+                (self.password_change_url, PASSWORD_EXEMPT),
+                (reverse("password_change_done"), PASSWORD_EXEMPT),
+                (self.portal_url, PASSWORD_EXEMPT),
+            ],
+        )
 
-class AdminSuperuserOnlyMiddleware:
-    def __init__(self, get_response): self.get_response = get_response
     def __call__(self, request):
-        if request.path.startswith("/admin/"):
-            if request.user.is_authenticated and not request.user.is_superuser:
-                return redirect("/hr/portal/")
+        flags = self.policy.lookup(request.path)
+        if flags & PUBLIC:
+            return self.get_response(request)
+        user = request.user
+        if user.is_authenticated:
+            if flags & SUPERUSER_ONLY and not user.is_superuser:
+                return redirect(self.portal_url)
+            if not flags & PASSWORD_EXEMPT and must_change_password(user):
+                return redirect(self.password_change_url)
         return self.get_response(request)
-    # You likely have a flag on the user/employee profile:
-        # requires_change = getattr(user, "must_change_password", False)
-        # or: getattr(getattr(user, "employee_profile", None), "must_change_password", False)
-        requires_change = getattr(user, "must_change_password", False)
-
-        if not requires_change:
-            return None
-
-        # Allowed paths (do not block)
-        allowed = {
-            reverse("login"),
-            reverse("logout"),
-            reverse("password_change"),
-            reverse("portal"),            # allow portal to render
-            "/admin/login/",
-            "/admin/logout/",
-            "/static/",                   # prefixes will be handled below
-        }
-
-        path = request.path
-
-        # Allow static files & admin static
-        if path.startswith("/static/") or path.startswith("/admin/js/"):
-            return None
-
-        # Allow the specific allowed endpoints
-        if path in allowed:
-            return None
-
-        # Already on password change page?
-        if path == reverse("password_change"):
-            return None
-
-        # Otherwise, force them to password change
-        return redirect("password_change")
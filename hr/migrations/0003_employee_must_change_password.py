@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0002_employee_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='must_change_password',
+            field=models.BooleanField(default=False),
+        ),
+    ]
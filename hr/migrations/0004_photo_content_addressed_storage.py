@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:52
+
+import hr.models
+import hr.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0003_employee_must_change_password'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='photo',
+            field=models.ImageField(blank=True, help_text='JPEG/PNG only, ≤ 30 KB', null=True, storage=hr.storage.ContentAddressedStorage(), upload_to=hr.models.employee_photo_upload_to, verbose_name='Employee Photo'),
+        ),
+    ]
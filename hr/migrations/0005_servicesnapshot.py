@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0004_photo_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceSnapshot',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='hr.employee')),
+                ('posting_college', models.CharField(blank=True, db_index=True, max_length=200)),
+                ('posting_designation', models.CharField(blank=True, max_length=120)),
+                ('posting_place', models.CharField(blank=True, max_length=200)),
+                ('posting_since', models.DateField(blank=True, null=True)),
+                ('on_deputation', models.BooleanField(db_index=True, default=False)),
+                ('deputation_college', models.CharField(blank=True, max_length=200)),
+                ('deputation_designation', models.CharField(blank=True, max_length=120)),
+                ('deputation_place', models.CharField(blank=True, max_length=200)),
+                ('deputation_since', models.DateField(blank=True, null=True)),
+                ('pay_level', models.CharField(blank=True, db_index=True, max_length=40)),
+                ('pay_level_since', models.DateField(blank=True, null=True)),
+                ('valid_until', models.DateField(blank=True, db_index=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0005_servicesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeniorityRank',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seniority', serialize=False, to='hr.employee')),
+                ('rank', models.PositiveIntegerField(db_index=True)),
+                ('sort_key', models.CharField(db_index=True, max_length=255)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+    ]
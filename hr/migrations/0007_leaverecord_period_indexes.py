@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0006_seniorityrank'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverecord',
+            index=models.Index(fields=['employee', 'period_from', 'period_to'], name='hr_leave_emp_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverecord',
+            index=models.Index(fields=['period_from', 'period_to'], name='hr_leave_period_idx'),
+        ),
+    ]
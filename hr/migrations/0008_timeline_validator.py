@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0007_leaverecord_period_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=12)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('employees_checked', models.PositiveIntegerField(default=0)),
+                ('issues_found', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimelineIssue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(choices=[('postings', 'Postings'), ('deputations', 'Deputations'), ('pay', 'Pay scale changes')], max_length=12)),
+                ('kind', models.CharField(choices=[('gap', 'Gap'), ('overlap', 'Overlap'), ('multiple_open', "Several 'till date' rows"), ('invalid', 'Missing or reversed dates')], max_length=16)),
+                ('start', models.DateField(blank=True, null=True)),
+                ('end', models.DateField(blank=True, null=True)),
+                ('detail', models.CharField(blank=True, max_length=255)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_issues', to='hr.employee')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issues', to='hr.timelinerun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['section', 'kind'], name='hr_timeline_section_kind_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0008_timeline_validator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SanctionedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('designation', models.CharField(max_length=120)),
+                ('sanctioned', models.PositiveIntegerField(default=0)),
+                ('college', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sanctioned_posts', to='hr.college')),
+            ],
+            options={
+                'ordering': ['college__name', 'designation'],
+                'constraints': [models.UniqueConstraint(fields=('college', 'designation'), name='hr_sanctioned_post_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0009_sanctionedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignationMaster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('key', models.CharField(editable=False, max_length=120, unique=True)),
+                ('level', models.CharField(blank=True, max_length=20)),
+            ],
+            options={
+                'verbose_name': 'designation',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('key', models.CharField(editable=False, max_length=120, unique=True)),
+                ('state', models.CharField(blank=True, max_length=120)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PayLevelMaster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('key', models.CharField(editable=False, max_length=120, unique=True)),
+            ],
+            options={
+                'verbose_name': 'pay level',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceMaster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('key', models.CharField(editable=False, max_length=120, unique=True)),
+            ],
+            options={
+                'verbose_name': 'service / branch',
+                'verbose_name_plural': 'services / branches',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='deputation',
+            name='college',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deputations', to='hr.college'),
+        ),
+        migrations.AddField(
+            model_name='posting',
+            name='college',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postings', to='hr.college'),
+        ),
+        migrations.AddField(
+            model_name='deputation',
+            name='designation_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deputations', to='hr.designationmaster'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='designation_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='hr.designationmaster'),
+        ),
+        migrations.AddField(
+            model_name='posting',
+            name='designation_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postings', to='hr.designationmaster'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='home_district_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='hr.district'),
+        ),
+        migrations.AddField(
+            model_name='advanceincrement',
+            name='pay_level_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='increments', to='hr.paylevelmaster'),
+        ),
+        migrations.AddField(
+            model_name='deputation',
+            name='pay_level_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deputations', to='hr.paylevelmaster'),
+        ),
+        migrations.AddField(
+            model_name='payscalechange',
+            name='pay_level_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pay_changes', to='hr.paylevelmaster'),
+        ),
+        migrations.AddField(
+            model_name='posting',
+            name='pay_level_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postings', to='hr.paylevelmaster'),
+        ),
+        migrations.AddField(
+            model_name='servicesnapshot',
+            name='pay_level_master',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hr.paylevelmaster'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='branch_master',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='hr.servicemaster'),
+        ),
+    ]
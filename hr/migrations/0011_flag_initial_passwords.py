@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def flag_initial_passwords(apps, schema_editor):
+    """
+    Employees whose account has never been used still hold the password issued with it
+    (the DOB/HRMS default or link_users' default): make them change it on first login.
+    Accounts that have logged in are left alone; telling whether they kept the default
+    would take a password-hash round per account.
+    """
+    Employee = apps.get_model("hr", "Employee")
+    Employee.objects.filter(
+        user__isnull=False, user__last_login__isnull=True, must_change_password=False,
+    ).exclude(user__password="").exclude(user__password__startswith="!").update(must_change_password=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0010_masters'),
+    ]
+
+    operations = [
+        migrations.RunPython(flag_initial_passwords, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+def create_lock_row(apps, schema_editor):
+    """The row hr/seniority.py locks; the ranks themselves come from `manage.py rebuild_seniority`."""
+    SeniorityLock = apps.get_model("hr", "SeniorityLock")
+    SeniorityLock.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0012_build_service_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeniorityLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'seniority lock',
+            },
+        ),
+        migrations.RunPython(create_lock_row, migrations.RunPython.noop),
+    ]
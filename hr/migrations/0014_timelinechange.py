@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def stamp_from_snapshots(apps, schema_editor):
+    """
+    Carry over the change stamps incremental runs used to read from
+    ServiceSnapshot.computed_at, so changes made since the last run are not lost
+    (employees whose snapshot was merely recomputed get rechecked once).
+    """
+    db = schema_editor.connection.alias
+    ServiceSnapshot = apps.get_model("hr", "ServiceSnapshot")
+    TimelineChange = apps.get_model("hr", "TimelineChange")
+    TimelineChange.objects.using(db).bulk_create(
+        (TimelineChange(employee_id=pk, changed_at=at) for pk, at in
+         ServiceSnapshot.objects.using(db).values_list("employee_id", "computed_at").iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0013_seniority_lock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineChange',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='hr.employee')),
+                ('changed_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(stamp_from_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    No-op. 0010 adds the master FKs empty; link existing rows after migrating with
+    `manage.py backfill_masters` (see FEATURE_NOTES.txt). Linking takes hr/normalize.py,
+    which works on the current models, so it is not run from here.
+    """
+
+    dependencies = [
+        ('hr', '0014_timelinechange'),
+    ]
+
+    operations = []
@@ -7,12 +7,15 @@ from django.core.files.storage import FileSystemStorage
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 
+from .masters import DesignationMaster, District, PayLevelMaster, ServiceMaster
+from .storage import ContentAddressedStorage
+
 STATUS_CHOICES = (('PENDING','Pending'), ('APPROVED','Approved'))
 
 MAX_PHOTO_BYTES = 30 * 1024  # 30 KB
 
 class OverwriteStorage(FileSystemStorage):
-    """Overwrite files with the same name instead of appending _1, _2..."""
+    """Overwrite files with the same name instead of appending _1, _2... (no longer used by Employee.photo)"""
     def get_available_name(self, name, max_length=None):
         if self.exists(name):
             self.delete(name)
@@ -24,6 +27,7 @@ def employee_photo_upload_to(instance, filename):
     Save as: employee_photos/<hrms-id>.<ext>
     - Uses HRMS ID as the filename (slugified)
     - Preserves the original extension (defaults to .jpg)
+    ContentAddressedStorage then swaps the file name for a hash of the content.
     """
     _, ext = os.path.splitext(filename)
     ext = (ext or ".jpg").lower()
@@ -45,6 +49,22 @@ class College(models.Model):
         return f"{self.name} ({self.code})" if self.code else self.name
 
 
+class SanctionedPost(models.Model):
+    """Number of sanctioned posts of a designation at a college (hr/strength.py)."""
+    college = models.ForeignKey(College, on_delete=models.CASCADE, related_name="sanctioned_posts")
+    designation = models.CharField(max_length=120)
+    sanctioned = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["college", "designation"], name="hr_sanctioned_post_unique"),
+        ]
+        ordering = ["college__name", "designation"]
+
+    def __str__(self):
+        return f"{self.college} - {self.designation}: {self.sanctioned}"
+
+
 # --- Core: Employee and related models ---------------------------------------
 class Employee(models.Model):
 
@@ -64,7 +84,7 @@ class Employee(models.Model):
     mobile = models.CharField(max_length=15, blank=True)
     photo = models.ImageField(
         upload_to=employee_photo_upload_to,
-        storage=OverwriteStorage(),
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         verbose_name="Employee Photo",
@@ -83,19 +103,10 @@ class Employee(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Overwrite file with same name (storage handles it) AND
-        remove previous stored file if filename changes (e.g., extension change).
-        Also re-check size for programmatic saves that may skip full_clean().
+        Re-check size for programmatic saves that may skip full_clean().
+        Superseded photo files are not deleted here: content-addressed files can be shared
+        and cached pages may still reference them; `manage.py sweep_photos` removes orphans.
         """
-        old_path = None
-        if self.pk:
-            try:
-                old = Employee.objects.get(pk=self.pk)
-                if old.photo and old.photo.name != (self.photo and self.photo.name):
-                    old_path = old.photo.name
-            except Employee.DoesNotExist:
-                pass
-
         # Safety check for direct programmatic saves (without forms)
         f = getattr(self, "photo", None)
         if f and hasattr(f, "size") and f.size > MAX_PHOTO_BYTES:
@@ -103,12 +114,6 @@ class Employee(models.Model):
 
         super().save(*args, **kwargs)
 
-        if old_path and self.photo and self.photo.storage.exists(old_path):
-            try:
-                self.photo.storage.delete(old_path)
-            except Exception:
-                pass
-
     # Home details (kept as text to avoid breaking existing data)
     home_state = models.CharField(max_length=60, blank=True)
     home_district = models.CharField(max_length=60, blank=True)
@@ -145,6 +150,18 @@ class Employee(models.Model):
     branch = models.CharField(max_length=120, blank=True)
     current_designation = models.CharField(max_length=120, blank=True)
 
+    # Master rows for home_district, branch and current_designation, derived from the
+    # text by hr/normalize.py; filters and reports use these ids
+    home_district_master = models.ForeignKey(
+        District, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="employees",
+    )
+    branch_master = models.ForeignKey(
+        ServiceMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="employees",
+    )
+    designation_master = models.ForeignKey(
+        DesignationMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="employees",
+    )
+
     bpsc_advt_no = models.CharField(max_length=120, blank=True)
     seniority_overall_rank = models.IntegerField(null=True, blank=True)
     selection_category = models.CharField(max_length=40, blank=True)
@@ -161,6 +178,8 @@ class Employee(models.Model):
 
     # Link to Django auth user for login
     user = models.OneToOneField(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='employee_profile')
+    # Set when a default password is issued; cleared by the password change view
+    must_change_password = models.BooleanField(default=False)
 
     def __str__(self):
         return f"{self.name} ({self.hrms_id})"
@@ -186,6 +205,16 @@ class Posting(models.Model):
     college_name = models.CharField(max_length=200, blank=True)  # kept as text
     pay_level = models.CharField(max_length=40, blank=True)
     designation = models.CharField(max_length=120, blank=True)
+    # Derived from the text columns above by hr/normalize.py
+    college = models.ForeignKey(
+        College, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="postings",
+    )
+    pay_level_master = models.ForeignKey(
+        PayLevelMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="postings",
+    )
+    designation_master = models.ForeignKey(
+        DesignationMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="postings",
+    )
     from_date = models.DateField(null=True, blank=True)
     to_date = models.DateField(null=True, blank=True)
     till_date = models.BooleanField(default=False)
@@ -206,6 +235,16 @@ class Deputation(models.Model):
     college_name = models.CharField(max_length=200, blank=True)  # kept as text
     pay_level = models.CharField(max_length=40, blank=True)
     designation = models.CharField(max_length=120, blank=True)
+    # Derived from the text columns above by hr/normalize.py
+    college = models.ForeignKey(
+        College, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="deputations",
+    )
+    pay_level_master = models.ForeignKey(
+        PayLevelMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="deputations",
+    )
+    designation_master = models.ForeignKey(
+        DesignationMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="deputations",
+    )
     from_date = models.DateField(null=True, blank=True)
     to_date = models.DateField(null=True, blank=True)
     till_date = models.BooleanField(default=False)
@@ -286,6 +325,9 @@ class Award(models.Model):
 class PayScaleChange(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="pay_changes")
     pay_level = models.CharField(max_length=40)
+    pay_level_master = models.ForeignKey(
+        PayLevelMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="pay_changes",
+    )  # derived by hr/normalize.py
     notif_no = models.CharField(max_length=120, blank=True)
     notif_date = models.DateField(null=True, blank=True)
     start_date = models.DateField(null=True, blank=True)
@@ -308,6 +350,9 @@ class AdvanceIncrement(models.Model):
     notif_date = models.DateField(null=True, blank=True)
     count = models.IntegerField(default=0)
     pay_level = models.CharField(max_length=40, blank=True)
+    pay_level_master = models.ForeignKey(
+        PayLevelMaster, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="increments",
+    )  # derived by hr/normalize.py
     effective_from = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
     approved_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
@@ -330,6 +375,13 @@ class LeaveRecord(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     reviewer_remark = models.TextField(blank=True)
 
+    class Meta:
+        # Interval queries (hr/intervals.py): per employee, and cadre-wide by date
+        indexes = [
+            models.Index(fields=["employee", "period_from", "period_to"], name="hr_leave_emp_period_idx"),
+            models.Index(fields=["period_from", "period_to"], name="hr_leave_period_idx"),
+        ]
+
     def __str__(self):
         return f"{self.employee.hrms_id} - {self.leave_type}"
 
@@ -366,6 +418,110 @@ class SelfEditPermission(models.Model):
         return f"SelfEditPermission({self.employee.hrms_id})"
 
 
+
+class ServiceSnapshot(models.Model):
+    """
+    Current posting, deputation and pay level of an employee, derived from their APPROVED
+    Posting/Deputation/PayScaleChange rows by hr/snapshot.py. Never edited by hand.
+    """
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name="snapshot")
+    posting_college = models.CharField(max_length=200, blank=True, db_index=True)
+    posting_designation = models.CharField(max_length=120, blank=True)
+    posting_place = models.CharField(max_length=200, blank=True)
+    posting_since = models.DateField(null=True, blank=True)
+    on_deputation = models.BooleanField(default=False, db_index=True)
+    deputation_college = models.CharField(max_length=200, blank=True)
+    deputation_designation = models.CharField(max_length=120, blank=True)
+    deputation_place = models.CharField(max_length=200, blank=True)
+    deputation_since = models.DateField(null=True, blank=True)
+    pay_level = models.CharField(max_length=40, blank=True, db_index=True)
+    pay_level_master = models.ForeignKey(
+        PayLevelMaster, on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+    pay_level_since = models.DateField(null=True, blank=True)
+    # First date on which a dated row starts or ends, i.e. the snapshot must be recomputed
+    valid_until = models.DateField(null=True, blank=True, db_index=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ServiceSnapshot({self.employee_id})"
+
+
+class SeniorityRank(models.Model):
+    """
+    Position of an employee in the cadre gradation list, maintained by hr/seniority.py.
+    sort_key encodes the configured seniority keys so that string order is seniority order.
+    """
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name="seniority")
+    rank = models.PositiveIntegerField(db_index=True)
+    sort_key = models.CharField(max_length=255, db_index=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["rank"]
+
+    def __str__(self):
+        return f"{self.rank}. {self.employee_id}"
+
+
+class SeniorityLock(models.Model):
+    """
+    Single row (pk 1) that hr/seniority.py locks before changing any rank, so that
+    concurrent moves, inserts and deletes apply one after another and keep ranks 1..N.
+    """
+
+    class Meta:
+        verbose_name = "seniority lock"
+
+
+class TimelineRun(models.Model):
+    """One run of the service-timeline validator (hr/timeline.py)."""
+    MODE_CHOICES = (("full", "Full"), ("incremental", "Incremental"))
+    mode = models.CharField(max_length=12, choices=MODE_CHOICES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    employees_checked = models.PositiveIntegerField(default=0)
+    issues_found = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.get_mode_display()} run {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class TimelineIssue(models.Model):
+    """A gap, overlap or other inconsistency in one employee's posting/deputation/pay history."""
+    SECTION_CHOICES = (("postings", "Postings"), ("deputations", "Deputations"), ("pay", "Pay scale changes"))
+    KIND_CHOICES = (
+        ("gap", "Gap"),
+        ("overlap", "Overlap"),
+        ("multiple_open", "Several 'till date' rows"),
+        ("invalid", "Missing or reversed dates"),
+    )
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="timeline_issues")
+    section = models.CharField(max_length=12, choices=SECTION_CHOICES)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    start = models.DateField(null=True, blank=True)
+    end = models.DateField(null=True, blank=True)
+    detail = models.CharField(max_length=255, blank=True)
+    run = models.ForeignKey(TimelineRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="issues")
+
+    class Meta:
+        indexes = [models.Index(fields=["section", "kind"], name="hr_timeline_section_kind_idx")]
+
+    def __str__(self):
+        return f"{self.employee_id} {self.section}: {self.get_kind_display()}"
+
+
+class TimelineChange(models.Model):
+    """When an employee's posting/deputation/pay rows last changed (hr/timeline.py, incremental runs)."""
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name="+")
+    changed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.employee_id} changed {self.changed_at:%Y-%m-%d %H:%M}"
+
 # --- Auto-create/sync User for employee login (HRMS ID + default password) ---
 @receiver(post_save, sender=Employee)
 def ensure_user_for_employee(sender, instance: Employee, created, **kwargs):
@@ -397,6 +553,7 @@ def ensure_user_for_employee(sender, instance: Employee, created, **kwargs):
             tail = str(instance.hrms_id)[-4:].rjust(4, "0")
             default_pwd = f"Ngp@{tail}"
         user.set_password(default_pwd)
+        instance.must_change_password = True
 
     user.is_active = True
     user.is_staff = False  # employees don't access admin by default
@@ -404,4 +561,4 @@ def ensure_user_for_employee(sender, instance: Employee, created, **kwargs):
 
     # link back to employee
     instance.user = user
-    instance.save(update_fields=["user"])
+    instance.save(update_fields=["user", "must_change_password"])
@@ -0,0 +1,227 @@
+# hr/normalize.py
+"""
+Keeps the master FKs (hr/masters.py, and College for the college text columns) in step
+with the free-text columns they stand for.
+
+LINKS lists, per model, (text field, FK field, master). Before each save the text is
+resolved to its master row by key: designations, branches, districts and pay levels
+get a new master row for a value not seen before; colleges are only matched (on name,
+code or "name (code)"), never created, since a College row carries a code and address
+the text cannot supply. Employee.college and present_posting_college are dropdowns in
+the admin, so they are only filled in while unset, or re-linked when their text changes
+and the FK did not change with it. Filters on college and branch also match the text of
+rows not (yet) linked to a master (college_filter(), branch_filter()).
+
+Code that writes these columns without signals (queryset.update, bulk_*) runs
+`manage.py backfill_masters` afterwards, which links whole tables with one UPDATE per
+distinct value.
+"""
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+
+from . import authcache, retirement, snapshot, strength
+from .masters import DesignationMaster, District, PayLevelMaster, ServiceMaster, normalize_key
+from .models import AdvanceIncrement, College, Deputation, Employee, PayScaleChange, Posting
+
+_SECTION_LINKS = (
+    ("college_name", "college", College),
+    ("designation", "designation_master", DesignationMaster),
+    ("pay_level", "pay_level_master", PayLevelMaster),
+)
+LINKS = {
+    Employee: (
+        ("college_name", "college", College),
+        ("present_posting", "present_posting_college", College),
+        ("home_district", "home_district_master", District),
+        ("branch", "branch_master", ServiceMaster),
+        ("current_designation", "designation_master", DesignationMaster),
+    ),
+    Posting: _SECTION_LINKS,
+    Deputation: _SECTION_LINKS,
+    PayScaleChange: (("pay_level", "pay_level_master", PayLevelMaster),),
+    AdvanceIncrement: (("pay_level", "pay_level_master", PayLevelMaster),),
+}
+# FKs edited directly in the admin: filled in from the text only while unset
+FILL_ONLY = {(Employee, "college"), (Employee, "present_posting_college")}
+
+
+def college_keys():
+    """{normalised name, code or "name (code)": College pk} (one query; the table is small)."""
+    keys = {}
+    for pk, name, code in College.objects.values_list("pk", "name", "code"):
+        keys[normalize_key(name)] = pk
+        if code:
+            keys.setdefault(normalize_key(code), pk)
+            keys[normalize_key(f"{name} ({code})")] = pk
+    return keys
+
+
+def resolve(Master, values, create=True):
+    """{key: master pk} for these text values; missing masters are created unless create=False."""
+    names = {}
+    # A new master takes a mixed-case spelling ("Lecturer") over "LECTURER" or "lecturer"
+    for value in sorted((v for v in values if v and v.strip()), key=lambda v: v.isupper() or v.islower()):
+        names.setdefault(normalize_key(value), " ".join(value.split()))
+    if not names:
+        return {}
+    if Master is College:
+        known = college_keys()
+        return {key: known[key] for key in names if key in known}
+    found = dict(Master.objects.filter(key__in=list(names)).values_list("key", "pk"))
+    missing = [Master(name=names[key], key=key) for key in names if key not in found]
+    if missing and create:
+        Master.objects.bulk_create(missing, ignore_conflicts=True)
+        found.update(Master.objects.filter(key__in=[m.key for m in missing]).values_list("key", "pk"))
+    return found
+
+
+def stored_links(instance):
+    """Saved text and FK of the fill-only links set on `instance` (one query; {} when there are none)."""
+    Model = type(instance)
+    fields = [
+        name for text_field, fk_field, _ in LINKS[Model]
+        if (Model, fk_field) in FILL_ONLY and getattr(instance, f"{fk_field}_id")
+        for name in (text_field, f"{fk_field}_id")
+    ]
+    if not fields or instance.pk is None:
+        return {}
+    return Model.objects.filter(pk=instance.pk).values(*fields).first() or {}
+
+
+def link(instance, text_fields=None, stored=None):
+    """
+    Set the master FKs of `instance` from its text (only those of `text_fields` if given);
+    returns the FK fields set. A fill-only FK already set is kept unless `stored`
+    (stored_links() before the save) shows its text changed and the FK did not.
+    """
+    Model = type(instance)
+    stored = stored or {}
+
+    def wanted(text_field, fk_field):
+        if text_fields is not None and text_field not in text_fields:
+            return False
+        fk_id = getattr(instance, f"{fk_field}_id")
+        if (Model, fk_field) not in FILL_ONLY or not fk_id:
+            return True
+        return (
+            text_field in stored and stored[f"{fk_field}_id"] == fk_id
+            and normalize_key(stored[text_field]) != normalize_key(getattr(instance, text_field))
+        )
+
+    pending = [(text_field, fk_field, Master) for text_field, fk_field, Master in LINKS[Model] if wanted(text_field, fk_field)]
+    values = {}
+    for text_field, _, Master in pending:
+        values.setdefault(Master, []).append(getattr(instance, text_field))
+    ids = {Master: resolve(Master, texts) for Master, texts in values.items()}
+    for text_field, fk_field, Master in pending:
+        setattr(instance, f"{fk_field}_id", ids[Master].get(normalize_key(getattr(instance, text_field))))
+    return [fk_field for _, fk_field, _ in pending]
+
+
+def matching(Master, value):
+    """Master rows a filter value selects: the row with that id, or those whose name (or college code) matches."""
+    value = " ".join(value.split())
+    q = Q(name__icontains=value)
+    if Master is College:
+        q |= Q(code__iexact=value)
+    if value.isdigit():
+        q |= Q(pk=int(value))
+    return Master.objects.filter(q)
+
+
+def _master_or_text(Master, fk_field, text_field, value, prefix):
+    return Q(**{f"{prefix}{fk_field}__in": matching(Master, value)}) | Q(**{
+        f"{prefix}{fk_field}__isnull": True, f"{prefix}{text_field}__icontains": " ".join(value.split()),
+    })
+
+
+def college_filter(value, prefix=""):
+    """Q for a college filter on Employee (`prefix` "employee__" from a related model): the matching College, or the text where unlinked."""
+    return _master_or_text(College, "college", "college_name", value, prefix)
+
+
+def branch_filter(value, prefix=""):
+    """Q for a branch filter on Employee: the matching ServiceMaster, or the text where unlinked."""
+    return _master_or_text(ServiceMaster, "branch_master", "branch", value, prefix)
+
+
+# === Bulk backfill ===============================================
+def backfill(dry_run=False):
+    """
+    Link every row of every LINKS model to its masters.
+    Returns ({"Model.fk": rows changed}, {master: masters created}, {unmatched college text: rows}).
+    """
+    changed, new_keys, unmatched, employee_ids = {}, {}, {}, set()
+    for Model, links in LINKS.items():
+        for text_field, fk_field, Master in links:
+            values = list(Model.objects.order_by().values_list(text_field, flat=True).distinct())
+            missing = set()
+            if Master is not College:
+                keys = {normalize_key(v) for v in values if v and v.strip()}
+                missing = keys - set(Master.objects.filter(key__in=list(keys)).values_list("key", flat=True))
+                new_keys.setdefault(Master, set()).update(missing)
+            ids = resolve(Master, values, create=not dry_run)
+            count = 0
+            for value in values:
+                pk = ids.get(normalize_key(value))
+                qs = Model.objects.filter(**{text_field: value})
+                if (Model, fk_field) in FILL_ONLY:
+                    qs = qs.filter(**{f"{fk_field}__isnull": True})
+                if pk is None and Master is College and value and value.strip():
+                    unmatched[value.strip()] = unmatched.get(value.strip(), 0) + qs.count()
+                    if (Model, fk_field) in FILL_ONLY:
+                        continue
+                if pk is None and normalize_key(value) in missing:     # dry run: master not created
+                    count += qs.count()
+                    continue
+                if pk is None:
+                    qs = qs.filter(**{f"{fk_field}__isnull": False})
+                else:
+                    qs = qs.exclude(**{f"{fk_field}_id": pk})
+                if dry_run:
+                    count += qs.count()
+                    continue
+                if Model is Employee:
+                    employee_ids.update(qs.values_list("pk", flat=True))
+                count += qs.update(**{f"{fk_field}_id": pk})
+            changed[f"{Model.__name__}.{fk_field}"] = count
+    created = {Master._meta.verbose_name_plural: len(keys) for Master, keys in new_keys.items()}
+    if not dry_run:
+        # queryset.update() sends no signals: refresh what depends on these FKs
+        if changed["PayScaleChange.pay_level_master"]:
+            snapshot.rebuild()
+        strength.invalidate()
+        retirement.invalidate()
+        authcache.invalidate_employees(employee_ids)
+    return changed, created, unmatched
+
+
+# === Receivers ===================================================
+def _text_fields(Model):
+    return {text_field for text_field, _, _ in LINKS[Model]}
+
+
+def _before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Saves limited to update_fields are linked after the save (below): the FK columns
+    # would not be written here
+    if raw:
+        return
+    instance._normalize_stored = stored_links(instance)
+    if update_fields is None:
+        link(instance, stored=instance._normalize_stored)
+
+
+def _after_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is None:
+        return
+    texts = _text_fields(sender) & set(update_fields)
+    if texts:
+        fk_fields = link(instance, texts, getattr(instance, "_normalize_stored", None))
+        sender.objects.filter(pk=instance.pk).update(**{f"{f}_id": getattr(instance, f"{f}_id") for f in fk_fields})
+        if sender is Employee:
+            authcache.invalidate_employees([instance.pk])
+
+
+for _model in LINKS:
+    pre_save.connect(_before_save, sender=_model, dispatch_uid=f"normalize-{_model.__name__}-pre")
+    post_save.connect(_after_save, sender=_model, dispatch_uid=f"normalize-{_model.__name__}-post")
@@ -0,0 +1,151 @@
+# hr/nplusone.py
+"""
+Duplicate-query (N+1) detection.
+
+QueryInspector fingerprints every SQL statement (literals and IN-lists collapsed) and
+remembers the Python stack that issued the first repeat of each fingerprint. It is used by:
+- NPlusOneMiddleware: logs (or raises, for development) when a request repeats a query
+  `threshold` times or more — enable with HR_NPLUSONE["enabled"]
+- QueryBudgetMixin: assertions for TestCase classes (hr/tests.py runs the page budgets)
+- `manage.py check_query_budgets`: per-page query budgets enforced in CI
+"""
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("hr.nplusone")
+
+# Defaults; override any key via settings.HR_NPLUSONE
+DEFAULTS = {
+    "enabled": False,
+    "threshold": 5,     # same fingerprint this many times in one request => flagged
+    "raise": False,     # raise NPlusOneError instead of logging (development)
+}
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def nplusone_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_NPLUSONE", {})}
+
+
+def fingerprint(sql):
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _project_stack(limit=8):
+    """Innermost frames from this project's code (falls back to the raw stack)."""
+    base = str(Path(settings.BASE_DIR))
+    frames = traceback.extract_stack()[:-3]
+    own = [f for f in frames if f.filename.startswith(base) and "site-packages" not in f.filename
+           and not f.filename.endswith("nplusone.py")]
+    return traceback.format_list((own or frames)[-limit:])
+
+
+class QueryInspector:
+    def __init__(self):
+        self.total = 0
+        self.counts = Counter()
+        self.samples = {}   # fingerprint -> raw SQL of the first occurrence
+        self.stacks = {}    # fingerprint -> stack of the first repeat
+
+    def __call__(self, execute, sql, params, many, context):
+        fp = fingerprint(sql)
+        self.total += 1
+        self.counts[fp] += 1
+        n = self.counts[fp]
+        if n == 1:
+            self.samples[fp] = sql
+        elif n == 2:
+            self.stacks[fp] = _project_stack()
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def capture(self):
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(self))
+            yield self
+
+    def duplicates(self, threshold):
+        return [
+            (fp, n, self.samples.get(fp, fp), self.stacks.get(fp, []))
+            for fp, n in self.counts.most_common() if n >= threshold
+        ]
+
+    def report(self, threshold, label=""):
+        lines = []
+        for fp, n, sample, stack in self.duplicates(threshold):
+            lines.append(f"{n}x {sample[:300]}")
+            lines.extend("    " + line.rstrip().replace("\n", "\n    ") for line in stack)
+        if not lines:
+            return ""
+        head = f"Repeated queries{' in ' + label if label else ''} ({self.total} total):"
+        return "\n".join([head] + lines)
+
+
+class NPlusOneMiddleware:
+    def __init__(self, get_response):
+        conf = nplusone_conf()
+        if not conf["enabled"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = conf["threshold"]
+        self.raise_errors = conf["raise"]
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with inspector.capture():
+            response = self.get_response(request)
+        report = inspector.report(self.threshold, f"{request.method} {request.path}")
+        if report:
+            if self.raise_errors:
+                raise NPlusOneError(report)
+            logger.warning(report)
+        return response
+
+
+class QueryBudgetMixin:
+    """
+    For django.test.TestCase subclasses; fails the test on a repeated query or an
+    exceeded budget:
+
+        with self.assertQueryBudget(6):
+            self.client.get("/hr/portal/")
+    """
+    nplusone_threshold = 3
+
+    @contextmanager
+    def assertNoNPlusOne(self, threshold=None, label=""):
+        inspector = QueryInspector()
+        with inspector.capture():
+            yield inspector
+        report = inspector.report(threshold or self.nplusone_threshold, label)
+        if report:
+            self.fail(report)
+
+    @contextmanager
+    def assertQueryBudget(self, budget, threshold=None, label=""):
+        with self.assertNoNPlusOne(threshold, label) as inspector:
+            yield inspector
+        if inspector.total > budget:
+            self.fail(f"{label}: {inspector.total} queries, budget is {budget}.\n" + "\n".join(
+                f"{n}x {inspector.samples[fp][:200]}" for fp, n in inspector.counts.most_common()
+            ))
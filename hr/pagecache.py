@@ -0,0 +1,96 @@
+# hr/pagecache.py
+"""
+Rendered-fragment cache for the employee portal.
+
+Templates wrap their data-dependent parts in Django's {% cache %} tag, keyed by
+("hr_portal", employee pk, fragment, LANGUAGE_CODE), so English and Hindi renders are
+stored separately. Fragments:
+- "portal": the header card on portal.html
+- "profile", "profile-photo": the read-only parts of employee/profile.html (never the form)
+- one per section code (PERM_MAP keys): the row list of readonly_list.html
+
+The receivers below delete exactly the affected keys (every language) when a section row,
+the Employee or its SelfEditPermission is saved or deleted. Code that bypasses signals
+(queryset.update/bulk_update) must call invalidate() itself.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import models
+
+FRAGMENT = "hr_portal"
+
+# Defaults; override any key via settings.HR_PAGE_CACHE
+DEFAULTS = {
+    "cache": "shared",
+    "timeout": 3600,    # 0 disables caching
+}
+
+# Section model -> fragment (the section codes used by views.PERM_MAP)
+SECTIONS = {
+    models.Education: "education",
+    models.Posting: "postings",
+    models.Deputation: "deputations",
+    models.Apar: "apar",
+    models.PropertyReturn: "property",
+    models.Training: "trainings",
+    models.Award: "awards",
+    models.PayScaleChange: "pay",
+    models.AdvanceIncrement: "increments",
+    models.LeaveRecord: "leaves",
+    models.Allegation: "allegations",
+}
+EMPLOYEE_FRAGMENTS = ("portal", "profile", "profile-photo")
+
+
+def page_cache_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_PAGE_CACHE", {})}
+
+
+def template_context():
+    """Context for the {% cache page_cache.timeout ... using=page_cache.using %} tags."""
+    conf = page_cache_conf()
+    return {"page_cache": {"timeout": conf["timeout"], "using": conf["cache"]}}
+
+
+def fragment_key(employee_id, fragment, language):
+    return make_template_fragment_key(FRAGMENT, [employee_id, fragment, language])
+
+
+def invalidate(employee_ids, fragments=None):
+    """Drop the given fragments (default: all of them) of these employees, in every language."""
+    fragments = fragments or EMPLOYEE_FRAGMENTS + tuple(SECTIONS.values())
+    keys = [
+        fragment_key(emp_id, fragment, code)
+        for emp_id in employee_ids if emp_id is not None
+        for fragment in fragments
+        for code, _ in settings.LANGUAGES
+    ]
+    if keys:
+        caches[page_cache_conf()["cache"]].delete_many(keys)
+
+
+def _section_changed(sender, instance, **kwargs):
+    invalidate([instance.employee_id], [SECTIONS[sender]])
+
+
+for _model in SECTIONS:
+    post_save.connect(_section_changed, sender=_model, dispatch_uid=f"pagecache-{_model.__name__}-save")
+    post_delete.connect(_section_changed, sender=_model, dispatch_uid=f"pagecache-{_model.__name__}-delete")
+
+
+@receiver(post_save, sender=models.Employee)
+@receiver(post_delete, sender=models.Employee)
+def _employee_changed(sender, instance, **kwargs):
+    # Section rows render the employee's HRMS ID, so every fragment depends on the Employee
+    invalidate([instance.pk])
+
+
+@receiver(post_save, sender=models.SelfEditPermission)
+@receiver(post_delete, sender=models.SelfEditPermission)
+def _permission_changed(sender, instance, **kwargs):
+    # The flags switch section pages between the formset and the read-only list
+    invalidate([instance.employee_id], tuple(SECTIONS.values()))
@@ -0,0 +1,181 @@
+# hr/photo_ingest.py
+"""
+Bulk photo ingest from a ZIP of files named by HRMS ID (e.g. 10234567.jpg, any folder).
+
+Entries are matched to employees through one hrms_id -> pk lookup, read one at a time
+(at most a few per worker ahead of the pool), recompressed in a process pool until they
+fit MAX_PHOTO_BYTES (JPEG quality steps first, then downscaling), stored through
+Employee.photo's storage (content-addressed, hr/storage.py) and written with bulk_update
+in batches. bulk_update sends no signals, so each batch invalidates the cached portal
+fragments and auth snapshots itself; derivatives are built lazily on first view
+(or by `manage.py build_photo_derivatives`).
+
+Used by `manage.py ingest_photos` (process pool) and the "Ingest photos from ZIP" admin
+action (in-process: web workers do not start pools).
+"""
+import io
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from . import authcache, pagecache
+from .models import MAX_PHOTO_BYTES, Employee, employee_photo_upload_to
+
+logger = logging.getLogger("hr.photo_ingest")
+
+# Defaults; override any key via settings.HR_PHOTO_INGEST
+DEFAULTS = {
+    "workers": None,                    # process pool size; None = CPU count, 0/1 = in-process
+    "batch_size": 200,                  # rows per bulk_update
+    "read_ahead": 4,                    # entries read ahead per pool worker
+    "max_entry_bytes": 20 * 1024 * 1024,  # larger ZIP entries are refused (zip bombs)
+    "max_side": 600,                    # longest side before the quality search starts
+    "min_side": 120,                    # give up rather than go below this
+    "qualities": (85, 75, 65, 55, 45),
+}
+EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def ingest_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_PHOTO_INGEST", {})}
+
+
+def compress(data, limit=MAX_PHOTO_BYTES, max_side=600, min_side=120, qualities=(85, 75, 65, 55, 45)):
+    """JPEG bytes of the image in `data`, no larger than `limit`; ValueError if impossible."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode not in ("RGB", "L"):
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    image = image.convert("RGB")
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    while True:
+        for quality in qualities:
+            buf = io.BytesIO()
+            image.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+            if buf.tell() <= limit:
+                return buf.getvalue()
+        width, height = image.size
+        if max(width, height) * 0.8 < min_side:
+            raise ValueError(f"cannot fit {limit // 1024} KB above {min_side}px")
+        image = image.resize((int(width * 0.8), int(height * 0.8)), Image.LANCZOS)
+
+
+def _compress_job(args):
+    # Top-level so the process pool can pickle it; returns (hrms_id, data, error)
+    hrms_id, data, options = args
+    try:
+        return hrms_id, compress(data, **options), None
+    except Exception as exc:    # corrupt/unsupported image: report, don't abort the batch
+        return hrms_id, None, str(exc) or exc.__class__.__name__
+
+
+class IngestReport:
+    def __init__(self):
+        self.updated = []       # hrms_ids
+        self.unmatched = []     # hrms_ids with no Employee
+        self.failed = []        # (entry name, reason)
+        self.skipped = []       # (entry name, reason): not an image, duplicate, too large
+
+    def summary(self):
+        return (
+            f"{len(self.updated)} updated, {len(self.unmatched)} unmatched, "
+            f"{len(self.failed)} failed, {len(self.skipped)} skipped"
+        )
+
+
+def _entries(archive, report, max_entry_bytes):
+    """hrms_id -> ZipInfo; the last entry wins for duplicate IDs."""
+    entries = {}
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        stem, ext = os.path.splitext(base)
+        if info.is_dir() or not base or base.startswith(".") or "__MACOSX" in info.filename:
+            continue
+        if ext.lower() not in EXTENSIONS:
+            report.skipped.append((info.filename, "not a JPEG/PNG"))
+        elif info.file_size > max_entry_bytes:
+            report.skipped.append((info.filename, "entry too large"))
+        else:
+            if stem.strip() in entries:
+                report.skipped.append((entries[stem.strip()].filename, f"duplicate of {info.filename}"))
+            entries[stem.strip()] = info
+    return entries
+
+
+def _results(archive, entries, hrms_ids, options, pool, window):
+    """(hrms_id, data, error) per entry, in order; each entry is read only when its job is submitted."""
+    jobs = ((hrms_id, archive.read(entries[hrms_id]), options) for hrms_id in hrms_ids)
+    if pool is None:
+        yield from map(_compress_job, jobs)
+        return
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(_compress_job, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def ingest_zip(fileobj, employees=None, workers=None, batch_size=None, dry_run=False):
+    """
+    Ingest photos from the ZIP `fileobj` (path or file object). `employees` (a queryset)
+    restricts matching; files for anyone else count as unmatched. workers=0 or 1 compresses
+    in-process.
+    """
+    conf = ingest_conf()
+    workers = conf["workers"] if workers is None else workers
+    batch_size = batch_size or conf["batch_size"]
+    options = {k: conf[k] for k in ("max_side", "min_side", "qualities")}
+    report = IngestReport()
+    storage = Employee._meta.get_field("photo").storage
+
+    pool = None
+    with zipfile.ZipFile(fileobj) as archive:
+        entries = _entries(archive, report, conf["max_entry_bytes"])
+        pks = dict(
+            (employees if employees is not None else Employee.objects)
+            .filter(hrms_id__in=list(entries)).values_list("hrms_id", "pk")
+        )
+        report.unmatched = sorted(set(entries) - set(pks))
+        try:
+            size = 1 if workers is not None and workers <= 1 else workers or os.cpu_count() or 1
+            if size > 1:
+                pool = ProcessPoolExecutor(max_workers=size)
+            window = conf["read_ahead"] * size
+            batch = []
+            for hrms_id, data, error in _results(archive, entries, sorted(pks), options, pool, window):
+                if error:
+                    report.failed.append((entries[hrms_id].filename, error))
+                    continue
+                report.updated.append(hrms_id)
+                if dry_run:
+                    continue
+                emp = Employee(pk=pks[hrms_id], hrms_id=hrms_id)
+                emp.photo = storage.save(employee_photo_upload_to(emp, "photo.jpg"), ContentFile(data))
+                batch.append(emp)
+                if len(batch) >= batch_size:
+                    _write(batch)
+                    batch = []
+            if batch:
+                _write(batch)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    logger.info("Photo ingest: %s", report.summary())
+    return report
+
+
+def _write(batch):
+    Employee.objects.bulk_update(batch, ["photo"])
+    pks = [emp.pk for emp in batch]
+    pagecache.invalidate(pks, pagecache.EMPLOYEE_FRAGMENTS)
+    authcache.invalidate_employees(pks)
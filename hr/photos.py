@@ -0,0 +1,133 @@
+# hr/photos.py
+"""
+Derived sizes of employee photos.
+
+For employee_photos/<name>.<ext> we keep, per configured size, a JPEG and a WebP copy at
+employee_photos_derived/<size>/<name>.{jpg,webp}. They are generated when a photo is
+uploaded (signals below) or, for photos that arrived some other way, on the first request
+for them (views.photo_derivative). Templates use the {% employee_photo %} tag
+(templatetags/photo_tags.py) and the admin uses picture_html(), both of which emit a
+<picture> with the WebP source and the JPEG fallback.
+
+Photo names are content hashes (hr/storage.py), so derivatives never go stale: a new
+photo gets new names, and one derivative set serves every employee with the same photo.
+Nothing is deleted here; `manage.py sweep_photos` removes files no employee refers to.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .models import Employee
+
+logger = logging.getLogger("hr.photos")
+
+DERIVED_DIR = "employee_photos_derived"
+
+# Defaults; override any key via settings.HR_PHOTO_DERIVATIVES
+DEFAULTS = {
+    # name -> (width, height, crop). Displayed at 40-64 px (thumb) and 96-160 px (preview),
+    # so both are ~2x for high-density screens.
+    "sizes": {
+        "thumb": (96, 96, True),
+        "preview": (320, 320, False),
+    },
+    "jpeg_quality": 80,
+    "webp_quality": 75,
+}
+FORMATS = {"jpg": "JPEG", "webp": "WEBP"}
+
+
+def derivatives_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_PHOTO_DERIVATIVES", {})}
+
+
+def derivative_name(photo_name, size, fmt):
+    stem = os.path.splitext(os.path.basename(photo_name))[0]
+    return f"{DERIVED_DIR}/{size}/{stem}.{fmt}"
+
+
+def generate(photo):
+    """Write every size/format of `photo` (a FieldFile); returns the stored names."""
+    from PIL import Image, ImageOps
+
+    conf = derivatives_conf()
+    storage = photo.storage
+    with storage.open(photo.name, "rb") as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.load()
+    if image.mode not in ("RGB", "L"):
+        # Flatten transparency onto white (JPEG has no alpha)
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    image = image.convert("RGB")
+
+    written = []
+    for size, (width, height, crop) in conf["sizes"].items():
+        if crop:
+            resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.LANCZOS)
+        for fmt, pil_format in FORMATS.items():
+            buf = io.BytesIO()
+            if pil_format == "JPEG":
+                resized.save(buf, pil_format, quality=conf["jpeg_quality"], optimize=True, progressive=True)
+            else:
+                resized.save(buf, pil_format, quality=conf["webp_quality"], method=4)
+            name = derivative_name(photo.name, size, fmt)
+            written.append(storage.save_exact(name, ContentFile(buf.getvalue())))
+    return written
+
+
+def derivative_url(employee, size, fmt="jpg"):
+    """Stored derivative's URL, or the generating view's URL when it does not exist yet."""
+    photo = employee.photo
+    name = derivative_name(photo.name, size, fmt)
+    if photo.storage.exists(name):
+        return photo.storage.url(name)
+    return reverse("hr:photo-derivative", args=[employee.pk, size, fmt])
+
+
+def picture_html(employee, size, css_class="", style="", alt="Photo"):
+    """<picture> with WebP and JPEG sources for `employee`'s photo ('' when there is none)."""
+    if not getattr(employee, "photo", None):
+        return ""
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy"></picture>',
+        derivative_url(employee, size, "webp"), derivative_url(employee, size, "jpg"), alt, css_class, style,
+    )
+
+
+# --- Generate on upload ---------------------------------------------------------
+def has_derivatives(photo):
+    return all(
+        photo.storage.exists(derivative_name(photo.name, size, fmt))
+        for size in derivatives_conf()["sizes"] for fmt in FORMATS
+    )
+
+
+@receiver(pre_save, sender=Employee)
+def _photo_uploading(sender, instance, **kwargs):
+    photo = instance.photo
+    # An uncommitted FieldFile is a fresh upload; FileField.pre_save stores it after this signal
+    instance._photos_uploaded = bool(photo) and not photo._committed
+
+
+@receiver(post_save, sender=Employee)
+def _photo_uploaded(sender, instance, **kwargs):
+    if not getattr(instance, "_photos_uploaded", False) or has_derivatives(instance.photo):
+        return
+    try:
+        generate(instance.photo)
+    except Exception:
+        # The upload itself succeeded; the derivative view retries on first request
+        logger.exception("Could not build derivatives for %s", instance.photo.name)
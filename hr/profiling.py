@@ -0,0 +1,146 @@
+# hr/profiling.py
+"""
+Sampled request profiling.
+
+A configurable fraction of requests is run under cProfile with every DB query timed.
+Each sampled request is logged to the "hr.profiling" logger. Requests slower than
+slow_ms also get a .prof (pstats) + .json pair written to a rotating local directory.
+`python manage.py profile_report` summarizes those dumps.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.text import slugify
+
+logger = logging.getLogger("hr.profiling")
+
+# Defaults; override any key via settings.HR_PROFILER
+DEFAULTS = {
+    "sample_rate": 0.0,     # 0.0 disables the middleware entirely
+    "slow_ms": 1000,        # dump cProfile stats for sampled requests at/above this wall time
+    "dir": None,            # defaults to <BASE_DIR>/var/profiles
+    "keep": 200,            # newest dumps kept; older ones are deleted on each new dump
+    "top_queries": 5,
+}
+
+
+def profiler_conf():
+    conf = {**DEFAULTS, **getattr(settings, "HR_PROFILER", {})}
+    conf["dir"] = Path(conf["dir"] or Path(settings.BASE_DIR) / "var" / "profiles")
+    return conf
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() hook: counts and times queries, grouped by SQL text."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.by_sql = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            entry = self.by_sql.setdefault(sql, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def top(self, n):
+        ranked = sorted(self.by_sql.items(), key=lambda kv: kv[1][1], reverse=True)[:n]
+        return [{"sql": sql, "count": c, "ms": round(s * 1000, 2)} for sql, (c, s) in ranked]
+
+    def wrap_all(self, stack):
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(self))
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name if match else "") or request.path
+
+
+class SampledProfilerMiddleware:
+    def __init__(self, get_response):
+        conf = profiler_conf()
+        if conf["sample_rate"] <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = conf["sample_rate"]
+        self.slow_ms = conf["slow_ms"]
+        self.dir = conf["dir"]
+        self.keep = conf["keep"]
+        self.top_queries = conf["top_queries"]
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            recorder.wrap_all(stack)
+            start = time.perf_counter()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is already active in this thread
+                profiler = None
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            wall_ms = (time.perf_counter() - start) * 1000
+
+        record = {
+            "endpoint": endpoint_name(request),
+            "path": request.path,
+            "method": request.method,
+            "status": response.status_code,
+            "wall_ms": round(wall_ms, 2),
+            "queries": recorder.count,
+            "db_ms": round(recorder.seconds * 1000, 2),
+            "top_queries": recorder.top(self.top_queries),
+            "pid": os.getpid(),
+            "ts": time.time(),
+        }
+        logger.info(
+            "%s %s %s %.1fms queries=%d db=%.1fms",
+            record["method"], record["endpoint"], record["status"], wall_ms, recorder.count, record["db_ms"],
+        )
+        if profiler is not None and wall_ms >= self.slow_ms:
+            try:
+                self._dump(profiler, record)
+            except OSError:
+                logger.exception("Could not write profile dump to %s", self.dir)
+        return response
+
+    def _dump(self, profiler, record):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        stem = "%d-%d-%s" % (record["ts"] * 1000, record["pid"], slugify(record["endpoint"])[:60] or "root")
+        profiler.dump_stats(self.dir / f"{stem}.prof")
+        record["profile"] = f"{stem}.prof"
+        (self.dir / f"{stem}.json").write_text(json.dumps(record, indent=1))
+        self._rotate()
+
+    def _rotate(self):
+        dumps = sorted(self.dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in dumps[self.keep:]:
+            for p in (old, old.with_suffix(".prof")):
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,182 @@
+# hr/reports.py
+"""
+Staff reports built on derived data and indexes (SeniorityRank, the retirement
+projection, leave intervals, ...). All read from the reporting alias (hr/routers.py).
+"""
+import csv
+import datetime
+import itertools
+
+from django.contrib.auth.decorators import user_passes_test
+from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from . import compliance, intervals, retirement, strength
+from .admission import admission
+from .masters import ServiceMaster
+from .models import College, SeniorityRank
+from .routers import reporting_reads, use_reporting_db
+from .views import _is_staff
+
+PAGE_SIZE = 100
+CHUNK_SIZE = 1000
+GRADATION_COLUMNS = (
+    "rank", "employee__hrms_id", "employee__name", "employee__current_designation",
+    "employee__date_joining", "employee__bpsc_advt_no", "employee__seniority_overall_rank",
+    "employee__selection_category", "employee__college_name",
+)
+GRADATION_HEADERS = [
+    "Rank", "HRMS", "Name", "Designation", "Date of Joining", "BPSC Advt No", "Merit Rank", "Category", "College",
+]
+
+
+class _Echo:
+    """File-like object for csv.writer that returns each row instead of buffering it."""
+    def write(self, value):
+        return value
+
+
+# === Gradation list ==============================================
+@user_passes_test(_is_staff)
+@use_reporting_db
+def gradation(request):
+    # Ranks are 1..N without gaps, so a page is an indexed range instead of OFFSET
+    total = SeniorityRank.objects.count()
+    pages = max(1, -(-total // PAGE_SIZE))
+    try:
+        page = int(request.GET.get("page") or 1)
+    except ValueError:
+        raise Http404("Invalid page")
+    if not 1 <= page <= pages:
+        raise Http404("Invalid page")
+    first = (page - 1) * PAGE_SIZE + 1
+    rows = SeniorityRank.objects.filter(rank__gte=first, rank__lt=first + PAGE_SIZE).values(*GRADATION_COLUMNS)
+    return render(request, "gradation.html", {
+        "rows": rows, "total": total, "page": page, "pages": pages,
+        "previous_page": page - 1 if page > 1 else None,
+        "next_page": page + 1 if page < pages else None,
+    })
+
+
+def _gradation_rows():
+    after = 0
+    while True:
+        # The body is produced after the view returns, outside @use_reporting_db
+        with reporting_reads():
+            chunk = list(
+                SeniorityRank.objects.filter(rank__gt=after).order_by("rank").values_list(*GRADATION_COLUMNS)[:CHUNK_SIZE]
+            )
+        yield from chunk
+        if len(chunk) < CHUNK_SIZE:
+            return
+        after = chunk[-1][0]
+
+
+@user_passes_test(_is_staff)
+def gradation_csv(request):
+    writer = csv.writer(_Echo())
+    rows = itertools.chain([GRADATION_HEADERS], _gradation_rows())
+    resp = StreamingHttpResponse((writer.writerow(row) for row in rows), content_type="text/csv")
+    resp["Content-Disposition"] = "attachment; filename=gradation_list.csv"
+    return resp
+
+
+# === Retirement projection =======================================
+@user_passes_test(_is_staff)
+@use_reporting_db
+def retirement_projection(request):
+    try:
+        years = min(max(int(request.GET.get("years") or 0), 0), 40) or None
+    except ValueError:
+        years = None
+    result = retirement.projection(years)
+    college = (request.GET.get("college") or "").strip()
+    rows = [r for r in result["rows"] if college.lower() in r["college"].lower()] if college else result["rows"]
+    return render(request, "retirement.html", {
+        "result": result, "rows": rows, "college": college,
+        "age": retirement.retirement_conf()["superannuation_age"],
+    })
+
+
+# === On leave ====================================================
+def _date_param(request, name):
+    try:
+        return datetime.date.fromisoformat(request.GET.get(name) or "")
+    except ValueError:
+        return None
+
+
+@user_passes_test(_is_staff)
+@use_reporting_db
+def on_leave(request):
+    start = _date_param(request, "date") or timezone.localdate()
+    end = _date_param(request, "to")
+    if end and end < start:
+        start, end = end, start
+    college = (request.GET.get("college") or "").strip()
+    statuses = ("APPROVED", "PENDING") if request.GET.get("pending") else None
+    leaves = intervals.on_leave(start, end, college=college or None, statuses=statuses)[:PAGE_SIZE * 10]
+    return render(request, "on_leave.html", {
+        "leaves": leaves, "start": start, "end": end, "college": college,
+        "colleges": College.objects.values_list("pk", "name"),
+        "pending": bool(statuses), "limit": PAGE_SIZE * 10,
+    })
+
+
+# === Sanctioned vs. posted strength ==============================
+@user_passes_test(_is_staff)
+@use_reporting_db
+def strength_report(request):
+    result = strength.report()
+    if request.GET.get("format") == "json":
+        # Head-office dashboards: the whole report in one response
+        return JsonResponse(result)
+    return render(request, "strength.html", {"result": result})
+
+
+# === APAR / property-return compliance ===========================
+def _compliance_params(request):
+    years = compliance.default_years()
+    try:
+        first = int(request.GET.get("from") or years[0])
+        last = int(request.GET.get("to") or years[-1])
+    except ValueError:
+        first, last = years[0], years[-1]
+    first, last = min(first, last), max(first, last)
+    years = list(range(max(first, last - 19), last + 1))     # at most 20 columns per return
+    college = (request.GET.get("college") or "").strip()
+    branch = (request.GET.get("branch") or "").strip()
+    return years, college, branch
+
+
+@user_passes_test(_is_staff)
+@use_reporting_db
+def compliance_matrix(request):
+    years, college, branch = _compliance_params(request)
+    qs = compliance.employees(college, branch)
+    page = Paginator(qs.values(*compliance.EMPLOYEE_COLUMNS), PAGE_SIZE).get_page(request.GET.get("page"))
+    employees = list(page)
+    sparse = compliance.matrix([e["pk"] for e in employees], years)
+    return render(request, "compliance.html", {
+        "years": years, "college": college, "branch": branch, "page": page,
+        "colleges": College.objects.values_list("pk", "name"),
+        "branches": ServiceMaster.objects.values_list("pk", "name"),
+        "rows": list(compliance.rows(employees, sparse, years)),
+        "labels": compliance.RETURN_LABELS,
+        "query": request.GET.urlencode(),
+    })
+
+
+@user_passes_test(_is_staff)
+@use_reporting_db
+@admission("export_excel")
+def compliance_xlsx(request):
+    years, college, branch = _compliance_params(request)
+    out = compliance.write_xlsx(compliance.employees(college, branch), years)
+    # FileResponse streams the spooled file in blocks and closes it
+    return FileResponse(
+        out, as_attachment=True, filename=f"compliance_{years[0]}_{years[-1]}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
@@ -3,7 +3,9 @@ from import_export import resources, fields
 from import_export.widgets import Widget, BooleanWidget
 from datetime import datetime
 import re
+import time
 from .models import Employee
+from . import metrics
 
 class MultiFormatDateWidget(Widget):
     """
@@ -50,7 +52,20 @@ class MultiFormatDateWidget(Widget):
             return ""
         return value.strftime("%Y-%m-%d")  # export in ISO
 
-class EmployeeResource(resources.ModelResource):
+class MetricsResourceMixin:
+    """Feeds import rows/sec into hr/metrics.py (hr_import_rows_total / hr_import_seconds_total)."""
+    def before_import(self, dataset, **kwargs):
+        self._import_started = time.perf_counter()
+        return super().before_import(dataset, **kwargs)
+
+    def after_import(self, dataset, result, **kwargs):
+        started = getattr(self, "_import_started", None)
+        if started is not None and not kwargs.get("dry_run"):
+            metrics.observe_import(type(self).__name__, len(dataset), time.perf_counter() - started)
+        return super().after_import(dataset, result, **kwargs)
+
+
+class EmployeeResource(MetricsResourceMixin, resources.ModelResource):
     dob = fields.Field(column_name="dob", attribute="dob", widget=MultiFormatDateWidget())
     date_joining = fields.Field(column_name="date_joining", attribute="date_joining", widget=MultiFormatDateWidget())
     date_confirmation = fields.Field(column_name="date_confirmation", attribute="date_confirmation", widget=MultiFormatDateWidget())
@@ -0,0 +1,163 @@
+# hr/retirement.py
+"""
+Retirement projection: how many employees retire per year, per college and designation.
+
+All employees are read in one projected query (pk, dob, date_retirement, college,
+designation master). Retirement dates are derived with pandas for everyone whose
+date_retirement is blank, under the FR 56 rule: an employee retires on the afternoon of
+the last day of the month in which they reach the superannuation age, or of the previous
+month when born on the 1st. A recorded date_retirement always wins.
+
+The aggregate is computed on the primary (even from @use_reporting_db views) and cached
+in the shared cache under a versioned key; when an Employee field it depends on changes
+(receiver below) the version is bumped once the transaction commits, so every cached
+projection goes stale at once without a registry of keys. pandas is imported on first use, never at boot
+(see check_import_budget).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import authcache, pagecache
+from .models import Employee
+from .routers import primary_reads
+
+CACHE_KEY = "hr:retirement-projection"
+VERSION_KEY = f"{CACHE_KEY}:version"
+
+# Defaults; override any key via settings.HR_RETIREMENT
+DEFAULTS = {
+    "superannuation_age": 60,
+    "horizon_years": 10,
+    "cache": "shared",
+    "timeout": 24 * 3600,
+}
+FIELDS = ("dob", "date_retirement", "college", "college_name", "current_designation", "designation_master")
+
+
+def retirement_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_RETIREMENT", {})}
+
+
+def frame():
+    """One row per employee: pk, hrms_id, college, designation, retirement (derived where blank), derived."""
+    import pandas as pd
+
+    rows = Employee.objects.values_list(
+        "pk", "hrms_id", "dob", "date_retirement", "college__name", "college_name",
+        "designation_master__name", "current_designation",
+    )
+    df = pd.DataFrame.from_records(
+        list(rows), columns=[
+            "pk", "hrms_id", "dob", "recorded", "college_fk", "college_text", "designation", "designation_text",
+        ],
+    )
+    # Prefer the College FK's name; fall back to the legacy text column
+    df["college"] = df["college_fk"].where(df["college_fk"].notna() & (df["college_fk"] != ""), df["college_text"])
+    df["college"] = df["college"].fillna("").str.strip().replace("", "(unassigned)")
+    # Designation master (hr/masters.py) groups spelling variants; text only where unlinked
+    df["designation"] = df["designation"].fillna(df["designation_text"])
+    df["designation"] = df["designation"].fillna("").str.strip().replace("", "(unspecified)")
+
+    dob = pd.to_datetime(df["dob"], errors="coerce")
+    age = retirement_conf()["superannuation_age"]
+    # Month in which the age is attained; born on the 1st -> the previous month (FR 56)
+    months = (dob.dt.year + age) * 12 + (dob.dt.month - 1) - (dob.dt.day == 1).astype(int)
+    month_start = pd.to_datetime(
+        pd.DataFrame({"year": months // 12, "month": months % 12 + 1, "day": 1}), errors="coerce",
+    )
+    derived = month_start + pd.offsets.MonthEnd(0)
+    recorded = pd.to_datetime(df["recorded"], errors="coerce")
+    df["derived"] = recorded.isna() & derived.notna()
+    df["retirement"] = recorded.fillna(derived)
+    return df.drop(columns=["dob", "recorded", "college_fk", "college_text", "designation_text"])
+
+
+def _aggregate(horizon_years, today):
+    df = frame()
+    df = df[df["retirement"].notna()]
+    years = df["retirement"].dt.year
+    df = df[(years >= today.year) & (years < today.year + horizon_years)]
+    counts = (
+        df.assign(year=df["retirement"].dt.year)
+        .groupby(["year", "college", "designation"]).size()
+        .reset_index(name="count")
+        .sort_values(["year", "college", "designation"])
+    )
+    by_year = counts.groupby("year")["count"].sum()
+    return {
+        "rows": [
+            {"year": int(r.year), "college": r.college, "designation": r.designation, "count": int(r.count)}
+            for r in counts.itertuples(index=False)
+        ],
+        "by_year": {int(y): int(n) for y, n in by_year.items()},
+        "total": int(counts["count"].sum()),
+        "derived": int(df["derived"].sum()),
+        "from_year": today.year,
+        "horizon_years": horizon_years,
+        "computed_at": timezone.now(),
+    }
+
+
+def projection(horizon_years=None):
+    """Counts by year x college x designation for the next `horizon_years` years (cached)."""
+    conf = retirement_conf()
+    horizon_years = horizon_years or conf["horizon_years"]
+    today = timezone.localdate()
+    cache = caches[conf["cache"]]
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A fresh (or evicted) version starts from the clock, never reusing an older one
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    key = f"{CACHE_KEY}:{version}:{horizon_years}:{today.year}"
+    result = cache.get(key)
+    if result is None:
+        with primary_reads():
+            result = _aggregate(horizon_years, today)
+        cache.set(key, result, conf["timeout"])
+    return result
+
+
+def invalidate():
+    """Make every cached projection stale once the current transaction commits (at once outside one)."""
+    transaction.on_commit(_bump_version)
+
+
+def _bump_version():
+    # Old versions expire with their timeout
+    cache = caches[retirement_conf()["cache"]]
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:  # no version yet: the next projection() starts one
+        pass
+
+
+def fill_blank_dates(dry_run=False, batch_size=500):
+    """Write the derived date into blank date_retirement columns; returns how many."""
+    df = frame()
+    df = df[df["derived"]]
+    updates = [
+        Employee(pk=int(r.pk), date_retirement=r.retirement.date())
+        for r in df.itertuples(index=False)
+    ]
+    if not dry_run:
+        Employee.objects.bulk_update(updates, ["date_retirement"], batch_size=batch_size)
+        # bulk_update sends no signals
+        pagecache.invalidate([emp.pk for emp in updates], pagecache.EMPLOYEE_FRAGMENTS)
+        authcache.invalidate_employees([emp.pk for emp in updates])
+        invalidate()
+    return len(updates)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def _employee_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(FIELDS):
+        return
+    invalidate()
@@ -0,0 +1,77 @@
+# hr/routers.py
+"""
+Read-replica routing for reporting traffic.
+
+Views decorated with @use_reporting_db (search, exports, reports) read from the alias
+named by settings.HR_REPORTING_DB; everything else — all writes, and portal pages that
+must see what the employee just saved — stays on "default". The flag lives in a
+ContextVar, so it is per request under both WSGI threads and ASGI tasks.
+"""
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+_reporting = ContextVar("hr_reporting_db", default=False)
+
+
+def reporting_alias():
+    """The configured read alias, or None when reporting reads go to the primary."""
+    alias = getattr(settings, "HR_REPORTING_DB", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+@contextmanager
+def reporting_reads():
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary even under @use_reporting_db: for results that are cached, so a lagging replica is never stored."""
+    token = _reporting.set(False)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+def use_reporting_db(view):
+    """Route the view's reads to the reporting alias (replication lag is acceptable there)."""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def _async_view(request, *args, **kwargs):
+            with reporting_reads():
+                return await view(request, *args, **kwargs)
+        return _async_view
+
+    @functools.wraps(view)
+    def _view(request, *args, **kwargs):
+        with reporting_reads():
+            return view(request, *args, **kwargs)
+    return _view
+
+
+class ReportingRouter:
+    def db_for_read(self, model, **hints):
+        if not _reporting.get():
+            return None
+        alias = reporting_alias()
+        # Inside a transaction on the primary, keep reads there (read-your-writes)
+        if alias is None or connections["default"].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases, so objects read from either may be related
+        return True
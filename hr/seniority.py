@@ -0,0 +1,172 @@
+# hr/seniority.py
+"""
+Seniority (gradation list) engine.
+
+Each employee's seniority keys (settings.HR_SENIORITY["keys"], in priority order) are
+encoded into a fixed-width string, SeniorityRank.sort_key, whose string order is
+seniority order; HRMS ID is always the final tie-break, so keys are unique. Ranks are
+1..N with no gaps.
+
+When one employee's keys change, only the ranks between their old and new position move
+(one F() update), instead of re-sorting the cadre: see place(). New employees are
+inserted the same way and deleted ones close their gap. Every rank change first locks
+the SeniorityLock row, so concurrent changes run one at a time. `manage.py rebuild_seniority`
+recomputes everything (after bulk loads, or a change to the configured keys) and
+--check verifies the stored list.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Employee, SeniorityLock, SeniorityRank
+
+BATCH_SIZE = 1000
+
+# Defaults; override any key via settings.HR_SENIORITY
+DEFAULTS = {
+    # Highest priority first. Missing values sort after present ones.
+    "keys": ("date_joining", "bpsc_advt_no", "seniority_overall_rank", "category"),
+    "category_field": "selection_category",
+    # Category values in seniority order; values not listed come after, alphabetically.
+    # Empty: category does not affect the order.
+    "category_order": (),
+}
+# Employee fields any key can read (plus the hrms_id tie-break)
+KEY_FIELDS = ("hrms_id", "date_joining", "bpsc_advt_no", "seniority_overall_rank", "selection_category", "actual_category")
+ADVT = re.compile(r"^\s*(\d+)\s*/\s*(\d{4})\s*$")   # "12/2016": advertisement 12 of 2016
+LAST = "~"                                          # sorts after digits and letters
+
+
+def seniority_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_SENIORITY", {})}
+
+
+def _text(value, width):
+    return (value or "").strip().upper()[:width].ljust(width) if value else LAST * width
+
+
+def _part(emp, key, conf):
+    if key == "date_joining":
+        return emp.date_joining.isoformat() if emp.date_joining else LAST * 10
+    if key == "bpsc_advt_no":
+        # Earlier year first, then advertisement number; unparsable values after, as text
+        match = ADVT.match(emp.bpsc_advt_no or "")
+        if match:
+            return f"0{match.group(2)}{int(match.group(1)):06d}".ljust(41)
+        return "1" + _text(emp.bpsc_advt_no, 40) if emp.bpsc_advt_no else LAST * 41
+    if key == "seniority_overall_rank":
+        rank = emp.seniority_overall_rank
+        return f"{rank:09d}" if rank is not None and rank >= 0 else LAST * 9
+    if key == "category":
+        order = list(conf["category_order"])
+        if not order:
+            return ""
+        value = (getattr(emp, conf["category_field"]) or "").strip().upper()
+        position = order.index(value) if value in order else len(order)
+        return f"{position:03d}" + _text(value, 20)
+    raise ValueError(f"Unknown seniority key: {key!r}")
+
+
+def sort_key(emp, conf=None):
+    conf = conf or seniority_conf()
+    return "|".join([_part(emp, key, conf) for key in conf["keys"]] + [emp.hrms_id])
+
+
+def _lock():
+    """Take the list-wide lock (call inside a transaction); held until it ends."""
+    SeniorityLock.objects.select_for_update().get_or_create(pk=1)
+
+
+# --- Full rebuild ----------------------------------------------------------------
+def rebuild():
+    """Rank the whole cadre from scratch; returns the number of employees ranked."""
+    conf = seniority_conf()
+    keys = sorted(
+        (sort_key(emp, conf), emp.pk) for emp in Employee.objects.only(*KEY_FIELDS).iterator()
+    )
+    rows = [SeniorityRank(employee_id=pk, rank=i, sort_key=key) for i, (key, pk) in enumerate(keys, 1)]
+    # MySQL upserts on the table's unique keys (only the employee pk) and rejects an
+    # explicit conflict target
+    upsert = {"unique_fields": ["employee"]} \
+        if connections[router.db_for_write(SeniorityRank)].features.supports_update_conflicts_with_target else {}
+    with transaction.atomic():
+        _lock()
+        for start in range(0, len(rows), BATCH_SIZE):
+            SeniorityRank.objects.bulk_create(
+                rows[start:start + BATCH_SIZE],
+                update_conflicts=True, update_fields=["rank", "sort_key", "computed_at"], **upsert,
+            )
+    return len(rows)
+
+
+def check():
+    """Problems with the stored list (gaps, duplicates, out-of-order or stale keys); [] if none."""
+    conf = seniority_conf()
+    problems = []
+    previous = None
+    expected = 1
+    stored = {}
+    for rank in SeniorityRank.objects.order_by("rank", "sort_key").iterator():
+        if rank.rank != expected:
+            problems.append(f"rank {expected} expected, found {rank.rank} (employee {rank.employee_id})")
+            expected = rank.rank
+        if previous is not None and rank.sort_key <= previous:
+            problems.append(f"rank {rank.rank} (employee {rank.employee_id}) is out of order")
+        previous = rank.sort_key
+        expected += 1
+        stored[rank.employee_id] = rank.sort_key
+    for emp in Employee.objects.only(*KEY_FIELDS).iterator():
+        if stored.get(emp.pk) != sort_key(emp, conf):
+            problems.append(f"employee {emp.pk} is {'unranked' if emp.pk not in stored else 'stale'}")
+    return problems
+
+
+# --- Incremental maintenance ----------------------------------------------------------------
+def place(employee_id):
+    """Move one employee to the rank their current keys give, shifting only the ranks in between."""
+    with transaction.atomic():
+        emp = Employee.objects.only(*KEY_FIELDS).filter(pk=employee_id).first()
+        if emp is None:
+            return None
+        key = sort_key(emp)
+        _lock()
+        current = SeniorityRank.objects.filter(pk=employee_id).first()
+        if current and current.sort_key == key:
+            return current.rank
+        others = SeniorityRank.objects.exclude(pk=employee_id)
+        new_rank = others.filter(sort_key__lt=key).count() + 1
+        if current is None:
+            others.filter(rank__gte=new_rank).update(rank=F("rank") + 1)
+            SeniorityRank.objects.create(employee_id=employee_id, rank=new_rank, sort_key=key)
+            return new_rank
+        if new_rank < current.rank:
+            others.filter(rank__gte=new_rank, rank__lt=current.rank).update(rank=F("rank") + 1)
+        elif new_rank > current.rank:
+            others.filter(rank__gt=current.rank, rank__lte=new_rank).update(rank=F("rank") - 1)
+        current.rank, current.sort_key = new_rank, key
+        current.save(update_fields=["rank", "sort_key", "computed_at"])
+        return new_rank
+
+
+@receiver(post_save, sender=Employee)
+def _employee_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(KEY_FIELDS):
+        return
+    transaction.on_commit(lambda: place(instance.pk))
+
+
+@receiver(pre_delete, sender=SeniorityRank)
+def _rank_deleting(sender, instance, **kwargs):
+    # Lock before the row is deleted: taken after, the row lock held by the delete could
+    # deadlock with a place() waiting on it while holding the list lock
+    _lock()
+
+
+@receiver(post_delete, sender=SeniorityRank)
+def _rank_deleted(sender, instance, **kwargs):
+    # Sent for the cascade when an Employee is deleted: close the gap
+    SeniorityRank.objects.filter(rank__gt=instance.rank).update(rank=F("rank") - 1)
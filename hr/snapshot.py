@@ -0,0 +1,157 @@
+# hr/snapshot.py
+"""
+Current-service snapshot (models.ServiceSnapshot): one row per employee with the current
+posting, deputation and pay level, so lists and reports filter on indexed columns
+instead of scanning each employee's history.
+
+"Current" is derived from APPROVED rows only: a row is current when it has started
+(from/start date unset or <= today) and has not ended (till_date ticked, or end date
+unset or >= today); among current rows the latest start wins. Receivers below recompute
+an employee's snapshot after any Posting/Deputation/PayScaleChange save or delete
+(on commit); code that bypasses signals (queryset.update, e.g. the admin approve
+actions) calls refresh() itself.
+
+Snapshots also change with the calendar: valid_until is the next date on which one of
+the rows starts or ends, and `manage.py rebuild_service_snapshots --expired` (nightly)
+recomputes just those.
+"""
+import datetime
+import functools
+
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import Deputation, Employee, PayScaleChange, Posting, ServiceSnapshot
+
+BATCH_SIZE = 500
+FIELDS = [
+    f.name for f in ServiceSnapshot._meta.concrete_fields if f.name != "employee"
+]
+# model -> (start field, end field)
+SOURCES = {
+    Posting: ("from_date", "to_date"),
+    Deputation: ("from_date", "to_date"),
+    PayScaleChange: ("start_date", "end_date"),
+}
+# Sent after refresh() with employee_ids=[...] (bulk_create sends no post_save);
+# hr/strength.py listens to drop reports that depend on the deputation state
+snapshots_refreshed = Signal()
+
+
+def _current(rows, start_field, end_field, today):
+    """(current row or None, next date on which the answer can change or None)."""
+    current, changes = [], []
+    for row in rows:
+        start = getattr(row, start_field)
+        end = None if row.till_date else getattr(row, end_field)
+        if start and start > today:
+            changes.append(start)
+        elif end and end < today:
+            continue
+        else:
+            current.append(row)
+            if end:
+                changes.append(end + datetime.timedelta(days=1))
+    best = max(
+        current,
+        key=lambda r: (r.till_date, getattr(r, start_field) or datetime.date.min, r.pk),
+        default=None,
+    )
+    return best, min(changes, default=None)
+
+
+def _rows_by_employee(Model, employee_ids):
+    start_field, end_field = SOURCES[Model]
+    by_emp = {}
+    rows = Model.objects.filter(employee_id__in=employee_ids, status="APPROVED").only(
+        "pk", "employee_id", "till_date", start_field, end_field,
+        *(("college_name", "designation", "place") if Model is not PayScaleChange else ("pay_level", "pay_level_master_id")),
+    )
+    for row in rows:
+        by_emp.setdefault(row.employee_id, []).append(row)
+    return by_emp
+
+
+def compute(employee_id, postings, deputations, pay_changes, today):
+    snap = ServiceSnapshot(employee_id=employee_id)
+    posting, posting_change = _current(postings, "from_date", "to_date", today)
+    deputation, deputation_change = _current(deputations, "from_date", "to_date", today)
+    pay, pay_change = _current(pay_changes, "start_date", "end_date", today)
+    if posting:
+        snap.posting_college = posting.college_name
+        snap.posting_designation = posting.designation
+        snap.posting_place = posting.place
+        snap.posting_since = posting.from_date
+    if deputation:
+        snap.on_deputation = True
+        snap.deputation_college = deputation.college_name
+        snap.deputation_designation = deputation.designation
+        snap.deputation_place = deputation.place
+        snap.deputation_since = deputation.from_date
+    if pay:
+        snap.pay_level = pay.pay_level
+        snap.pay_level_master_id = pay.pay_level_master_id
+        snap.pay_level_since = pay.start_date
+    snap.valid_until = min(filter(None, (posting_change, deputation_change, pay_change)), default=None)
+    return snap
+
+
+def _upsert_options():
+    # MySQL upserts on the table's unique keys (only the employee pk here) and rejects an
+    # explicit conflict target
+    connection = connections[router.db_for_write(ServiceSnapshot)]
+    if connection.features.supports_update_conflicts_with_target:
+        return {"unique_fields": ["employee"]}
+    return {}
+
+
+def refresh(employee_ids, today=None):
+    """Recompute the snapshots of these employees (4 queries per BATCH_SIZE employees)."""
+    today = today or timezone.localdate()
+    employee_ids = list(employee_ids)
+    for start in range(0, len(employee_ids), BATCH_SIZE):
+        # Employees deleted since the change was scheduled are skipped
+        ids = list(Employee.objects.filter(pk__in=employee_ids[start:start + BATCH_SIZE]).values_list("pk", flat=True))
+        postings = _rows_by_employee(Posting, ids)
+        deputations = _rows_by_employee(Deputation, ids)
+        pay_changes = _rows_by_employee(PayScaleChange, ids)
+        ServiceSnapshot.objects.bulk_create(
+            [
+                compute(pk, postings.get(pk, ()), deputations.get(pk, ()), pay_changes.get(pk, ()), today)
+                for pk in ids
+            ],
+            update_conflicts=True, update_fields=FIELDS, **_upsert_options(),
+        )
+    snapshots_refreshed.send(sender=ServiceSnapshot, employee_ids=employee_ids)
+    return len(employee_ids)
+
+
+def rebuild(expired_only=False, today=None):
+    """Recompute every snapshot, or (expired_only) those whose valid_until has passed."""
+    today = today or timezone.localdate()
+    if expired_only:
+        ids = ServiceSnapshot.objects.filter(valid_until__lte=today).values_list("employee_id", flat=True)
+    else:
+        ids = Employee.objects.values_list("pk", flat=True)
+    return refresh(ids.order_by("pk"), today=today)
+
+
+def _schedule(employee_id):
+    transaction.on_commit(functools.partial(refresh, [employee_id]))
+
+
+def _section_changed(sender, instance, **kwargs):
+    _schedule(instance.employee_id)
+
+
+for _model in SOURCES:
+    post_save.connect(_section_changed, sender=_model, dispatch_uid=f"snapshot-{_model.__name__}-save")
+    post_delete.connect(_section_changed, sender=_model, dispatch_uid=f"snapshot-{_model.__name__}-delete")
+
+
+@receiver(post_save, sender=Employee)
+def _employee_created(sender, instance, created, **kwargs):
+    if created:
+        _schedule(instance.pk)
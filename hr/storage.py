@@ -0,0 +1,58 @@
+# hr/storage.py
+"""
+Content-addressed file storage for employee photos.
+
+A file saved as employee_photos/<anything>.<ext> is stored as
+employee_photos/<sha256[:20]>.<ext>: the name changes whenever the bytes do, so the
+URL can be cached forever (see hr/media.py), and identical uploads share one file.
+Employee.photo keeps the current name; superseded files are left in place for pages
+still referencing them and removed by `manage.py sweep_photos`.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_LENGTH = 20
+HASHED_NAME = re.compile(r"^[0-9a-f]{%d}$" % HASH_LENGTH)
+
+
+def is_content_addressed(name):
+    """True for names produced by ContentAddressedStorage (and derivatives named after them)."""
+    return bool(HASHED_NAME.match(os.path.splitext(os.path.basename(name))[0]))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, **kwargs):
+        # Two workers saving the same bytes at once may both write: same name, same content
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest.hexdigest()[:HASH_LENGTH] + ext)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(self.generate_filename(name), content)
+        if self.exists(name):
+            # Same bytes already stored (re-upload, or another employee's identical photo)
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_exact(self, name, content):
+        """Store under `name` as given: for files named after a hashed original (hr/photos.py)."""
+        return super().save(name, content)
@@ -0,0 +1,125 @@
+# hr/strength.py
+"""
+College-wise sanctioned vs. posted strength.
+
+Posted and on-deputation counts come from one aggregate query over Employee, grouped by
+present_posting_college and designation master (hr/masters.py), with the deputation
+state read from ServiceSnapshot. Sanctioned counts come from SanctionedPost, whose
+designation text is matched to the same masters by key.
+vacant = sanctioned - posted; a negative value is an excess over sanctioned strength.
+
+The report is computed on the primary (even from @use_reporting_db views), cached in the
+shared cache and dropped once the transaction commits when a SanctionedPost, an
+Employee's posting/designation, or a snapshot (postings, deputations, approvals)
+changes. Code that updates Employee rows with queryset.update() calls invalidate().
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .masters import DesignationMaster, normalize_key
+from .models import College, Employee, SanctionedPost
+from .routers import primary_reads
+from .snapshot import snapshots_refreshed
+
+CACHE_KEY = "hr:strength-report"
+
+# Defaults; override any key via settings.HR_STRENGTH
+DEFAULTS = {
+    "cache": "shared",
+    "timeout": 6 * 3600,
+}
+EMPLOYEE_FIELDS = ("present_posting_college", "current_designation", "designation_master")
+
+
+def strength_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_STRENGTH", {})}
+
+
+def _compute():
+    counts = (
+        Employee.objects.filter(present_posting_college__isnull=False)
+        .values("present_posting_college_id", "designation_master_id")
+        .annotate(posted=Count("pk"), on_deputation=Count("pk", filter=Q(snapshot__on_deputation=True)))
+        .order_by()
+    )
+    designations = {pk: (key, name) for pk, key, name in DesignationMaster.objects.values_list("pk", "key", "name")}
+    cells = {}
+    for row in counts:
+        key, name = designations.get(row["designation_master_id"], ("", "(unspecified)"))
+        cell = cells.setdefault(
+            (row["present_posting_college_id"], key),
+            {"designation": name, "sanctioned": 0, "posted": 0, "on_deputation": 0},
+        )
+        cell["posted"] += row["posted"]
+        cell["on_deputation"] += row["on_deputation"]
+    for post in SanctionedPost.objects.values("college_id", "designation", "sanctioned"):
+        key = (post["college_id"], normalize_key(post["designation"]))
+        cell = cells.setdefault(key, {"designation": post["designation"], "sanctioned": 0, "posted": 0, "on_deputation": 0})
+        cell["designation"] = post["designation"]     # the sanctioned spelling wins
+        cell["sanctioned"] += post["sanctioned"]
+
+    names = dict(College.objects.filter(pk__in={c for c, _ in cells}).values_list("pk", "name"))
+    colleges = {}
+    for (college_id, _), cell in cells.items():
+        cell["vacant"] = cell["sanctioned"] - cell["posted"]
+        college = colleges.setdefault(college_id, {
+            "college_id": college_id, "college": names.get(college_id, ""), "rows": [],
+            "sanctioned": 0, "posted": 0, "on_deputation": 0, "vacant": 0,
+        })
+        college["rows"].append(cell)
+        for field in ("sanctioned", "posted", "on_deputation", "vacant"):
+            college[field] += cell[field]
+    result = sorted(colleges.values(), key=lambda c: c["college"])
+    for college in result:
+        college["rows"].sort(key=lambda r: r["designation"])
+    totals = {f: sum(c[f] for c in result) for f in ("sanctioned", "posted", "on_deputation", "vacant")}
+    return {
+        "colleges": result,
+        "totals": totals,
+        "unassigned": Employee.objects.filter(present_posting_college__isnull=True).count(),
+        "computed_at": timezone.now(),
+    }
+
+
+def report():
+    conf = strength_conf()
+    cache = caches[conf["cache"]]
+    result = cache.get(CACHE_KEY)
+    if result is None:
+        with primary_reads():
+            result = _compute()
+        cache.set(CACHE_KEY, result, conf["timeout"])
+    return result
+
+
+def invalidate(**kwargs):
+    """Drop the cached report once the current transaction commits (at once outside one)."""
+    transaction.on_commit(_drop)
+
+
+def _drop():
+    caches[strength_conf()["cache"]].delete(CACHE_KEY)
+
+
+@receiver(post_save, sender=SanctionedPost)
+@receiver(post_delete, sender=SanctionedPost)
+def _sanctioned_changed(sender, instance, **kwargs):
+    invalidate()
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def _employee_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(EMPLOYEE_FIELDS):
+        return
+    invalidate()
+
+
+@receiver(snapshots_refreshed)
+def _snapshots_refreshed(sender, employee_ids, **kwargs):
+    invalidate()
@@ -0,0 +1,169 @@
+# hr/synthetic.py
+"""
+Synthetic cadre generator for benchmarks and CI checks (hrbench, check_query_budgets).
+
+Everything here writes to whatever database is active, so callers run it inside
+isolated_environment(), which creates Django's test database and swaps every cache for
+a private in-memory one.
+"""
+import datetime
+import io
+import random
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from . import intervals, models, normalize, seniority, snapshot
+
+# Child rows per employee: (min, max), roughly what a mid-career lecturer has on file
+SECTION_ROWS = {
+    models.Education: (2, 4),
+    models.Posting: (2, 6),
+    models.Deputation: (0, 2),
+    models.Apar: (5, 10),
+    models.PropertyReturn: (5, 10),
+    models.Training: (0, 2),
+    models.Award: (0, 2),
+    models.PayScaleChange: (1, 4),
+    models.AdvanceIncrement: (0, 2),
+    models.LeaveRecord: (2, 8),
+    models.Allegation: (0, 1),
+}
+
+BRANCHES = ["Civil", "Mechanical", "Electrical", "Electronics", "Computer Science", "Applied Science"]
+DESIGNATIONS = ["Lecturer", "Senior Lecturer", "Head of Department", "Principal", "Assistant Professor"]
+PAY_LEVELS = ["10", "11", "12", "13", "13A", "14"]
+DISTRICTS = ["Patna", "Gaya", "Muzaffarpur", "Bhagalpur", "Darbhanga", "Purnia", "Nalanda", "Saran"]
+CATEGORIES = ["UR", "EWS", "BC", "EBC", "SC", "ST"]
+
+
+def _date(rng, start_year, end_year):
+    start = datetime.date(start_year, 1, 1).toordinal()
+    end = datetime.date(end_year, 12, 31).toordinal()
+    return datetime.date.fromordinal(rng.randint(start, end))
+
+
+def section_row(Model, emp, i, rng=None, status=None):
+    """One plausible unsaved row of a section model for `emp`; `i` is the row's index."""
+    rng = rng or random.Random(i)
+    status = status or ("APPROVED" if rng.random() < 0.7 else "PENDING")
+    start = _date(rng, 2000, 2023)
+    end = start + datetime.timedelta(days=rng.randint(200, 1500))
+    year = 2014 + i
+    common = {"employee": emp, "status": status}
+    if Model is models.Education:
+        values = {"degree": ["B.Tech", "M.Tech", "PhD", "NET"][i % 4], "subject": rng.choice(BRANCHES),
+                  "year": 1995 + i * 3, "institution": "NIT Patna"}
+    elif Model in (models.Posting, models.Deputation):
+        values = {"college_name": f"Government Polytechnic {rng.randint(1, 40)}", "pay_level": rng.choice(PAY_LEVELS),
+                  "designation": rng.choice(DESIGNATIONS), "from_date": start, "to_date": end,
+                  "office_order_no": f"OO/{rng.randint(1, 999)}", "place": rng.choice(DISTRICTS)}
+    elif Model in (models.Apar, models.PropertyReturn):
+        values = {"year": year, "submitted": rng.random() < 0.85, "submitted_date": datetime.date(year + 1, 5, 1)}
+    elif Model is models.Training:
+        values = {"area": "Pedagogy", "institute": "NITTTR Kolkata", "duration_weeks": 2, "completion_date": start}
+    elif Model is models.Award:
+        values = {"name": "Best Teacher", "year": start.year, "date": start}
+    elif Model is models.PayScaleChange:
+        values = {"pay_level": PAY_LEVELS[min(i, len(PAY_LEVELS) - 1)], "start_date": start, "end_date": end,
+                  "notif_no": f"N/{rng.randint(1, 999)}"}
+    elif Model is models.AdvanceIncrement:
+        values = {"qualification": "PhD", "passing_year": start.year, "count": rng.randint(1, 3),
+                  "pay_level": rng.choice(PAY_LEVELS), "effective_from": start}
+    elif Model is models.LeaveRecord:
+        leave_start = _date(rng, 2015, 2025)
+        values = {"leave_type": rng.choice(["EL", "HPL", "CL", "ML"]), "period_from": leave_start,
+                  "period_to": leave_start + datetime.timedelta(days=rng.randint(1, 30))}
+    elif Model is models.Allegation:
+        values = {"has_allegation": rng.random() < 0.2, "details": ""}
+    else:
+        values = {}
+    return Model(**common, **values)
+
+
+def _photo_bytes(rng):
+    """A small solid-colour JPEG (well under MAX_PHOTO_BYTES)."""
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new("RGB", (160, 200), tuple(rng.randint(0, 255) for _ in range(3))).save(buf, "JPEG", quality=70)
+    return buf.getvalue()
+
+
+def seed_cadre(employees=500, colleges=None, photos=False, seed=1, batch_size=500):
+    """
+    Create `employees` Employee rows with SECTION_ROWS child rows each, spread over colleges.
+    Employees are bulk-created (no per-row user provisioning); returns the list of employee pks.
+    """
+    rng = random.Random(seed)
+    n_colleges = colleges or max(3, employees // 25)
+    models.College.objects.bulk_create(
+        [models.College(name=f"Government Polytechnic {i}", code=f"GP{i:03d}") for i in range(1, n_colleges + 1)],
+        ignore_conflicts=True,
+    )
+    college_ids = list(models.College.objects.values_list("pk", flat=True))
+    college_names = dict(models.College.objects.values_list("pk", "name"))
+
+    base = 80_000_000 + rng.randint(0, 9_000_000)
+    rows = []
+    for i in range(employees):
+        home = rng.choice(college_ids)
+        posted = home if rng.random() < 0.8 else rng.choice(college_ids)
+        dob = _date(rng, 1965, 1995)
+        rows.append(models.Employee(
+            hrms_id=str(base + i), name=f"Synthetic Employee {i}", father_name=f"Father {i}",
+            gender=rng.choice("MF"), dob=dob, email=f"emp{i}@example.org", mobile=f"9{rng.randint(0, 999999999):09d}",
+            home_state="Bihar", home_district=rng.choice(DISTRICTS),
+            college_id=home, college_name=college_names[home],
+            present_posting_college_id=posted, present_posting=college_names[posted],
+            branch=rng.choice(BRANCHES), current_designation=rng.choice(DESIGNATIONS),
+            bpsc_advt_no=f"{rng.randint(1, 40)}/{rng.choice([2008, 2012, 2016, 2020])}",
+            seniority_overall_rank=i + 1, actual_category=rng.choice(CATEGORIES),
+            date_joining=_date(rng, max(dob.year + 24, 2000), 2024),
+        ))
+    models.Employee.objects.bulk_create(rows, batch_size=batch_size)
+    # bulk_create does not return PKs on MySQL
+    pks = list(models.Employee.objects.filter(hrms_id__in=[r.hrms_id for r in rows]).values_list("pk", flat=True))
+
+    for Model, (lo, hi) in SECTION_ROWS.items():
+        batch = []
+        for pk in pks:
+            emp = models.Employee(pk=pk)
+            batch.extend(section_row(Model, emp, j, rng) for j in range(rng.randint(lo, hi)))
+            if len(batch) >= batch_size:
+                Model.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        Model.objects.bulk_create(batch, batch_size=batch_size)
+
+    if photos:
+        for emp in models.Employee.objects.filter(pk__in=pks).only("pk", "hrms_id"):
+            emp.photo.save(f"{emp.hrms_id}.jpg", ContentFile(_photo_bytes(rng)), save=False)
+            models.Employee.objects.filter(pk=emp.pk).update(photo=emp.photo.name)
+
+    # bulk_create skipped the master, snapshot, seniority and leave-span receivers
+    normalize.backfill()
+    snapshot.refresh(pks)
+    seniority.rebuild()
+    intervals.reset_max_span()
+    return pks
+
+
+@contextmanager
+def isolated_environment(keepdb=False):
+    """Run against Django's test database(s) with private in-memory caches and a temporary MEDIA_ROOT."""
+    local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, interactive=False, keepdb=keepdb)
+    old_config = runner.setup_databases()
+    try:
+        with tempfile.TemporaryDirectory(prefix="hrbench-media-") as media_root, override_settings(
+            CACHES={alias: {**local, "LOCATION": f"isolated-{alias}"} for alias in settings.CACHES},
+            MEDIA_ROOT=media_root,
+        ):
+            yield
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
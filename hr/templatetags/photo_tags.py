@@ -0,0 +1,10 @@
+from django import template
+
+from hr.photos import picture_html
+
+register = template.Library()
+
+@register.simple_tag
+def employee_photo(employee, size, css_class="", alt="Photo"):
+    """<picture> (WebP + JPEG) of the employee's photo at a derived size: "thumb" or "preview"."""
+    return picture_html(employee, size, css_class=css_class, alt=alt)
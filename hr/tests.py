@@ -0,0 +1,38 @@
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+from hr.management.commands.check_query_budgets import QUERY_BUDGETS, build_fixture
+from hr.nplusone import QueryBudgetMixin
+
+# Private in-memory caches: test users' snapshots must never reach the shared cache
+LOCAL_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": f"tests-{alias}"}
+    for alias in settings.CACHES
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=tempfile.mkdtemp(prefix="hr-tests-media-"))
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The budgets of `manage.py check_query_budgets`, run by the test runner."""
+
+    def check_pages(self, size):
+        employee_user, staff, emp = build_fixture(employees=size, rows_per_section=size)
+        clients = {"employee": Client(), "staff": Client()}
+        clients["employee"].force_login(employee_user)
+        clients["staff"].force_login(staff)
+        for who, pages in QUERY_BUDGETS.items():
+            for url, budget in pages.items():
+                url = url.format(pk=emp.pk)
+                with self.subTest(who=who, url=url, rows=size):
+                    clients[who].get(url)   # warm the auth snapshot and any page caches
+                    with self.assertQueryBudget(budget, label=url):
+                        response = clients[who].get(url)
+                    self.assertLess(response.status_code, 400)
+
+    def test_small_cadre(self):
+        self.check_pages(2)
+
+    def test_budgets_do_not_grow_with_rows(self):
+        self.check_pages(6)
@@ -0,0 +1,61 @@
+# hr/throttle.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Defaults; override any key via settings.HR_LOGIN_THROTTLE
+DEFAULTS = {
+    "cache": "default",        # a local (per-process) cache is enough: the goal is bounding CPU per worker
+    "per_identifier": 5,       # failed attempts per HRMS ID/username per window
+    "per_ip": 30,              # failed attempts per client IP per window
+    "window": 300,             # seconds
+}
+
+
+def _conf():
+    return {**DEFAULTS, **getattr(settings, "HR_LOGIN_THROTTLE", {})}
+
+
+def client_ip(request):
+    return (getattr(request, "META", {}) or {}).get("REMOTE_ADDR", "") if request is not None else ""
+
+
+class LoginThrottle:
+    """
+    Counts failed login attempts per identifier and per client IP in a cache.
+    Checked *before* any password hashing, so a throttled attempt costs two cache reads.
+    """
+
+    def __init__(self, request, identifier):
+        conf = _conf()
+        self.cache = caches[conf["cache"]]
+        self.window = conf["window"]
+        self.limits = {}
+        ident = (identifier or "").strip().lower()
+        if ident:
+            self.limits[self._key("id", ident)] = conf["per_identifier"]
+        ip = client_ip(request)
+        if ip:
+            self.limits[self._key("ip", ip)] = conf["per_ip"]
+
+    @staticmethod
+    def _key(kind, value):
+        return "hr:login:%s:%s" % (kind, hashlib.sha1(value.encode("utf-8")).hexdigest())
+
+    def blocked(self):
+        counts = self.cache.get_many(list(self.limits))
+        return any(counts.get(k, 0) >= limit for k, limit in self.limits.items())
+
+    def failed(self):
+        for key in self.limits:
+            # add() only sets when missing, so the window starts at the first failure
+            self.cache.add(key, 0, timeout=self.window)
+            try:
+                self.cache.incr(key)
+            except ValueError:  # expired between add() and incr()
+                self.cache.set(key, 1, timeout=self.window)
+
+    def succeeded(self):
+        # Only the identifier counter is cleared; a busy IP (shared office NAT) keeps its own budget
+        self.cache.delete_many([k for k in self.limits if k.startswith("hr:login:id:")])
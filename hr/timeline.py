@@ -0,0 +1,166 @@
+# hr/timeline.py
+"""
+Service-timeline validator for Posting, Deputation and PayScaleChange.
+
+Rows are loaded for CHUNK_SIZE employees at a time (one query per section per chunk,
+ordered by employee and start date) and each employee's rows are swept in start order:
+- "overlap": a row starts on or before the day an earlier row ends (or an earlier row
+  is still open)
+- "gap": more than gap_tolerance_days between one row's end and the next row's start
+  (postings and pay only: deputations are intermittent by nature)
+- "multiple_open": more than one row with till_date ticked
+- "invalid": no start date, or the end before the start
+Rows without till_date and without an end date are taken as open-ended.
+
+Results replace the employee's TimelineIssue rows. The incremental mode rechecks only
+employees changed since the last run: the receivers below stamp TimelineChange (after
+commit) whenever a row of these sections is saved or deleted. Status-only updates
+(the admin approve actions) do not touch the dates and need no stamp.
+"""
+import datetime
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import (
+    Deputation, Employee, PayScaleChange, Posting, TimelineChange, TimelineIssue, TimelineRun,
+)
+
+CHUNK_SIZE = 500
+
+# Defaults; override any key via settings.HR_TIMELINE
+DEFAULTS = {
+    "gap_sections": ("postings", "pay"),
+    "gap_tolerance_days": 1,    # 1: the next row may start the day after the previous one ends
+}
+# section -> (model, start field, end field)
+SECTIONS = {
+    "postings": (Posting, "from_date", "to_date"),
+    "deputations": (Deputation, "from_date", "to_date"),
+    "pay": (PayScaleChange, "start_date", "end_date"),
+}
+
+
+def timeline_conf():
+    return {**DEFAULTS, **getattr(settings, "HR_TIMELINE", {})}
+
+
+def sweep(employee_id, section, rows, conf=None):
+    """TimelineIssues (unsaved) for one employee's rows of one section: (pk, start, end, till_date) tuples."""
+    conf = conf or timeline_conf()
+    issues = []
+
+    def issue(kind, start, end, detail):
+        issues.append(TimelineIssue(
+            employee_id=employee_id, section=section, kind=kind, start=start, end=end, detail=detail[:255],
+        ))
+
+    open_rows = [pk for pk, _, _, till in rows if till]
+    if len(open_rows) > 1:
+        issue("multiple_open", None, None, f"{len(open_rows)} rows marked 'till date' (ids {', '.join(map(str, open_rows))})")
+
+    dated = []
+    for pk, start, end, till in rows:
+        end = None if till else end
+        if start is None:
+            issue("invalid", None, end, f"row {pk} has no start date")
+        elif end is not None and end < start:
+            issue("invalid", start, end, f"row {pk} ends before it starts")
+        else:
+            dated.append((start, end, pk))
+    dated.sort(key=lambda r: (r[0], r[1] or datetime.date.max))
+
+    check_gaps = section in conf["gap_sections"]
+    tolerance = datetime.timedelta(days=conf["gap_tolerance_days"])
+    reach, reach_pk = None, None    # latest end so far (date.max while a row is open)
+    for start, end, pk in dated:
+        end_or_open = end or datetime.date.max
+        if reach is not None:
+            if start <= reach:
+                overlap_end = min(reach, end_or_open)
+                issue("overlap", start, None if overlap_end == datetime.date.max else overlap_end,
+                      f"row {pk} starts {start:%d-%m-%Y}, before row {reach_pk} ends")
+            elif check_gaps and start - reach > tolerance:
+                issue("gap", reach + datetime.timedelta(days=1), start - datetime.timedelta(days=1),
+                      f"{(start - reach).days - 1} day(s) between row {reach_pk} and row {pk}")
+        if reach is None or end_or_open > reach:
+            reach, reach_pk = end_or_open, pk
+    return issues
+
+
+def check(employee_ids, conf=None):
+    """Unsaved TimelineIssues for these employees (3 queries per CHUNK_SIZE employees)."""
+    conf = conf or timeline_conf()
+    employee_ids = list(employee_ids)
+    for first in range(0, len(employee_ids), CHUNK_SIZE):
+        chunk = employee_ids[first:first + CHUNK_SIZE]
+        for section, (Model, start_field, end_field) in SECTIONS.items():
+            rows = (
+                Model.objects.filter(employee_id__in=chunk)
+                .order_by("employee_id", start_field)
+                .values_list("employee_id", "pk", start_field, end_field, "till_date")
+            )
+            current, batch = None, []
+            for emp_id, *row in rows.iterator(chunk_size=2000):
+                if emp_id != current:
+                    if batch:
+                        yield from sweep(current, section, batch, conf)
+                    current, batch = emp_id, []
+                batch.append(tuple(row))
+            if batch:
+                yield from sweep(current, section, batch, conf)
+
+
+def run(incremental=False, batch_size=1000):
+    """Validate the cadre (or, incrementally, employees changed since the last run); returns the TimelineRun."""
+    last = TimelineRun.objects.filter(finished_at__isnull=False).first() if incremental else None
+    started = timezone.now()
+    if last is None:
+        mode, employee_ids = "full", list(Employee.objects.order_by("pk").values_list("pk", flat=True))
+    else:
+        mode = "incremental"
+        employee_ids = list(
+            TimelineChange.objects.filter(changed_at__gte=last.started_at)
+            .order_by("employee_id").values_list("employee_id", flat=True)
+        )
+
+    record = TimelineRun.objects.create(mode=mode, started_at=started)
+    issues = list(check(employee_ids))
+    with transaction.atomic():
+        if mode == "full":
+            TimelineIssue.objects.all().delete()
+        else:
+            for first in range(0, len(employee_ids), CHUNK_SIZE):
+                TimelineIssue.objects.filter(employee_id__in=employee_ids[first:first + CHUNK_SIZE]).delete()
+        for issue in issues:
+            issue.run = record
+        TimelineIssue.objects.bulk_create(issues, batch_size=batch_size)
+        record.finished_at = timezone.now()
+        record.employees_checked = len(employee_ids)
+        record.issues_found = len(issues)
+        record.save(update_fields=["finished_at", "employees_checked", "issues_found"])
+    return record
+
+
+# === Change stamps ===============================================
+def stamp(employee_id):
+    """Record that this employee's service rows changed now."""
+    now = timezone.now()
+    if TimelineChange.objects.filter(employee_id=employee_id).update(changed_at=now):
+        return
+    # Employees deleted since the change was scheduled are skipped
+    if Employee.objects.filter(pk=employee_id).exists():
+        TimelineChange.objects.get_or_create(employee_id=employee_id, defaults={"changed_at": now})
+
+
+def _section_changed(sender, instance, **kwargs):
+    # After commit: a run that starts before the change is visible still sees a newer stamp
+    transaction.on_commit(functools.partial(stamp, instance.employee_id))
+
+
+for _model, _, _ in SECTIONS.values():
+    post_save.connect(_section_changed, sender=_model, dispatch_uid=f"timeline-{_model.__name__}-save")
+    post_delete.connect(_section_changed, sender=_model, dispatch_uid=f"timeline-{_model.__name__}-delete")
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, async_views, reports
 
 # app_name optional; keep it if you might namespace later
 app_name = "hr"
@@ -10,13 +10,29 @@ urlpatterns = [
     path("portal/profile/", views.profile, name="employee-profile"),
 
     # 📸 photo upload/change
-    
+    path("photos/<int:pk>/<str:size>.<str:fmt>", views.photo_derivative, name="photo-derivative"),
 
     # Admin-only search/export
     path("search/", views.search, name="search"),
     path("export/csv/", views.export_csv, name="export-csv"),
     path("export/excel/", views.export_excel, name="export-excel"),
     path("export/pdf/", views.export_pdf, name="export-pdf"),
+    path("metrics/", views.metrics_view, name="metrics"),
+
+    # Staff reports (hr/reports.py)
+    path("reports/gradation/", reports.gradation, name="gradation"),
+    path("reports/gradation.csv", reports.gradation_csv, name="gradation-csv"),
+    path("reports/retirement/", reports.retirement_projection, name="retirement-projection"),
+    path("reports/on-leave/", reports.on_leave, name="on-leave"),
+    path("reports/strength/", reports.strength_report, name="strength"),
+    path("reports/compliance/", reports.compliance_matrix, name="compliance"),
+    path("reports/compliance.xlsx", reports.compliance_xlsx, name="compliance-xlsx"),
+
+    # Streaming variants (async; serve under civil_list/asgi.py)
+    path("search/stream/", async_views.search_stream, name="search-stream"),
+    path("export/csv/stream/", async_views.export_csv_stream, name="export-csv-stream"),
+    path("export/excel/stream/", async_views.export_excel_stream, name="export-excel-stream"),
+    path("export/pdf/stream/", async_views.export_pdf_stream, name="export-pdf-stream"),
 
     # Self-service sections
     path("portal/education/", views.portal_education),
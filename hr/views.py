@@ -2,16 +2,22 @@
 from __future__ import annotations
 
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.template.loader import render_to_string
 from django.contrib import messages
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import login
+from django.contrib.auth import views as auth_views
 from django.urls import reverse
 from django.core.exceptions import ValidationError
 from .forms import EmployeeSelfEditForm
+from . import intervals, metrics, pagecache, photos
+from .masters import normalize_key
+from .normalize import branch_filter, college_filter
+from .admission import admission
+from .routers import use_reporting_db
 
-from .models import Employee, SelfEditPermission
+from .models import Employee, LeaveRecord, SelfEditPermission
 from .forms import (
     EducationFS, PostingFS, DeputationFS, AparFS, PropertyFS, TrainingFS,
     AwardFS, PayFS, IncrementFS, LeaveFS, AllegationFS
@@ -42,33 +48,31 @@ except Exception:
 def login_with_hrms(request):
     """
     Optional dedicated HRMS login view.
-    If unused, rely on /login/ configured in urls.py.
+    If unused, rely on /accounts/login/ (wired to the same form in civil_list/urls.py).
+    The form resolves the HRMS ID/username and checks the password once; no extra lookup here.
     """
     if request.user.is_authenticated:
-        return redirect("portal")
+        return redirect("hr:portal")
 
     if HRMSLoginForm is None:
         messages.error(request, "Login form not available. Please use /login/ or contact admin.")
-        return redirect("portal")
+        return redirect("hr:portal")
 
-    form = HRMSLoginForm(request.POST or None)
+    form = HRMSLoginForm(request, data=request.POST or None)
     if request.method == "POST" and form.is_valid():
-        # support either 'identifier' or 'hrms_id' depending on your form
-        hrms_id = (form.cleaned_data.get("hrms_id") or form.cleaned_data.get("identifier") or "").strip()
-        password = form.cleaned_data.get("password") or ""
-        try:
-            emp = Employee.objects.select_related("user").get(hrms_id=hrms_id, user__isnull=False)
-        except Employee.DoesNotExist:
-            messages.error(request, "Invalid HRMS ID or account not linked. Please contact admin.")
-        else:
-            user = authenticate(request, username=emp.user.username, password=password)
-            if user:
-                login(request, user)
-                return redirect("portal")
-            messages.error(request, "Invalid password.")
+        login(request, form.get_user())
+        return redirect("hr:portal")
     return render(request, "registration/login.html", {"form": form})
 
 
+class PasswordChangeView(auth_views.PasswordChangeView):
+    """Django's password change view that also clears Employee.must_change_password."""
+    def form_valid(self, form):
+        Employee.objects.filter(user=self.request.user, must_change_password=True).update(must_change_password=False)
+        # super() saves the user, whose post_save drops the cached auth snapshot (hr/authcache.py)
+        return super().form_valid(form)
+
+
 # === Common helpers =============================================
 def _is_staff(user): 
     return user.is_staff or user.is_superuser
@@ -85,39 +89,66 @@ def _filtered_qs(request):
     college = (request.GET.get("college") or "").strip()
     if hrms:
         qs = qs.filter(hrms_id__icontains=hrms)
+    # Branch and college match the small master tables and filter on the FK index (text where unlinked)
     if branch:
-        qs = qs.filter(branch__icontains=branch)
+        qs = qs.filter(branch_filter(branch))
     if college:
-        qs = qs.filter(college_name__icontains=college)
+        qs = qs.filter(college_filter(college))
+    # Current state from the indexed ServiceSnapshot table (hr/snapshot.py)
+    pay_level = (request.GET.get("pay_level") or "").strip()
+    on_deputation = (request.GET.get("on_deputation") or "").strip()
+    if pay_level:
+        qs = qs.filter(snapshot__pay_level_master__key=normalize_key(pay_level))
+    if on_deputation in ("0", "1"):
+        qs = qs.filter(snapshot__on_deputation=on_deputation == "1")
     return qs.order_by("hrms_id")
 
 
+def _is_unfiltered(request):
+    return not any(
+        (request.GET.get(k) or "").strip() for k in ("hrms_id", "branch", "college", "pay_level", "on_deputation")
+    )
+
+
 # === Admin-only search/exports ==================================
 @user_passes_test(_is_staff)
+@use_reporting_db
+@admission("search_unfiltered", when=_is_unfiltered)
 def search(request):
     qs = _filtered_qs(request)
     return render(request, "search.html", {"qs": qs})
 
 
-import csv, io, pandas as pd
-from xhtml2pdf import pisa
+# pandas and xhtml2pdf cost ~1.5 s and tens of MB per worker at import; only the
+# staff exports need them, so they are imported on first use (see check_import_budget)
+import csv, io, time
 
 
 @user_passes_test(_is_staff)
+@use_reporting_db
 def export_csv(request):
     qs = _filtered_qs(request)
     resp = HttpResponse(content_type="text/csv")
     resp["Content-Disposition"] = "attachment; filename=employees.csv"
+    started = time.perf_counter()
     w = csv.writer(resp)
     w.writerow(["HRMS", "Name", "Designation", "Branch", "College", "Posting"])
+    rows = 0
     for e in qs:
         w.writerow([e.hrms_id, e.name, e.current_designation, e.branch, e.college_name, e.present_posting])
+        rows += 1
+    metrics.observe_export("csv", rows, time.perf_counter() - started)
     return resp
 
 
 @user_passes_test(_is_staff)
+@use_reporting_db
+@admission("export_excel")
 def export_excel(request):
+    import pandas as pd
+
     qs = _filtered_qs(request)
+    started = time.perf_counter()
     data = [{
         "HRMS": e.hrms_id,
         "Name": e.name,
@@ -135,25 +166,59 @@ def export_excel(request):
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
     resp["Content-Disposition"] = "attachment; filename=employees.xlsx"
+    metrics.observe_export("excel", len(data), time.perf_counter() - started)
     return resp
 
 
 @user_passes_test(_is_staff)
+@use_reporting_db
+@admission("export_pdf")
 def export_pdf(request):
+    from xhtml2pdf import pisa
+
     qs = _filtered_qs(request)
+    started = time.perf_counter()
     html = render_to_string("report.html", {"qs": qs})
     buf = io.BytesIO()
     pisa.CreatePDF(src=html, dest=buf)
     resp = HttpResponse(buf.getvalue(), content_type="application/pdf")
     resp["Content-Disposition"] = "attachment; filename=employees.pdf"
+    metrics.observe_export("pdf", len(qs), time.perf_counter() - started)  # qs already evaluated by the template
     return resp
 
 
+@user_passes_test(_is_staff)
+def metrics_view(request):
+    """Prometheus text exposition of hr/metrics.py (all workers on this host)."""
+    return HttpResponse(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # === Employee self-service portal ================================
 @login_required
 def portal(request):
     emp = getattr(request.user, "employee_profile", None)
-    return render(request, "portal.html", {"employee": emp})
+    return render(request, "portal.html", {"employee": emp, **pagecache.template_context()})
+
+
+@login_required
+def photo_derivative(request, pk, size, fmt):
+    """Build a missing photo derivative on first request, then redirect to the stored file."""
+    if size not in photos.derivatives_conf()["sizes"] or fmt not in photos.FORMATS:
+        raise Http404
+    # Same rule as hr/media.py: staff, or an employee's own photo (cached profile, no query)
+    own = getattr(request.user, "employee_profile", None)
+    if not (request.user.is_staff or request.user.is_superuser or (own is not None and own.pk == pk)):
+        raise Http404
+    emp = Employee.objects.filter(pk=pk).only("pk", "photo").first()
+    if emp is None or not emp.photo:
+        raise Http404
+    name = photos.derivative_name(emp.photo.name, size, fmt)
+    if not emp.photo.storage.exists(name):
+        try:
+            photos.generate(emp.photo)
+        except (OSError, ValueError):
+            raise Http404
+    return redirect(emp.photo.storage.url(name))
 
 
 def _resolve_model_from_formset(FS):
@@ -193,10 +258,13 @@ def _portal_formset(request, FS, title, code=None):
     if code:
         perm = getattr(emp, 'self_edit_perm', None)
         if perm is not None and not getattr(perm, PERM_MAP.get(code, ''), False):
-            base_qs_ro = Model.objects.filter(employee=emp).order_by('-id')
+            base_qs_ro = Model.objects.filter(employee=emp).select_related('employee').order_by('-id')
             return render(request, 'readonly_list.html', {
                 'title': title,
                 'rows': base_qs_ro,
+                'employee': emp,
+                'section': code,
+                **pagecache.template_context(),
             })
 
     # Build queryset & split approved vs editable
@@ -204,7 +272,8 @@ def _portal_formset(request, FS, title, code=None):
     base_qs = Model.objects.filter(employee=emp)
     if hasattr(Model, 'status'):
         edit_qs = base_qs.exclude(status='APPROVED')
-        approved_qs = base_qs.filter(status='APPROVED').order_by('-id')
+        # select_related: each row's __str__ reads employee.hrms_id
+        approved_qs = base_qs.filter(status='APPROVED').select_related('employee').order_by('-id')
     else:
         edit_qs = base_qs
         approved_qs = Model.objects.none()
@@ -216,7 +285,8 @@ def _portal_formset(request, FS, title, code=None):
             for fld in ('employee','status','approved_by','approved_at','reviewer_remark'):
                 if fld in f.fields:
                     f.fields[fld].widget = f.fields[fld].hidden_widget()
-        if formset.is_valid():
+        # Leaves must not overlap each other or the employee's stored leaves
+        if formset.is_valid() and not (Model is LeaveRecord and intervals.check_formset(emp, formset)):
             instances = formset.save(commit=False)
             # Prevent deleting APPROVED via formset
             for obj in formset.deleted_objects:
@@ -288,6 +358,9 @@ def profile(request):
         return redirect("portal")
 
     if request.method == "POST":
+        # request.user is a cached snapshot (hr/authcache.py): bind the form to the current
+        # row, or saving it would write the snapshot's stale fields back
+        emp = Employee.objects.get(pk=emp.pk)
         form = EmployeeSelfEditForm(request.POST, request.FILES, instance=emp)
         if form.is_valid():
             try:
@@ -304,5 +377,5 @@ def profile(request):
     else:
         form = EmployeeSelfEditForm(instance=emp)
 
-    return render(request, "employee/profile.html", {"employee": emp, "form": form})
+    return render(request, "employee/profile.html", {"employee": emp, "form": form, **pagecache.template_context()})
 